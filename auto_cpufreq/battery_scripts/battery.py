@@ -1,5 +1,4 @@
 #!/usr/bin/env python3
-from subprocess import PIPE, run
 from threading import Thread
 from time import sleep
 
@@ -11,9 +10,12 @@ BATTERY_APPLY_INTERVAL = 3600  # 1 hour
 
 
 def lsmod(module):
-    return (
-        module in run(["lsmod"], stdout=PIPE, stderr=PIPE, text=True).stdout
-    )
+    # lsmod only formats /proc/modules, read it directly instead of starting a process per check
+    try:
+        with open("/proc/modules", "r") as f:
+            return module in f.read()
+    except OSError:
+        return False
 
 
 def battery_get_thresholds():
@@ -22,8 +24,9 @@ def battery_get_thresholds():
         return dev.print_thresholds()
 
 
-def start_battery_daemon():
-    """Battery daemon that applies battery charge thresholds at regular intervals."""
+def start_battery_daemon(loop=None):
+    """Battery daemon that applies battery charge thresholds at regular intervals,
+    as a timer on the given DaemonLoop or else in a thread of its own."""
     dev = get_battery_device()
     if dev is None:
         print(
@@ -31,14 +34,21 @@ def start_battery_daemon():
         )
         return
 
+    def apply_thresholds():
+        try:
+            dev.apply_threshold_settings()
+        except Exception as e:
+            print(
+                f"ERROR: An error occurred while applying battery thresholds: {e}"
+            )
+
+    if loop is not None:
+        loop.call_every(BATTERY_APPLY_INTERVAL, apply_thresholds)
+        return
+
     def battery_daemon():
         while True:
-            try:
-                dev.apply_threshold_settings()
-            except Exception as e:
-                print(
-                    f"ERROR: An error occurred while applying battery thresholds: {e}"
-                )
+            apply_thresholds()
             sleep(BATTERY_APPLY_INTERVAL)
 
     Thread(target=battery_daemon, daemon=True).start()
@@ -12,8 +12,8 @@ from shutil import rmtree
 from auto_cpufreq.battery_scripts.battery import *
 from auto_cpufreq.config.config import config as conf, find_config_file
 from auto_cpufreq.core import *
-from auto_cpufreq.globals import GITHUB, IS_INSTALLED_WITH_AUR, IS_INSTALLED_WITH_SNAP
-from auto_cpufreq.modules.system_monitor import ViewType, SystemMonitor
+from auto_cpufreq.globals import GITHUB, IS_INSTALLED_WITH_SNAP, is_installed_with_aur, snap_daemon_check
+from auto_cpufreq.modules.load_sampler import load_sampler
 # import everything from power_helper, including bluetooth_disable and bluetooth_enable
 from auto_cpufreq.power_helper import *
 from threading import Thread
@@ -58,12 +58,12 @@ def main(monitor, live, daemon, install, update, remove, force, turbo, config, s
         if force is not None:
             not_running_daemon_check()
             root_check() # Calling root_check before set_override as it will require sudo access
-            set_override(force) # Calling set override, only if force has some values
+            push_override(governor=force) # Calling set override, only if force has some values
         
         if turbo is not None:
             not_running_daemon_check()
             root_check()
-            set_turbo_override(turbo)
+            push_override(turbo=turbo)
 
         if monitor:
             root_check()
@@ -75,13 +75,14 @@ def main(monitor, live, daemon, install, update, remove, force, turbo, config, s
                 gnome_power_detect()
                 tlp_service_detect()
                 
-            if IS_INSTALLED_WITH_SNAP or tlp_stat_exists or (systemctl_exists and not bool(gnome_power_status)):
+            if IS_INSTALLED_WITH_SNAP or tlp_stat_exists or (systemctl_exists and gnome_power_active()):
                 try:
                     input("press Enter to continue or Ctrl + c to exit...")
                 except KeyboardInterrupt:
                     conf.notifier.stop()
                     sys.exit(0)
             
+            from auto_cpufreq.modules.system_monitor import ViewType, SystemMonitor # urwid is only imported by the interactive views
             monitor = SystemMonitor(suggestion=True, type=ViewType.MONITOR)
             monitor.run(on_quit=conf.notifier.stop)
         elif live:
@@ -97,7 +98,7 @@ def main(monitor, live, daemon, install, update, remove, force, turbo, config, s
                 tuned_stop_live()
                 tlp_service_detect()
             
-            if IS_INSTALLED_WITH_SNAP or tlp_stat_exists or (systemctl_exists and not bool(gnome_power_status)):
+            if IS_INSTALLED_WITH_SNAP or tlp_stat_exists or (systemctl_exists and gnome_power_active()):
                 try:
                     input("press Enter to continue or Ctrl + c to exit...")
                 except KeyboardInterrupt:
@@ -105,6 +106,7 @@ def main(monitor, live, daemon, install, update, remove, force, turbo, config, s
                     sys.exit(0)
             
             cpufreqctl()
+            load_sampler.start()
             def live_daemon():
                 # Redirect stdout to suppress prints
                 class NullWriter:
@@ -128,31 +130,26 @@ def main(monitor, live, daemon, install, update, remove, force, turbo, config, s
             thread = Thread(target=live_daemon, daemon=True)
             thread.start()
             
+            from auto_cpufreq.modules.system_monitor import ViewType, SystemMonitor
             monitor = SystemMonitor(type=ViewType.LIVE)
             monitor.run(on_quit=live_daemon_off)
         elif daemon:
             config_info_dialog()
             root_check()
+            if not daemon_lock.acquire():
+                print(f"ERROR: auto-cpufreq is already running in daemon mode (pid {daemon_lock.holder()})")
+                sys.exit(1)
             file_stats()
-            if IS_INSTALLED_WITH_SNAP and SNAP_DAEMON_CHECK == "enabled":
+            if IS_INSTALLED_WITH_SNAP and snap_daemon_check() == "enabled":
                 gnome_power_detect_snap()
                 tlp_service_detect_snap()
             elif not IS_INSTALLED_WITH_SNAP:
                 gnome_power_detect()
                 tlp_service_detect()
-            start_battery_daemon()
-            conf.notifier.start()
-            while True:
-                try:
-                    footer()
-                    gov_check()
-                    cpufreqctl()
-                    distro_info()
-                    sysinfo()
-                    set_autofreq()
-                    countdown(2)
-                except KeyboardInterrupt: break
-            conf.notifier.stop()
+            # the tick, timers, event sources and the API all run on one asyncio loop
+            from auto_cpufreq.modules.daemon_core import run as run_daemon
+            run_daemon()
+            daemon_lock.release()
         elif install:
             root_check()
             if IS_INSTALLED_WITH_SNAP:
@@ -188,7 +185,7 @@ def main(monitor, live, daemon, install, update, remove, force, turbo, config, s
 
                 print("Please update using snap package manager, i.e: `sudo snap refresh auto-cpufreq`.")
                 #check for AUR 
-            elif IS_INSTALLED_WITH_AUR: print("Arch-based distribution with AUR support detected. Please refresh auto-cpufreq using your AUR helper.")
+            elif is_installed_with_aur(): print("Arch-based distribution with AUR support detected. Please refresh auto-cpufreq using your AUR helper.")
             else:
                 is_new_update = check_for_update()
                 if not is_new_update: return
@@ -214,6 +211,7 @@ def main(monitor, live, daemon, install, update, remove, force, turbo, config, s
                         auto_cpufreq_stats_file.close()
 
                     auto_cpufreq_stats_path.unlink()
+                Path(f"{auto_cpufreq_stats_path}.1").unlink(missing_ok=True) # rotated stats
                 # ToDo: 
                 # {the following snippet also used in --update, update it there too(if required)}
                 # * undo bluetooth boot disable
@@ -230,19 +228,22 @@ def main(monitor, live, daemon, install, update, remove, force, turbo, config, s
                 gnome_power_detect()
                 tlp_service_detect()
             
-            if IS_INSTALLED_WITH_SNAP or tlp_stat_exists or (systemctl_exists and not bool(gnome_power_status)):
+            if IS_INSTALLED_WITH_SNAP or tlp_stat_exists or (systemctl_exists and gnome_power_active()):
                 try:
                     input("press Enter to continue or Ctrl + c to exit...")
                 except KeyboardInterrupt:
                     conf.notifier.stop()
                     sys.exit(0)
             
+            from auto_cpufreq.modules.system_monitor import ViewType, SystemMonitor
             monitor = SystemMonitor(type=ViewType.STATS)
             monitor.run()
         elif get_state:
-            not_running_daemon_check()
-            override = get_override()
-            print(override)
+            state = query({"cmd": "state", "history": 0})
+            if state is None:
+                not_running_daemon_check()
+                print(get_override())
+            else: print(state["overrides"]["governor"])
         elif bluetooth_boot_off:
             if IS_INSTALLED_WITH_SNAP:
                 footer()
@@ -1,8 +1,8 @@
-import os, pyinotify, sys
-from configparser import ConfigParser, ParsingError
-from subprocess import run, PIPE
+import os, pwd, sys
+from configparser import ConfigParser, Error
 
-from auto_cpufreq.config.config_event_handler import ConfigEventHandler
+from auto_cpufreq.config.profile import ConfigError, Profile, Settings, compile_settings
+from auto_cpufreq.modules.capabilities import probe
 
 def find_config_file(args_config_file) -> str:
     """
@@ -20,11 +20,8 @@ def find_config_file(args_config_file) -> str:
 
     # use $SUDO_USER or $USER to get home dir since sudo can't access
     # user env vars
-    home = run(["getent passwd ${SUDO_USER:-$USER} | cut -d: -f6"],
-        shell=True,
-        stdout=PIPE,
-        universal_newlines=True
-    ).stdout.rstrip()
+    try: home = pwd.getpwnam(os.getenv("SUDO_USER") or os.getenv("USER") or "").pw_dir
+    except KeyError: home = ""
     user_config_dir = os.getenv("XDG_CONFIG_HOME", default=os.path.join(home, ".config"))
     user_config_file = os.path.join(user_config_dir, "auto-cpufreq/auto-cpufreq.conf")
     system_config_file = "/etc/auto-cpufreq.conf"
@@ -43,26 +40,80 @@ class _Config:
     def __init__(self) -> None:
         self.path: str = ""
         self._config: ConfigParser = ConfigParser()
-        self.watch_manager: pyinotify.WatchManager = pyinotify.WatchManager()
+        self.settings: Settings = Settings()
+        self.generation = 0 # incremented on every (re)load of the config file
+        self._notifier = None
+        self.watch_manager = None
+
+    def _watch(self) -> None:
+        # only the commands which keep running (daemon, monitor, live) watch the config, so pyinotify is imported when first used
+        if self.watch_manager is not None: return
+        import pyinotify
+        from auto_cpufreq.config.config_event_handler import ConfigEventHandler
+
+        self.watch_manager = pyinotify.WatchManager()
         self.config_handler = ConfigEventHandler(self)
+        mask = pyinotify.IN_CREATE | pyinotify.IN_DELETE | pyinotify.IN_MODIFY | pyinotify.IN_MOVED_FROM | pyinotify.IN_MOVED_TO
+        if self.path: self.watch_manager.add_watch(os.path.dirname(self.path), mask=mask)
+
+    @property
+    def notifier(self):
+        """
+        pyinotify.ThreadedNotifier watching the config file for changes in a thread of its own
+        """
+        if self._notifier is None:
+            import pyinotify
+
+            self._watch()
+            # check for file changes using threading
+            self._notifier = pyinotify.ThreadedNotifier(self.watch_manager, self.config_handler)
+        return self._notifier
+
+    def watch(self, loop, on_change=None) -> None:
+        """
+        Watch the config file for changes from the daemon's event loop (DaemonLoop) instead of a notifier thread,
+        on_change is called after the config was reloaded
+        """
+        import pyinotify
+
+        self._watch()
+        notifier = pyinotify.Notifier(self.watch_manager, self.config_handler)
+        def process():
+            generation = self.generation
+            notifier.read_events()
+            notifier.process_events()
+            if on_change is not None and self.generation != generation: on_change()
+        loop.add_reader(self.watch_manager.get_fd(), process)
 
-        # check for file changes using threading
-        self.notifier: pyinotify.ThreadedNotifier = pyinotify.ThreadedNotifier(self.watch_manager, self.config_handler)
-        
     def set_path(self, path: str) -> None:
         self.path = path
-        mask = pyinotify.IN_CREATE | pyinotify.IN_DELETE | pyinotify.IN_MODIFY | pyinotify.IN_MOVED_FROM | pyinotify.IN_MOVED_TO
-        self.watch_manager.add_watch(os.path.dirname(path), mask=mask)
         if os.path.isfile(path): self.update_config()
 
     def has_config(self) -> bool: return os.path.isfile(self.path)
     
     def get_config(self) -> ConfigParser: return self._config
-    
+
+    def profile(self, name: str) -> Profile: return self.settings.profile(name)
+
     def update_config(self) -> None:
+        """
+        (Re)load the config file and compile its settings, a file which doesn't parse or has
+        invalid values is rejected as a whole and the last good config stays in use
+        """
         # create new ConfigParser to prevent old data from remaining
-        self._config = ConfigParser()
-        try: self._config.read(self.path)
-        except ParsingError as e: print(f"The following error occured while parsing the config file: \n{repr(e)}")
+        conf = ConfigParser()
+        try:
+            conf.read(self.path)
+            settings = compile_settings(conf, probe())
+        except ConfigError as e:
+            print("The config file has invalid values:\n" + "\n".join(f"  {error}" for error in e.errors))
+            print("Keeping the previous configuration" if self.generation else "Using the default configuration")
+            return
+        except Error as e:
+            print(f"The following error occured while parsing the config file: \n{repr(e)}")
+            print("Keeping the previous configuration" if self.generation else "Using the default configuration")
+            return
+        self._config, self.settings = conf, settings
+        self.generation += 1
 
 config = _Config()
\ No newline at end of file
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - typed settings compiled from the config file
+from configparser import ConfigParser
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+
+from auto_cpufreq.modules.capabilities import Capabilities
+from auto_cpufreq.modules.psi import DEFAULT_THRESHOLD
+from auto_cpufreq.modules.scheduler import DEFAULT_FAST_INTERVAL, DEFAULT_SLOW_INTERVAL, DEFAULT_TICK_BOUNDS
+from auto_cpufreq.modules.sysfs_backend import EPB_VALUES, parse_epb
+from auto_cpufreq.modules.turbo_controller import TurboSettings
+
+TURBO_MODES = ("auto", "always", "never")
+
+
+class ConfigError(ValueError):
+    """
+    Invalid values in the config file, one message per problem in errors
+    """
+
+    def __init__(self, errors: list[str]):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+@dataclass(frozen=True)
+class ClusterProfile:
+    """
+    Settings of a [<profile>.<cluster>] section, None where the profile's value is used
+    """
+    governor: str | None = None
+    energy_performance_preference: str | None = None
+    scaling_max_freq: int | None = None
+    scaling_min_freq: int | None = None
+    idle_scaling_max_freq: int | None = None
+    idle_load_threshold: float | None = None
+
+
+@dataclass(frozen=True)
+class Profile:
+    """
+    Settings of the [battery] or [charger] section, None where the option isn't set and
+    the default depends on the system (governors, EPP, frequency limits)
+    """
+    name: str
+    governor: str | None = None
+    energy_performance_preference: str | None = None
+    energy_perf_bias: str | None = None
+    platform_profile: str | None = None
+    enforce_platform_profile: bool = True
+    turbo: str = "auto"
+    scaling_max_freq: int | None = None
+    scaling_min_freq: int | None = None
+    turbo_settings: TurboSettings = field(default_factory=TurboSettings)
+    clusters: Mapping[str, ClusterProfile] = field(default_factory=lambda: MappingProxyType({}))
+    min_tick_interval: float | None = None # adaptive tick bounds, None for the profile's default
+    max_tick_interval: float | None = None
+
+
+@dataclass(frozen=True)
+class DaemonSettings:
+    """
+    Settings of the [daemon] section
+    """
+    fast_interval: float = DEFAULT_FAST_INTERVAL
+    slow_interval: float = DEFAULT_SLOW_INTERVAL
+    adaptive_interval: bool = False
+    psi: bool = False
+    psi_threshold: float = DEFAULT_THRESHOLD
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Everything the daemon's decisions read from the config file, compiled once per (re)load
+    """
+    battery: Profile = field(default_factory=lambda: Profile("battery"))
+    charger: Profile = field(default_factory=lambda: Profile("charger"))
+    daemon: DaemonSettings = field(default_factory=DaemonSettings)
+    load_forecast: bool = True
+
+    def profile(self, name: str) -> Profile: return self.charger if name == "charger" else self.battery
+
+
+def _boolean(raw_value: str) -> bool:
+    try: return ConfigParser.BOOLEAN_STATES[raw_value.lower()]
+    except KeyError: raise ValueError("expected true or false") from None
+
+
+def _number(raw_value: str, convert: Callable[[str], float], valid: Callable[[float], bool], expected: str) -> float:
+    try: value = convert(raw_value)
+    except ValueError: value = None
+    if value is None or not valid(value): raise ValueError(f"expected {expected}")
+    return value
+
+
+def _frequency(raw_value: str) -> int: return _number(raw_value, int, lambda value: value > 0, "a frequency in kHz")
+
+
+def _percentage(raw_value: str) -> float: return _number(raw_value, float, lambda value: 0 <= value <= 100, "a percentage")
+
+
+def _seconds(raw_value: str) -> float: return _number(raw_value, float, lambda value: value > 0, "a positive number of seconds")
+
+
+def _psi_threshold(raw_value: str) -> float: return _number(raw_value, float, lambda value: 0 < value <= 100, "a percentage above 0")
+
+
+def _turbo_value(raw_value: str) -> float: return _number(raw_value, float, lambda value: value >= 0, "a positive number")
+
+
+def _turbo_mode(raw_value: str) -> str:
+    if raw_value not in TURBO_MODES: raise ValueError(f"expected one of {', '.join(TURBO_MODES)}")
+    return raw_value
+
+
+def _epb(raw_value: str) -> str:
+    if parse_epb(raw_value) is None: raise ValueError(f"expected 0-15 or one of {', '.join(EPB_VALUES)}")
+    return raw_value
+
+
+def _choice(choices: tuple[str, ...]) -> Callable[[str], str]:
+    """
+    Parser accepting the choices the system reports, anything when it reports none (knob missing or unreadable)
+    """
+    def parse(raw_value: str) -> str:
+        if choices and raw_value not in choices: raise ValueError(f"expected one of {', '.join(choices)}")
+        return raw_value
+    return parse
+
+
+class _Compiler:
+    def __init__(self, conf: ConfigParser, capabilities: Capabilities):
+        self.conf = conf
+        self.errors: list[str] = []
+        self.governor = _choice(capabilities.governors)
+        self.epp = _choice(capabilities.epp.choices)
+        self.platform_profile = _choice(capabilities.platform_profile.choices)
+
+    def get(self, section: str, option: str, parse: Callable[[str], Any] = str, default: Any = None) -> Any:
+        if not self.conf.has_option(section, option): return default
+        raw_value = self.conf[section][option].strip()
+        try: return parse(raw_value)
+        except ValueError as e:
+            self.errors.append(f"Invalid value for '{option}' in [{section}]: {raw_value!r}, {e}")
+            return default
+
+    def turbo_settings(self, section: str) -> TurboSettings:
+        values = {}
+        for turbo_field in fields(TurboSettings):
+            value = self.get(section, f"turbo_{turbo_field.name}", _turbo_value)
+            if value is not None: values[turbo_field.name] = value
+        settings = TurboSettings(**values)
+        if settings.off_load > settings.on_load: self.errors.append(f"'turbo_off_load' is larger than 'turbo_on_load' in [{section}]")
+        return settings
+
+    def cluster(self, section: str) -> ClusterProfile:
+        return ClusterProfile(
+            governor=self.get(section, "governor", self.governor),
+            energy_performance_preference=self.get(section, "energy_performance_preference", self.epp),
+            scaling_max_freq=self.get(section, "scaling_max_freq", _frequency),
+            scaling_min_freq=self.get(section, "scaling_min_freq", _frequency),
+            idle_scaling_max_freq=self.get(section, "idle_scaling_max_freq", _frequency),
+            idle_load_threshold=self.get(section, "idle_load_threshold", _percentage),
+        )
+
+    def daemon(self) -> DaemonSettings:
+        return DaemonSettings(
+            fast_interval=self.get("daemon", "fast_interval", _seconds, DEFAULT_FAST_INTERVAL),
+            slow_interval=self.get("daemon", "slow_interval", _seconds, DEFAULT_SLOW_INTERVAL),
+            adaptive_interval=self.get("daemon", "adaptive_interval", _boolean, False),
+            psi=self.get("daemon", "psi", _boolean, False),
+            psi_threshold=self.get("daemon", "psi_threshold", _psi_threshold, DEFAULT_THRESHOLD),
+        )
+
+    def profile(self, name: str) -> Profile:
+        clusters = {
+            section.partition(".")[2]: self.cluster(section)
+            for section in self.conf.sections() if section.startswith(f"{name}.")
+        }
+        min_tick, max_tick = self.get(name, "min_tick_interval", _seconds), self.get(name, "max_tick_interval", _seconds)
+        min_default, max_default = DEFAULT_TICK_BOUNDS[name]
+        if (min_tick or min_default) > (max_tick or max_default): self.errors.append(f"'min_tick_interval' is larger than 'max_tick_interval' in [{name}]")
+        return Profile(
+            name=name,
+            governor=self.get(name, "governor", self.governor),
+            energy_performance_preference=self.get(name, "energy_performance_preference", self.epp),
+            energy_perf_bias=self.get(name, "energy_perf_bias", _epb),
+            platform_profile=self.get(name, "platform_profile", self.platform_profile),
+            enforce_platform_profile=self.get(name, "enforce_platform_profile", _boolean, True),
+            turbo=self.get(name, "turbo", _turbo_mode, "auto"),
+            scaling_max_freq=self.get(name, "scaling_max_freq", _frequency),
+            scaling_min_freq=self.get(name, "scaling_min_freq", _frequency),
+            turbo_settings=self.turbo_settings(name),
+            clusters=MappingProxyType(clusters),
+            min_tick_interval=min_tick,
+            max_tick_interval=max_tick,
+        )
+
+
+def compile_settings(conf: ConfigParser, capabilities: Capabilities = Capabilities()) -> Settings:
+    """
+    Validate and convert the decision settings of a parsed config file, raises ConfigError listing every invalid value.
+    Governors, EPP and platform profiles are checked against the choices in capabilities.
+    """
+    compiler = _Compiler(conf, capabilities)
+    settings = Settings(
+        battery=compiler.profile("battery"),
+        charger=compiler.profile("charger"),
+        daemon=compiler.daemon(),
+        load_forecast=compiler.get("daemon", "load_forecast", _boolean, True),
+    )
+    if compiler.errors: raise ConfigError(compiler.errors)
+    return settings
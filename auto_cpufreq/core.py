@@ -1,22 +1,37 @@
 #!/usr/bin/env python3
 #
 # auto-cpufreq - core functionality
-import click, distro, os, platform, psutil, sys
+import click, os, platform, sys
+from dataclasses import asdict, dataclass, fields, replace
 from importlib.metadata import metadata, PackageNotFoundError
 from math import isclose
 from pathlib import Path
-from pickle import dump, load
 from re import search
-from requests import get, exceptions
 from shutil import copy
 from subprocess import call, check_output, DEVNULL, getoutput, run
-from time import sleep
+from time import strftime
 from warnings import filterwarnings
 
 from auto_cpufreq.config.config import config
 from auto_cpufreq.globals import (
-    ALL_GOVERNORS, AVAILABLE_GOVERNORS, AVAILABLE_GOVERNORS_SORTED, GITHUB, IS_INSTALLED_WITH_AUR, IS_INSTALLED_WITH_SNAP, POWER_SUPPLY_DIR, SNAP_DAEMON_CHECK
+    ALL_GOVERNORS, GITHUB, IS_INSTALLED_WITH_SNAP,
+    available_governors, available_governors_sorted, is_installed_with_aur, snap_daemon_check
 )
+from auto_cpufreq.modules.capabilities import CapabilityProbe
+from auto_cpufreq.modules.clusters import ClusterMap
+from auto_cpufreq.modules.daemon_api import daemon_api, query
+from auto_cpufreq.modules.daemon_lock import daemon_lock
+from auto_cpufreq.modules.load_forecast import load_forecaster
+from auto_cpufreq.modules.load_sampler import load_sampler
+from auto_cpufreq.modules.override_store import overrides
+from auto_cpufreq.modules.power_supply_index import power_supply_index
+from auto_cpufreq.modules.process_rules import process_rules
+from auto_cpufreq.modules.psi import pressure_monitor
+from auto_cpufreq.modules.static_facts import StaticFactsCache
+from auto_cpufreq.modules.temperature import TemperatureReader
+from auto_cpufreq.modules.turbo_controller import turbo_controller
+from auto_cpufreq.modules.stats_log import StatsLog, StatsWriter, render_text
+from auto_cpufreq.modules.sysfs_backend import get_backend, parse_epb
 from auto_cpufreq.power_helper import *
 
 filterwarnings("ignore")
@@ -33,6 +48,12 @@ else:
 SCRIPTS_DIR = Path("/usr/local/share/auto-cpufreq/scripts/")
 CPUS = os.cpu_count()
 
+# reads/writes cpufreq knobs in-process, falls back to cpufreqctl.auto-cpufreq script
+backend = get_backend()
+static_facts = StaticFactsCache(backend)
+temperatures = TemperatureReader(static_facts)
+capabilities = CapabilityProbe(static_facts)
+clusters = ClusterMap(static_facts)
 
 
 # Note:
@@ -47,85 +68,144 @@ powersave_load_threshold = (75 * CPUS) / 100
 auto_cpufreq_stats_file = None
 auto_cpufreq_stats_path = None
 
-# track governor override and turbo boost override
-if IS_INSTALLED_WITH_SNAP:
-    auto_cpufreq_stats_path = Path("/var/snap/auto-cpufreq/current/auto-cpufreq.stats")
-    governor_override_state = Path("/var/snap/auto-cpufreq/current/override.pickle")
-    turbo_override_state    = Path("/var/snap/auto-cpufreq/current/turbo-override.pickle")
-else:
-    auto_cpufreq_stats_path = Path("/var/run/auto-cpufreq.stats")
-    governor_override_state = Path("/opt/auto-cpufreq/override.pickle")
-    turbo_override_state    = Path("/opt/auto-cpufreq/turbo-override.pickle")
+if IS_INSTALLED_WITH_SNAP: auto_cpufreq_stats_path = Path("/var/snap/auto-cpufreq/current/auto-cpufreq.stats")
+else: auto_cpufreq_stats_path = Path("/var/run/auto-cpufreq.stats")
 
 last_applied_config_section = None
 
+# "battery" or "charger", whichever profile the last tick applied
+def active_profile(): return last_applied_config_section
+
 def file_stats():
+    # printed output is stored as "log" records next to the typed "tick" records
     global auto_cpufreq_stats_file
-    auto_cpufreq_stats_file = open(auto_cpufreq_stats_path, "w")
+    auto_cpufreq_stats_file = StatsWriter(StatsLog(auto_cpufreq_stats_path))
     sys.stdout = auto_cpufreq_stats_file
 
-def get_override():
-    if os.path.isfile(governor_override_state):
-        with open(governor_override_state, "rb") as store: return load(store)
-    else: return "default"
+def resource_usage(pid="self"):
+    """
+    Resident memory (MB) and thread count of a process from /proc/<pid>/status, None if it can't be read
+    """
+    values = {}
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "Threads"): values[key] = int(value.split()[0])
+    except OSError: return None
+    return {"rss_mb": round(values.get("VmRSS", 0) / 1024, 1), "threads": values.get("Threads", 0)}
+
+def record_tick(**extra):
+    """
+    Write a typed snapshot of the last tick (load, decisions and knob writes) to the stats log
+    and publish it to daemon API clients
+    """
+    snapshot = load_sampler.snapshot()
+    record = {
+        "type": "tick",
+        "profile": active_profile(),
+        "governor_override": get_override(),
+        "turbo_override": get_turbo_override(),
+        "applied": asdict(reconciler.applied),
+        "writes_performed": reconciler.writes_performed,
+        "writes_skipped": reconciler.writes_skipped,
+        "backend_writes": reconciler.backend_writes,
+        "turbo": turbo_controller.stats(),
+        "forecast": load_forecaster.stats(),
+        "pressure": {resource: asdict(pressure) for resource, pressure in (pressure_monitor.read() or {}).items()},
+        "pressure_triggers": pressure_monitor.triggers,
+        "run_queue": snapshot.run_queue,
+        "process_rules": process_rules.stats(),
+        "resources": resource_usage(),
+        "clusters": {
+            cluster.name: {
+                "cpus": list(cluster.cpus),
+                "load": cluster.load(load_sampler.history),
+                "applied": asdict(cluster_reconcilers[cluster.name].applied) if cluster.name in cluster_reconcilers else None,
+            }
+            for cluster in clusters.get()
+        },
+        "cpu_usage": snapshot.total,
+        "cpu_usage_ewma": snapshot.ewma,
+        "max_core_usage": snapshot.max_core,
+        "load1m": snapshot.load1m,
+    }
+    record.update(extra)
+    if auto_cpufreq_stats_file is not None: auto_cpufreq_stats_file.log.write(record)
+    daemon_api.publish(record)
+
+# governor and turbo boost overrides, held in memory by the daemon
+def get_override(): return overrides.get("governor")
 
 def set_override(override):
+    message = None
     if override in ["powersave", "performance"]:
-        with open(governor_override_state, "wb") as store:
-            dump(override, store)
-        print(f"Set governor override to {override}")
+        overrides.set("governor", override)
+        message = f"Set governor override to {override}"
     elif override == "reset":
-        if os.path.isfile(governor_override_state):
-            os.remove(governor_override_state)
-        print("Governor override removed")
-    elif override is not None: print("Invalid option.\nUse force=performance, force=powersave, or force=reset")
+        overrides.set("governor", None)
+        message = "Governor override removed"
+    elif override is not None: message = "Invalid option.\nUse force=performance, force=powersave, or force=reset"
+    if message is not None: print(message)
+    return message
 
-def get_turbo_override():
-    if os.path.isfile(turbo_override_state):
-        with open(turbo_override_state, "rb") as store: return load(store)
-    else: return "auto"
+def get_turbo_override(): return overrides.get("turbo")
 
 def set_turbo_override(override):
+    message = None
     if override in ["never", "always"]:
-        with open(turbo_override_state, "wb") as store:
-            dump(override, store)
-        print(f"Set turbo boost override to {override}")
+        overrides.set("turbo", override)
+        message = f"Set turbo boost override to {override}"
     elif override == "auto":
-        if os.path.isfile(turbo_override_state):
-            os.remove(turbo_override_state)
-        print("Turbo override removed")
-    elif override is not None: print("Invalid option.\nUse turbo=always, turbo=never, or turbo=auto")
-
-# get distro name
-try: dist_name = distro.id()
-except PermissionError:
-    # Current work-around for Pop!_OS where symlink causes permission issues
-    print("[!] Warning: Cannot get distro name")
-    if IS_INSTALLED_WITH_SNAP and os.path.exists("/etc/pop-os/os-release"):
-        print("[!] Snap install on PopOS detected, you must manually run the following"
-                " commands in another terminal:\n")
-        print("[!] Backup the /etc/os-release file:")
-        print("sudo mv /etc/os-release /etc/os-release-backup\n")
-        print("[!] Create hardlink to /etc/os-release:")
-        print("sudo ln /etc/pop-os/os-release /etc/os-release\n")
-        print("[!] Aborting. Restart auto-cpufreq when you created the hardlink")
-    else:
-        print("[!] Check /etc/os-release permissions and make sure it is not a symbolic link")
-        print("[!] Aborting...")
-    sys.exit(1)
+        overrides.set("turbo", None)
+        message = "Turbo override removed"
+    elif override is not None: message = "Invalid option.\nUse turbo=always, turbo=never, or turbo=auto"
+    if message is not None: print(message)
+    return message
+
+def get_overrides(): return overrides.all()
+
+def _api_set_override(request):
+    messages = []
+    if "governor" in request: messages.append(set_override(request["governor"]))
+    if "turbo" in request: messages.append(set_turbo_override(request["turbo"]))
+    return {"messages": [message for message in messages if message], "overrides": get_overrides()}
+
+daemon_api.route("overrides", lambda _request: get_overrides())
+daemon_api.route("set_override", _api_set_override, root_only=True)
+
+def push_override(governor=None, turbo=None):
+    """
+    Hand an override change to the running daemon, which keeps it in memory and stores it. When no daemon
+    answers it is stored directly, and takes effect the next time the daemon starts
+    """
+    request = {"cmd": "set_override"}
+    if governor is not None: request["governor"] = governor
+    if turbo is not None: request["turbo"] = turbo
+    response = query(request)
+    if response is not None and not response.get("ok"):
+        print(f"Daemon refused override: {response.get('error')}")
+        return
+    if response is None:
+        if governor is not None: set_override(governor)
+        if turbo is not None: set_turbo_override(turbo)
+        print("The daemon didn't answer, the override takes effect once it is restarted")
+        return
+    for message in response.get("messages", []): print(message)
 
 # display running version of auto-cpufreq
 def app_version():
     print("auto-cpufreq version: ", end="")
 
     if IS_INSTALLED_WITH_SNAP: print(getoutput(r"echo \(Snap\) $SNAP_VERSION"))
-    elif IS_INSTALLED_WITH_AUR: print(getoutput("pacman -Qi auto-cpufreq | grep Version"))
+    elif is_installed_with_aur(): print(getoutput("pacman -Qi auto-cpufreq | grep Version"))
     else:
         try: print(get_formatted_version())
         except Exception as e: print(repr(e))
 
 def check_for_update():
     # returns True if a new release is available from the GitHub repo
+    from requests import get, exceptions # only --update talks to GitHub
 
     # Specify the repository and package name
     # IT IS IMPORTANT TO  THAT IF THE REPOSITORY STRUCTURE IS CHANGED, THE FOLLOWING FUNCTION NEEDS TO BE UPDATED ACCORDINGLY
@@ -193,6 +273,8 @@ def get_formatted_version():
     return splitted_version[0] + ("" if len(splitted_version) > 1 else " (git: " + splitted_version[1] + ")")
 
 def app_res_use():
+    import psutil # only a few commands need psutil, the others start without importing it
+
     p = psutil.Process()
     print("auto-cpufreq system resource consumption:")
     print("cpu usage:", p.cpu_percent(), "%")
@@ -201,27 +283,24 @@ def app_res_use():
 # set/change state of turbo
 def turbo(value: bool = None):
     """
-    Get and set turbo mode
+    Get and set turbo mode, returns whether turbo is on, None when it can't be controlled or the write failed
     """
-    p_state = Path("/sys/devices/system/cpu/intel_pstate/no_turbo")
-    cpufreq = Path("/sys/devices/system/cpu/cpufreq/boost")
-    amd_pstate = Path("/sys/devices/system/cpu/amd_pstate/status")
+    caps = capabilities.get()
 
-    if p_state.exists():
+    if caps.no_turbo:
         inverse = True
-        f = p_state
-    elif cpufreq.exists():
-        f = cpufreq
+        f = Path(caps.no_turbo.path)
+    elif caps.boost:
+        f = Path(caps.boost.path)
         inverse = False
-    elif amd_pstate.exists():
-        amd_value = amd_pstate.read_text().strip()
-        if amd_value == "active":
+    elif caps.amd_pstate_status is not None:
+        if caps.amd_pstate_status == "active":
             print("CPU turbo is controlled by amd-pstate-epp driver")
         # Basically, no other value should exist.
-        return False
+        return None
     else:
         print("Warning: CPU turbo is not available")
-        return False
+        return None
     
     turbo_override = get_turbo_override()
     if turbo_override != "auto":
@@ -233,76 +312,83 @@ def turbo(value: bool = None):
 
     if value is not None:
         try: f.write_text(f"{int(value ^ inverse)}\n")
-        except PermissionError:
+        except OSError:
             print("Warning: Changing CPU turbo is not supported. Skipping.")
-            return False
+            return None
 
     return bool(int(f.read_text().strip())) ^ inverse
 
 def get_turbo(): print("Currently turbo boost is:", "on" if turbo() else "off")
-def set_turbo(value:bool):
-    print("Setting turbo boost:", "on" if value else "off")
-    turbo(value)
+def cpu_pressure():
+    """
+    Read pressure stall information when enabled with [daemon] psi = true, None otherwise
+    """
+    pressures = pressure_monitor.read()
+    if pressures is None: return None
+    print("Pressure (some avg10): " + ", ".join(f"{resource} {pressure.some_avg10:.1f}%" for resource, pressure in pressures.items()))
+    return pressures
 
+def load_forecast():
+    """
+    Feed new samples to the load forecaster, returns the forecast for the next interval or None if disabled
+    """
+    if not config.settings.load_forecast: return None
 
-# ignore these devices under /sys/class/power_supply/
-def get_power_supply_ignore_list():
+    load_forecaster.update(load_sampler.history)
+    forecast = load_forecaster.forecast()
+    mae = load_forecaster.mae()
+    print(
+        f"Load forecast for the next interval: {forecast.utilization}% CPU usage, {forecast.run_queue} runnable tasks"
+        + (f" (mean forecast error {mae}%)" if mae is not None else "")
+    )
+    return forecast
 
-    conf = config.get_config()
+# options a governor forced with --force decides, process rules don't override them then
+FORCED_OPTIONS = ("governor", "energy_performance_preference", "scaling_max_freq", "scaling_min_freq")
 
-    list = []
+def process_rule_override(option, value):
+    """
+    Value a matching [process_rules.<name>] section sets for option, value when no rule sets it
+    or when --force decides it
+    """
+    override = process_rules.last.get(option)
+    if override is None or override == value: return value
+    if option in FORCED_OPTIONS and get_override() != "default": return value
+    print(f'Using "{override}" {option.replace("_", " ")} for {process_rules.last.describe(option)}')
+    return override
 
-    if conf.has_section("power_supply_ignore_list"):
-        for i in conf["power_supply_ignore_list"]:
-            list.append(conf["power_supply_ignore_list"][i])
+def set_auto_turbo(profile, cpuload, state, busy=False, forecast=None):
+    """
+    Let the turbo controller decide from load and temperature, with the profile's turbo_* thresholds
+    """
+    temperature = temperatures.average()
+    # act on the forecast load when it's higher, so turbo is on before a burst peaks
+    load = max(cpuload, forecast.utilization) if forecast is not None else cpuload
+    value = turbo_controller.update(profile.turbo_settings, load, temperature, busy)
+    if not value: print(f"Optimal total CPU usage: {cpuload}%, high average core temp: {temperature:.0f}°C")
+    print(f"Turbo decision: {turbo_controller.reason}, {turbo_controller.transitions_per_hour()} transitions in the last hour")
+    set_turbo(value, state)
+
+def set_turbo(value:bool, state=None):
+    print("Setting turbo boost:", "on" if value else "off")
+    # within a daemon tick turbo is only recorded and later applied by the reconciler
+    if state is not None: state.turbo = value
+    else: turbo(value)
 
-    # these are hard coded power supplies that will always be ignored
-    list.append("hidpp_battery")
-    return list
 
+# ignore these devices under /sys/class/power_supply/
+def get_power_supply_ignore_list(): return power_supply_index.ignore_list()
 
 def charging():
     """
     get charge state: is battery charging or discharging
     """
-    # sort it so AC is 'always' first
-    if os.path.exists(Path(POWER_SUPPLY_DIR)):
-        power_supplies = sorted(os.listdir(Path(POWER_SUPPLY_DIR)))
-    else: return True # no sysfs entries, nothing to do.
-    POWER_SUPPLY_IGNORELIST = get_power_supply_ignore_list()
-
-    # check if we found power supplies. on a desktop these are not found and we assume we are on a powercable.
-    if len(power_supplies) == 0: return True # nothing found, so nothing to check
-
-    # we found some power supplies, lets check their state
-    for supply in power_supplies:
-        # Check if supply is in ignore list, if found in ignore list, skip it.
-        if any(item in supply for item in POWER_SUPPLY_IGNORELIST): continue
-
-        power_supply_type_path = Path(POWER_SUPPLY_DIR + supply + "/type")
-        if not power_supply_type_path.exists(): continue
-        with open(power_supply_type_path) as f: supply_type = f.read()[:-1]
-
-        if supply_type == "Mains":
-            # we found an AC
-            power_supply_online_path = Path(POWER_SUPPLY_DIR + supply + "/online")
-            if not power_supply_online_path.exists(): continue
-            with open(power_supply_online_path) as f:
-                if int(f.read()[:-1]) == 1: return True # we are definitely charging
-        elif supply_type == "Battery":
-            # we found a battery, check if its being discharged
-            power_supply_status_path = Path(POWER_SUPPLY_DIR + supply + "/status")
-            if not power_supply_status_path.exists(): continue
-            with open(power_supply_status_path) as f:
-                # we found a discharging battery
-                if str(f.read()[:-1]) == "Discharging": return False
-
-    return True # we cannot determine discharging state, assume we are on powercable
+    return power_supply_index.charging()
 
 def get_current_gov():
     return print(
         "Currently using:",
-        getoutput("cpufreqctl.auto-cpufreq --governor").strip().split(" ")[0],
+        backend.get_governor(0) or "",
         "governor",
     )
 
@@ -367,7 +453,7 @@ def deploy_daemon_performance():
     print("\n" + "-" * 21 + " Deploying auto-cpufreq as a daemon (performance) " + "-" * 22 + "\n")
 
     # check that performance is in scaling_available_governors
-    if "performance" not in AVAILABLE_GOVERNORS_SORTED:
+    if "performance" not in available_governors_sorted():
         print("\"performance\" governor is unavailable on this system, run:\n"
             "sudo sudo auto-cpufreq --install\n\n"
             "to install auto-cpufreq using default \"balanced\" governor.\n")
@@ -415,21 +501,22 @@ def remove_daemon():
     # remove auto-cpufreq-remove
     os.remove("/usr/local/bin/auto-cpufreq-remove")
 
-    # delete override pickle if it exists
-    if os.path.exists(governor_override_state):  os.remove(governor_override_state)
+    # delete stored overrides
+    overrides.remove()
 
     # delete stats file
     if auto_cpufreq_stats_path.exists():
         if auto_cpufreq_stats_file is not None: auto_cpufreq_stats_file.close()
         auto_cpufreq_stats_path.unlink()
+    Path(f"{auto_cpufreq_stats_path}.1").unlink(missing_ok=True) # rotated stats
 
     cpufreqctl_restore() # restore original cpufrectl script
 
 def gov_check():
-    for gov in AVAILABLE_GOVERNORS:
-        if gov not in ALL_GOVERNORS:
-            print("\n" + "-" * 18 + " Checking for necessary scaling governors " + "-" * 19 + "\n")
-            sys.exit("ERROR:\n\nCouldn't find any of the necessary scaling governors.\n")
+    governors = available_governors()
+    if not governors or any(gov not in ALL_GOVERNORS for gov in governors):
+        print("\n" + "-" * 18 + " Checking for necessary scaling governors " + "-" * 19 + "\n")
+        sys.exit("ERROR:\n\nCouldn't find any of the necessary scaling governors.\n")
 
 def root_check():
     if not os.geteuid() == 0:
@@ -438,30 +525,39 @@ def root_check():
         footer()
         exit(1)
 
-def countdown(s):
+async def countdown(s, wakeups):
+    """
+    Wait s seconds before the next refresh on the daemon's event loop, returns early when an event
+    source (power supply uevents, the cpu pressure trigger, process events, config file changes) wakes
+    it up. Returns the reasons of the wakeups, empty after s seconds
+    """
     # Fix for wrong stats output and "TERM environment variable not set"
     os.environ["TERM"] = "xterm"
 
     print("\t\t\"auto-cpufreq\" is about to refresh ", end = "")
 
-    # empty log file if size is larger then 10mb
-    if auto_cpufreq_stats_file is not None:
-        log_size = os.path.getsize(auto_cpufreq_stats_path)
-        if log_size >= 1e+7:
-            auto_cpufreq_stats_file.seek(0)
-            auto_cpufreq_stats_file.truncate(0)
-
     # auto-refresh counter
-    for remaining in range(s, -1, -1):
-        if remaining <= 3 and remaining >= 0: print(".", end="", flush=True)
-        sleep(s/3)
-
-    print("\n\t\tExecuted on:", getoutput('date'))
+    reasons = set()
+    for _ in range(3):
+        print(".", end="", flush=True)
+        reasons = await wakeups.wait(s/3)
+        if reasons: break
+
+    messages = {
+        "power supply": "Power supply change detected",
+        "pressure": "CPU pressure detected",
+        "process": "Process matching a process rule started or exited",
+        "config": "Config file change detected",
+    }
+    for reason in sorted(reasons): print(f"\n\t\t{messages.get(reason, reason)}, refreshing now")
+    print("\n\t\tExecuted on:", strftime("%a %b %e %H:%M:%S %Z %Y"))
+    return reasons
 
 # get cpu usage + system load for (last minute)
-def get_load():    
-    cpuload = psutil.cpu_percent(interval=1) # get CPU utilization as a percentage
-    load1m, _, _ = os.getloadavg() # get system/CPU load
+def get_load(snapshot=None):
+    # get CPU utilization as a percentage and system/CPU load from the (background) load sampler
+    if snapshot is None: snapshot = load_sampler.snapshot()
+    cpuload, load1m = snapshot.total, snapshot.load1m
 
     print("\nTotal CPU usage:", cpuload, "%")
     print("Total system load: {:.2f}".format(load1m))
@@ -473,178 +569,321 @@ def get_load():
 
 def display_system_load_avg(): print(" (load average: {:.2f}, {:.2f}, {:.2f})".format(*os.getloadavg()))
 
+@dataclass
+class DesiredState:
+    """
+    Knob values one tick wants applied, None means the knob is left untouched
+    """
+    governor: str | None = None
+    epp: str | None = None
+    epb: str | None = None
+    platform_profile: str | None = None
+    turbo: bool | None = None
+    max_freq: int | None = None
+    min_freq: int | None = None
+
+# read back value of a per cpu knob the cpus report different values for
+MIXED = object()
+
+class StateReconciler:
+    """
+    Diffs the desired state of a tick against what was last applied and what sysfs
+    reports, and only writes the knobs which actually differ.
+    Field order of DesiredState is the write order (governor before EPP, max before min freq).
+    A reconciler for a cluster only handles the cpus given, and only its per cpu knobs.
+    """
+    def __init__(self, cpus=None):
+        self.cpus = cpus
+        self.applied = DesiredState()
+        self.writes_performed = 0
+        self.writes_skipped = 0
+        self.backend_writes = 0 # writes the backend performed during the last apply
+
+    def read_back(self) -> DesiredState:
+        def same(values):
+            # per cpu values are only in sync if all cpus report the same value
+            values = set((values or "").split())
+            if not values: return None
+            return values.pop() if len(values) == 1 else MIXED
+
+        no_turbo, boost = backend.get_no_turbo(), backend.get_boost()
+        return DesiredState(
+            governor=same(backend.get_governor(self.cpus)),
+            epp=same(backend.get_epp(self.cpus)),
+            epb=same(backend.get_epb(self.cpus)),
+            platform_profile=backend.get_platform_profile(),
+            turbo=(not no_turbo) if no_turbo is not None else (bool(boost) if boost is not None else None),
+            max_freq=same(backend.get_frequency_max_per_policy(self.cpus)),
+            min_freq=same(backend.get_frequency_min_per_policy(self.cpus)),
+        )
+
+    def _in_sync(self, knob: str, value, current) -> bool:
+        if current is MIXED: return False # cpus disagree, write them all
+        if current is None: return getattr(self.applied, knob) == value # knob can't be read back
+        if knob == "epb": return parse_epb(value) == parse_epb(current)
+        return str(value) == str(current)
+
+    @staticmethod
+    def _turbo_control() -> bool:
+        # without no_turbo or boost (e.g. amd-pstate-epp boosting on its own) there is nothing to write
+        caps = capabilities.get()
+        return bool(caps.no_turbo or caps.boost)
+
+    def _write(self, knob: str, value) -> bool:
+        if knob == "governor": return backend.set_governor(value, self.cpus)
+        if knob == "epp": return backend.set_epp(value, self.cpus)
+        if knob == "epb": return backend.set_epb(value, self.cpus)
+        if knob == "platform_profile": return backend.set_platform_profile(value)
+        if knob == "turbo": return turbo(value) == value # prints its own warning when turbo can't be changed
+        if knob in ("max_freq", "min_freq"):
+            print(f'Setting {"maximum" if knob == "max_freq" else "minimum"} CPU frequency to {round(value/1000)} Mhz')
+            return (backend.set_frequency_max if knob == "max_freq" else backend.set_frequency_min)(value, self.cpus)
+        return False
+
+    def apply(self, desired: DesiredState) -> list[str]:
+        """
+        Apply desired state with the minimal set of writes, returns names of the written knobs
+        """
+        current = self.read_back()
+        backend_writes = backend.writes
+        written = []
+        for field in fields(DesiredState):
+            value = getattr(desired, field.name)
+            if value is None: continue
+            if field.name == "turbo" and not self._turbo_control(): continue
+            if self._in_sync(field.name, value, getattr(current, field.name)):
+                self.writes_skipped += 1
+                setattr(self.applied, field.name, value)
+                continue
+            self.writes_performed += 1
+            if self._write(field.name, value):
+                setattr(self.applied, field.name, value)
+                written.append(field.name)
+            else:
+                setattr(self.applied, field.name, None)
+                print(f"Failed to set {field.name.replace('_', ' ')} to {value}")
+        self.backend_writes = backend.writes - backend_writes
+        return written
+
+    def print_stats(self, clusters=()) -> None:
+        reconcilers = [self, *clusters]
+        print(
+            f"Knob writes: {sum(r.writes_performed for r in reconcilers)} performed, "
+            f"{sum(r.writes_skipped for r in reconcilers)} skipped (unchanged), "
+            f"{sum(r.backend_writes for r in reconcilers)} {backend.name} writes this tick"
+        )
+
+reconciler = StateReconciler()
+# one reconciler per cluster with [<profile>.<cluster>] settings
+cluster_reconcilers: dict[str, StateReconciler] = {}
+
+def cluster_state(profile, state, cluster, forecast=None):
+    """
+    Desired governor/EPP/frequencies of one cluster: the profile's values, overridden by its
+    [<profile>.<cluster>] section, where the cluster's own load picks the idle frequency cap
+    """
+    section = f"{profile.name}.{cluster.name}"
+    max_limit, min_limit = backend.frequency_max_limit(cluster.cpus), backend.frequency_min_limit(cluster.cpus)
+    desired = DesiredState(governor=state.governor, epp=state.epp, max_freq=state.max_freq, min_freq=state.min_freq)
+    # e-cores usually can't reach the p-core limits, the kernel would clamp the value and the knob would never be in sync
+    if desired.max_freq is not None and max_limit is not None: desired.max_freq = min(desired.max_freq, max_limit)
+    if desired.min_freq is not None and min_limit is not None: desired.min_freq = max(desired.min_freq, min_limit)
+    settings = profile.clusters.get(cluster.name)
+    if settings is None: return desired
+
+    if settings.governor is not None: desired.governor = settings.governor
+    if settings.energy_performance_preference is not None:
+        if state.epp is None: print(f"Not setting EPP for {cluster.name} (not supported or dynamic boosting is enabled)")
+        else: desired.epp = settings.energy_performance_preference
+
+    for option, field_name in (("scaling_max_freq", "max_freq"), ("scaling_min_freq", "min_freq"), ("idle_scaling_max_freq", None)):
+        value = getattr(settings, option)
+        if value is None: continue
+        if min_limit is not None and max_limit is not None and not min_limit <= value <= max_limit:
+            print(f"Given value for '{option}' in [{section}] is not within the allowed frequencies {min_limit}-{max_limit} kHz")
+            continue
+        if field_name is not None: setattr(desired, field_name, value)
+        elif settings.idle_load_threshold is not None:
+            load = cluster.load(load_sampler.history)
+            # a burst forecast for the cluster lifts the cap before it peaks
+            if forecast is not None: load = max(load, forecast.cpus(cluster.cpus))
+            if load < settings.idle_load_threshold:
+                print(f"Cluster {cluster.name} is idle ({load}% < {settings.idle_load_threshold:g}%), capping its frequency")
+                desired.max_freq = value
+    if desired.min_freq is not None and desired.max_freq is not None: desired.min_freq = min(desired.min_freq, desired.max_freq)
+    return desired
+
+def apply_state(profile, state, forecast=None):
+    """
+    Apply the tick's desired state, governor/EPP/frequencies are set per cluster
+    when the profile has a [<profile>.<cluster>] section for any detected cluster
+    """
+    cluster_list = clusters.get()
+    if not any(cluster.name in profile.clusters for cluster in cluster_list):
+        reconciler.apply(state)
+        reconciler.print_stats()
+        return
+    if backend.name != "sysfs":
+        print(f"Warning: per-cluster settings need direct sysfs access, applying [{profile.name}] settings to all cpus")
+        reconciler.apply(state)
+        reconciler.print_stats()
+        return
+
+    for cluster in cluster_list:
+        desired = cluster_state(profile, state, cluster, forecast)
+        print(
+            f'Cluster {cluster.name} (cpus {",".join(map(str, cluster.cpus))}, {cluster.load(load_sampler.history)}% load): '
+            f'"{desired.governor}" governor' + (f', "{desired.epp}" EPP' if desired.epp else "")
+        )
+        cluster_reconciler = cluster_reconcilers.get(cluster.name)
+        if cluster_reconciler is None or cluster_reconciler.cpus != cluster.cpus:
+            cluster_reconciler = cluster_reconcilers[cluster.name] = StateReconciler(cluster.cpus)
+        cluster_reconciler.apply(desired)
+    # the remaining knobs (EPB, platform profile, turbo) are system wide
+    reconciler.apply(replace(state, governor=None, epp=None, max_freq=None, min_freq=None))
+    reconciler.print_stats([cluster_reconcilers[cluster.name] for cluster in cluster_list])
+
 # set minimum and maximum CPU frequencies
-def set_frequencies(power_supply):
+def set_frequencies(profile, state):
     """
     Sets frequencies:
      - if option is used in auto-cpufreq.conf: use configured value
      - if option is disabled/no conf file used: set default frequencies
-    Frequency setting is validated on each run and only applied when needed
-    Caller passes the active profile ("battery" or "charger").
+    Frequency setting is validated on each run and only applied by the reconciler when needed
+    Caller passes the active profile and the tick's desired state.
     """
     frequency = {
-        "scaling_max_freq": {
-            "cmdargs": "--frequency-max",
-            "minmax": "maximum",
-        },
-        "scaling_min_freq": {
-            "cmdargs": "--frequency-min",
-            "minmax": "minimum",
-        },
+        "scaling_max_freq": {"field": "max_freq"},
+        "scaling_min_freq": {"field": "min_freq"},
     }
-    set_frequencies.max_limit = int(getoutput(f"cpufreqctl.auto-cpufreq --frequency-max-limit"))
-    set_frequencies.min_limit = int(getoutput(f"cpufreqctl.auto-cpufreq --frequency-min-limit"))
-
-    conf = config.get_config()
+    set_frequencies.max_limit = backend.frequency_max_limit()
+    set_frequencies.min_limit = backend.frequency_min_limit()
+    # without cpuinfo_min/max_freq values can't be checked, they're used as given
+    limits_known = set_frequencies.min_limit is not None and set_frequencies.max_limit is not None
 
     for freq_type in frequency.keys():
-        if freq_type == "scaling_max_freq":
-            curr_freq = int(getoutput(f"cpufreqctl.auto-cpufreq --frequency-max"))
-            value = set_frequencies.max_limit
-        else:
-            curr_freq = int(getoutput(f"cpufreqctl.auto-cpufreq --frequency-min"))
-            value = set_frequencies.min_limit
-
-        try:
-            if conf.has_option(power_supply, freq_type):
-                raw_value = conf[power_supply][freq_type].strip()
-                frequency[freq_type]["value"] = int(raw_value)
-            else:
-                frequency[freq_type]["value"] = value
-        except ValueError:
-            print(f"Invalid value for '{freq_type}': {raw_value}")
-            exit(1)
+        value = set_frequencies.max_limit if freq_type == "scaling_max_freq" else set_frequencies.min_limit
+        configured = getattr(profile, freq_type)
 
-        if not set_frequencies.min_limit <= frequency[freq_type]["value"] <= set_frequencies.max_limit:
+        # the limits are the hardware's, a configured value can only be checked against them here
+        if configured is not None and limits_known and not set_frequencies.min_limit <= configured <= set_frequencies.max_limit:
             print(
-                f"Given value for '{freq_type}' is not within the allowed frequencies {set_frequencies.min_limit}-{set_frequencies.max_limit} kHz"
+                f"Given value for '{freq_type}' is not within the allowed frequencies {set_frequencies.min_limit}-{set_frequencies.max_limit} kHz, using {value} kHz"
             )
-            exit(1)
+        elif configured is not None: value = configured
 
-        if curr_freq == frequency[freq_type]["value"]: continue
+        setattr(state, frequency[freq_type]["field"], value)
 
-        print(f'Setting {frequency[freq_type]["minmax"]} CPU frequency to {round(frequency[freq_type]["value"]/1000)} Mhz')
-        # set the frequency
-        run(f"cpufreqctl.auto-cpufreq {frequency[freq_type]['cmdargs']} --set={frequency[freq_type]['value']}", shell=True)
-
-def set_platform_profile(conf, profile):
-    if not conf.has_option(profile, "platform_profile"):
+    # running processes matching a rule may override the configured frequencies
+    for freq_type in frequency.keys():
+        value = process_rules.last.get(freq_type)
+        if value is None or get_override() != "default": continue
+        if limits_known and not set_frequencies.min_limit <= value <= set_frequencies.max_limit:
+            print(f"Given value for '{freq_type}' in [process_rules.{process_rules.last.sources[freq_type]}] is not within the allowed frequencies {set_frequencies.min_limit}-{set_frequencies.max_limit} kHz")
+            continue
+        setattr(state, frequency[freq_type]["field"], process_rule_override(freq_type, getattr(state, frequency[freq_type]["field"])))
+    if state.min_freq is not None and state.max_freq is not None: state.min_freq = min(state.min_freq, state.max_freq)
+
+def set_platform_profile(profile, state):
+    if profile.platform_profile is None:
         return
 
-    if not Path("/sys/firmware/acpi/platform_profile").exists():
+    if not capabilities.get().platform_profile:
         print('Not setting Platform Profile (not supported by system)')
         return
 
-    pp = conf[profile]["platform_profile"]
-
-    if not hasattr(set_platform_profile, "last_applied_platform_profile"):
-        set_platform_profile.last_applied_platform_profile = {}
-
-    def is_platform_profile_enforced():
-        try:
-            return conf.getboolean(profile, "enforce_platform_profile", fallback=True)
-        except ValueError:
-            raw_value = conf[profile].get("enforce_platform_profile", "")
-            print(
-                f"Invalid boolean value for 'enforce_platform_profile' in profile '{profile}': "
-                f"{raw_value!r}. Using default value True."
-            )
-            return True
+    pp = profile.platform_profile
 
     global last_applied_config_section
     if (
-        not is_platform_profile_enforced()
-        and last_applied_config_section == profile
-        and set_platform_profile.last_applied_platform_profile.get(profile) == pp
+        not profile.enforce_platform_profile
+        and last_applied_config_section == profile.name
+        and reconciler.applied.platform_profile == pp
     ):
         return
 
     print(f'Setting to use: "{pp}" Platform Profile')
-    result = run(f"cpufreqctl.auto-cpufreq --pp --set={pp}", shell=True)
-    if result.returncode != 0:
-        print(f"Failed to set platform profile to {pp}")
-        return
-    set_platform_profile.last_applied_platform_profile[profile] = pp
+    state.platform_profile = pp
 
-def set_energy_perf_bias(conf, profile):
-    if Path("/sys/devices/system/cpu/intel_pstate").exists() is False:
+def set_energy_perf_bias(profile, state):
+    if not capabilities.get().intel_pstate:
         print('Not setting EPB (not supported by system)')
         return
-    epb = "balance_performance" if profile == "charger" else "balance_power"
-    if conf.has_option(profile, "energy_perf_bias"):
-        epb = conf[profile]["energy_perf_bias"]
+    epb = "balance_performance" if profile.name == "charger" else "balance_power"
+    if profile.energy_perf_bias is not None:
+        epb = profile.energy_perf_bias
 
-    run(f"cpufreqctl.auto-cpufreq --epb --set={epb}", shell=True)
+    state.epb = epb
     print(f'Setting to use: "{epb}" EPB')
 
 
 def set_powersave():
-    conf = config.get_config()
-    gov = conf["battery"]["governor"] if conf.has_option("battery", "governor") else AVAILABLE_GOVERNORS_SORTED[-1]
+    profile = config.profile("battery")
+    gov = profile.governor or available_governors_sorted()[-1]
+    gov = process_rule_override("governor", gov)
     print(f'Setting to use: "{gov}" governor')
     if get_override() != "default": print("Warning: governor overwritten using `--force` flag.")
-    run(f"cpufreqctl.auto-cpufreq --governor --set={gov}", shell=True)
+    state = DesiredState(governor=gov)
+    caps = capabilities.get()
 
-    if Path("/sys/devices/system/cpu/cpu0/cpufreq/energy_performance_preference").exists() is False:
+    if not caps.epp:
         print('Not setting EPP (not supported by system)')
     else:
-        dynboost_enabled = Path("/sys/devices/system/cpu/intel_pstate/hwp_dynamic_boost").exists()
-
-        if dynboost_enabled:
-            dynboost_enabled = bool(int(
-                os.popen("cat /sys/devices/system/cpu/intel_pstate/hwp_dynamic_boost").read()
-            ))
-
-        if dynboost_enabled: print('Not setting EPP (dynamic boosting is enabled)')
+        if caps.hwp_dynamic_boost: print('Not setting EPP (dynamic boosting is enabled)')
         else:
-            if conf.has_option("battery", "energy_performance_preference"):
-                epp = conf["battery"]["energy_performance_preference"]
-                run(f"cpufreqctl.auto-cpufreq --epp --set={epp}", shell=True)
+            if profile.energy_performance_preference is not None:
+                epp = profile.energy_performance_preference
+                state.epp = epp
                 print(f'Setting to use: "{epp}" EPP')
             else:
-                run("cpufreqctl.auto-cpufreq --epp --set=balance_power", shell=True)
+                state.epp = "balance_power"
                 print('Setting to use: "balance_power" EPP')
 
-    set_energy_perf_bias(conf, "battery")
-    set_platform_profile(conf, "battery")
+    if state.epp is not None: state.epp = process_rule_override("energy_performance_preference", state.epp)
+    set_energy_perf_bias(profile, state)
+    set_platform_profile(profile, state)
     global last_applied_config_section
     last_applied_config_section = "battery"
 
 
-    cpuload, load1m= get_load()
+    snapshot = load_sampler.snapshot() # every metric of this tick comes from the same sample
+    cpuload, load1m = get_load(snapshot)
+    forecast = load_forecast()
+    pressures = cpu_pressure()
 
-    auto = conf["battery"]["turbo"] if conf.has_option("battery", "turbo") else "auto"
-    auto = get_turbo_override() if (get_turbo_override() != "auto") else auto # Override turbo if override file is present, otherwise stick to config.
+    auto = profile.turbo
+    auto = process_rule_override("turbo", auto)
+    turbo_override = get_turbo_override()
+    auto = turbo_override if turbo_override != "auto" else auto # Override turbo if set with --turbo, otherwise stick to config.
 
     if auto == "always":
         print("Configuration file enforces turbo boost")
-        set_turbo(True)
+        set_turbo(turbo_controller.force(True, "enforced"), state)
     elif auto == "never":
         print("Configuration file disables turbo boost")
-        set_turbo(False)
+        set_turbo(turbo_controller.force(False, "disabled"), state)
     else:
-        if psutil.cpu_percent(percpu=False, interval=0.01) >= 30.0 or isclose(
-            max(psutil.cpu_percent(percpu=True, interval=0.01)), 100
+        if snapshot.total >= 30.0 or isclose(
+            snapshot.max_core, 100
         ): print("High CPU load", end="")
         elif load1m > powersave_load_threshold: print("High system load", end="")
+        elif pressure_monitor.stalled(pressures): print("High CPU pressure", end="")
         else: print("Load optimal", end="")
         display_system_load_avg()
 
-        if cpuload >= 20: set_turbo(True) # high cpu usage trigger
-        else: # set turbo state based on average of all core temperatures
-            from auto_cpufreq.modules.system_info import SystemInfo
-
-            print(f"Optimal total CPU usage: {cpuload}%, high average core temp: {SystemInfo.avg_temp()}°C")
-            set_turbo(False)
+        # on battery only the cpu usage triggers turbo
+        set_auto_turbo(profile, cpuload, state, forecast=forecast)
 
-    set_frequencies("battery")
+    set_frequencies(profile, state)
+    apply_state(profile, state, forecast)
     footer()
 
 def mon_powersave():
-    cpuload, load1m = get_load()
+    snapshot = load_sampler.snapshot() # every metric of this tick comes from the same sample
+    cpuload, load1m = get_load(snapshot)
 
-    if psutil.cpu_percent(percpu=False, interval=0.01) >= 30.0 or isclose(
-        max(psutil.cpu_percent(percpu=True, interval=0.01)), 100
+    if snapshot.total >= 30.0 or isclose(
+        snapshot.max_core, 100
     ): print("High CPU load", end="")
     elif load1m > powersave_load_threshold: print("High system load", end="")
     else: print("Load optimal", end="")
@@ -661,119 +900,104 @@ def mon_powersave():
     footer()
 
 def set_performance():
-    conf = config.get_config()
-    gov = conf["charger"]["governor"] if conf.has_option("charger", "governor") else AVAILABLE_GOVERNORS_SORTED[0]
+    profile = config.profile("charger")
+    gov = profile.governor or available_governors_sorted()[0]
+    gov = process_rule_override("governor", gov)
 
     print(f'Setting to use: "{gov}" governor')
     if get_override() != "default": print("Warning: governor overwritten using `--force` flag.")
-    run("cpufreqctl.auto-cpufreq --governor --set="+gov, shell=True)
+    state = DesiredState(governor=gov)
+    caps = capabilities.get()
 
-    if not Path("/sys/devices/system/cpu/cpu0/cpufreq/energy_performance_preference").exists():
+    if not caps.epp:
         print('Not setting EPP (not supported by system)')
     else:
-        if Path("/sys/devices/system/cpu/intel_pstate").exists():
-            dynboost_enabled = Path("/sys/devices/system/cpu/intel_pstate/hwp_dynamic_boost").exists()
-
-            if dynboost_enabled:
-                dynboost_enabled = bool(int(
-                    os.popen("cat /sys/devices/system/cpu/intel_pstate/hwp_dynamic_boost").read()
-                ))
-
-            if dynboost_enabled: print('Not setting EPP (dynamic boosting is enabled)')
+        if caps.intel_pstate:
+            if caps.hwp_dynamic_boost: print('Not setting EPP (dynamic boosting is enabled)')
             else:
-                intel_pstate_status_path = "/sys/devices/system/cpu/intel_pstate/status"
-
-                if conf.has_option("charger", "energy_performance_preference"):
-                    epp = conf["charger"]["energy_performance_preference"]
+                if profile.energy_performance_preference is not None:
+                    epp = profile.energy_performance_preference
 
-                    if Path(intel_pstate_status_path).exists() and open(intel_pstate_status_path, 'r').read().strip() == "active" and epp != "performance" and gov == "performance":
+                    if caps.pstate_active and epp != "performance" and gov == "performance":
                         print(f'Warning "{epp}" EPP cannot be used in performance governor')
                         print('Overriding EPP to "performance"')
                         epp = "performance"
 
-                    run(f"cpufreqctl.auto-cpufreq --epp --set={epp}", shell=True)
+                    state.epp = epp
                     print(f'Setting to use: "{epp}" EPP')
                 else:
-                    if Path(intel_pstate_status_path).exists() and open(intel_pstate_status_path, 'r').read().strip() == "active":
-                        run("cpufreqctl.auto-cpufreq --epp --set=performance", shell=True)
+                    if caps.pstate_active:
+                        state.epp = "performance"
                         print('Setting to use: "performance" EPP')
                     else:
-                        run("cpufreqctl.auto-cpufreq --epp --set=balance_performance", shell=True)
+                        state.epp = "balance_performance"
                         print('Setting to use: "balance_performance" EPP')
-        elif Path("/sys/devices/system/cpu/amd_pstate").exists():
-            amd_pstate_status_path = "/sys/devices/system/cpu/amd_pstate/status"
+        elif caps.amd_pstate:
+            if profile.energy_performance_preference is not None:
+                epp = profile.energy_performance_preference
 
-            if conf.has_option("charger", "energy_performance_preference"):
-                epp = conf["charger"]["energy_performance_preference"]
-
-                if Path(amd_pstate_status_path).exists() and open(amd_pstate_status_path, 'r').read().strip() == "active" and epp != "performance" and gov == "performance":
+                if caps.pstate_active and epp != "performance" and gov == "performance":
                     print(f'Warning "{epp} EPP cannot be used in performance governor')
                     print('Overriding EPP to "performance"')
                     epp = "performance"
 
-                run(f"cpufreqctl.auto-cpufreq --epp --set={epp}", shell=True)
+                state.epp = epp
                 print(f'Setting to use: "{epp}" EPP')
             else:
-                if Path(amd_pstate_status_path).exists() and open(amd_pstate_status_path, 'r').read().strip() == "active":
-                    run("cpufreqctl.auto-cpufreq --epp --set=performance", shell=True)
+                if caps.pstate_active:
+                    state.epp = "performance"
                     print('Setting to use: "performance" EPP')
                 else:
-                    run("cpufreqctl.auto-cpufreq --epp --set=balance_performance", shell=True)
+                    state.epp = "balance_performance"
                     print('Setting to use: "balance_performance" EPP')
     
-    set_energy_perf_bias(conf, "charger")
-    set_platform_profile(conf, "charger")
+    if state.epp is not None: state.epp = process_rule_override("energy_performance_preference", state.epp)
+    set_energy_perf_bias(profile, state)
+    set_platform_profile(profile, state)
     global last_applied_config_section
     last_applied_config_section = "charger"
 
-    cpuload, load1m = get_load()
-    auto = conf["charger"]["turbo"] if conf.has_option("charger", "turbo") else "auto"
-    auto = get_turbo_override() if (get_turbo_override() != "auto") else auto # Override turbo if override file is present, otherwise stick to config.
+    snapshot = load_sampler.snapshot() # every metric of this tick comes from the same sample
+    cpuload, load1m = get_load(snapshot)
+    forecast = load_forecast()
+    pressures = cpu_pressure()
+    auto = profile.turbo
+    auto = process_rule_override("turbo", auto)
+    turbo_override = get_turbo_override()
+    auto = turbo_override if turbo_override != "auto" else auto # Override turbo if set with --turbo, otherwise stick to config.
 
     if auto == "always":
         print("Configuration file enforces turbo boost")
-        set_turbo(True)
+        set_turbo(turbo_controller.force(True, "enforced"), state)
     elif auto == "never":
         print("Configuration file disables turbo boost")
-        set_turbo(False)
+        set_turbo(turbo_controller.force(False, "disabled"), state)
     else:
-        from auto_cpufreq.modules.system_info import SystemInfo
-
-        if (
-            psutil.cpu_percent(percpu=False, interval=0.01) >= 20.0
-            or max(psutil.cpu_percent(percpu=True, interval=0.01)) >= 75
-        ):
-            print("High CPU load", end=""), display_system_load_avg()
-
-            if cpuload >= 20: set_turbo(True) # high cpu usage trigger
-            elif SystemInfo.avg_temp() >= 70: # set turbo state based on average of all core temperatures
-                print(f"Optimal total CPU usage: {cpuload}%, high average core temp: {SystemInfo.avg_temp()}°C")
-                set_turbo(False)
-            else: set_turbo(True)
-        elif load1m >= performance_load_threshold:
-
-            print("High system load", end=""), display_system_load_avg()
-            if cpuload >= 20: set_turbo(True) # high cpu usage trigger
-            elif SystemInfo.avg_temp() >= 65: # set turbo state based on average of all core temperatures
-                print(f"Optimal total CPU usage: {cpuload}%, high average core temp: {SystemInfo.avg_temp()}°C")
-                set_turbo(False)
-            else: set_turbo(True)
+        busy = True
+        if snapshot.total >= 20.0 or snapshot.max_core >= 75: print("High CPU load", end="")
+        elif load1m >= performance_load_threshold: print("High system load", end="")
+        elif pressure_monitor.stalled(pressures): print("High CPU pressure", end="")
+        elif forecast is not None and (forecast.max_core >= 75 or forecast.run_queue >= performance_load_threshold):
+            print("Rising load (forecast)", end="")
         else:
-            print("Load optimal", end=""), display_system_load_avg()
-            if cpuload >= 20: set_turbo(True) # high cpu usage trigger
-            else: # set turbo state based on average of all core temperatures
-                print(f"Optimal total CPU usage: {cpuload}%, high average core temp: {SystemInfo.avg_temp()}°C")
-                set_turbo(False)
-    set_frequencies("charger")
+            print("Load optimal", end="")
+            busy = False
+        display_system_load_avg()
+
+        # on AC high load keeps turbo on as long as the cores aren't too hot
+        set_auto_turbo(profile, cpuload, state, busy, forecast)
+    set_frequencies(profile, state)
+    apply_state(profile, state, forecast)
     footer()
 
 def mon_performance():
     from auto_cpufreq.modules.system_info import SystemInfo
-    cpuload, load1m = get_load()
+    snapshot = load_sampler.snapshot() # every metric of this tick comes from the same sample
+    cpuload, load1m = get_load(snapshot)
 
     if (
-        psutil.cpu_percent(percpu=False, interval=0.01) >= 20.0
-        or max(psutil.cpu_percent(percpu=True, interval=0.01)) >= 75
+        snapshot.total >= 20.0
+        or snapshot.max_core >= 75
     ):
         print("High CPU load", end=""), display_system_load_avg()
         
@@ -822,9 +1046,16 @@ def set_autofreq():
     print("\n" + "-" * 28 + " CPU frequency scaling " + "-" * 28 + "\n")
 
     # determine which governor should be used
+    rules = process_rules.evaluate(config.get_config())
     override = get_override()
     if override == "powersave": set_powersave()
     elif override == "performance": set_performance()
+    elif rules.get("profile") == "charger":
+        print(f"Using charger profile for {rules.describe('profile')}\n")
+        set_performance()
+    elif rules.get("profile") == "battery":
+        print(f"Using battery profile for {rules.describe('profile')}\n")
+        set_powersave()
     elif charging():
         print("Battery is: charging\n")
         set_performance()
@@ -843,64 +1074,40 @@ def mon_autofreq():
     if charging():
         print("Battery is: charging\n")
         get_current_gov()
-        print(f'Suggesting use of "{AVAILABLE_GOVERNORS_SORTED[0]}" governor')
+        print(f'Suggesting use of "{available_governors_sorted()[0]}" governor')
         mon_performance()
     else:
         print("Battery is: discharging\n")
         get_current_gov()
-        print(f'Suggesting use of "{AVAILABLE_GOVERNORS_SORTED[-1]}" governor')
+        print(f'Suggesting use of "{available_governors_sorted()[-1]}" governor')
         mon_powersave()
 
 def python_info():
+    import psutil
+
     print("Python:", platform.python_version())
     print("psutil package:", psutil.__version__)
     print("platform package:", platform.__version__)
     print("click package:", click.__version__)
+    import distro
     print("distro package:", distro.__version__)
 
 def device_info(): print("Computer type:", getoutput("dmidecode --string chassis-type"))
 
 def distro_info():
-    dist = "UNKNOWN distro"
-    version = "UNKNOWN version"
-    if IS_INSTALLED_WITH_SNAP:
-        try:
-            with open("/var/lib/snapd/hostfs/etc/os-release", "r") as searchfile:
-                for line in searchfile:
-                    if line.startswith("NAME="):
-                        dist = line[5 : line.find("$")].strip('"')
-                        continue
-                    elif line.startswith("VERSION="):
-                        version = line[8 : line.find("$")].strip('"')
-                        continue
-        except PermissionError as e: print(repr(e))
-        dist = f"{dist} {version}"
-    else: # get distro information
-        fdist = distro.linux_distribution()
-        dist = " ".join(x for x in fdist)
-
-    print("Linux distro: " + dist)
-    print("Linux kernel: " + platform.release())
+    facts = static_facts.get()
+    print("Linux distro: " + facts.distro)
+    print("Linux kernel: " + facts.kernel)
 
 def sysinfo():
     """
     get system information
     """
-    # processor_info
-    model_name = getoutput("grep -E 'model name' /proc/cpuinfo -m 1").split(":")[-1]
-    print(f"Processor:{model_name}")
-
-    # get core count
-    total_cpu_count = int(getoutput("nproc"))
-    print("Cores:", total_cpu_count)
-
-    # get architecture
-    cpu_arch = platform.machine()
-    print("Architecture:", cpu_arch)
-
-    # get driver
-    driver = getoutput("cpufreqctl.auto-cpufreq --driver")
-    print("Driver: " + driver)
+    facts = static_facts.get()
+    print(f"Processor: {facts.model_name}")
+    print("Cores:", facts.total_cores)
+    print("Architecture:", facts.architecture)
+    print("Driver: " + (facts.driver or "UNKNOWN"))
 
     config_path = config.path if config.has_config() else None
     if config_path is None:
@@ -910,64 +1117,22 @@ def sysinfo():
         print(f"\nUsing settings defined in {config_path}")
 
     # get usage and freq info of cpus
-    usage_per_cpu = psutil.cpu_percent(interval=1, percpu=True)
-    # psutil current freq not used, gives wrong values with offline cpu's
-    minmax_freq_per_cpu = psutil.cpu_freq(percpu=True)
+    usage_per_cpu = load_sampler.snapshot().per_cpu
 
-    # max and min freqs, psutil reports wrong max/min freqs with offline cores with percpu=False
-    max_freq = max([freq.max for freq in minmax_freq_per_cpu])
-    min_freq = min([freq.min for freq in minmax_freq_per_cpu])
     print("\n" + "-" * 30 + " Current CPU stats " + "-" * 30 + "\n")
-    print(f"CPU max frequency: {max_freq:.0f} MHz")
-    print(f"CPU min frequency: {min_freq:.0f} MHz\n")
-
-    # get coreid's and frequencies of online cpus by parsing /proc/cpuinfo
-    coreid_info = getoutput("grep -E 'processor|cpu MHz|core id' /proc/cpuinfo").split("\n")
-    cpu_core = dict()
-    freq_per_cpu = []
-    for i in range(0, len(coreid_info), 3):
-        # ensure that indices are within the valid range, before accessing the corresponding elements
-        if i + 1 < len(coreid_info): freq_per_cpu.append(float(coreid_info[i + 1].split(":")[-1]))
-        else: continue # handle the case where the index is out of range
-        # ensure that indices are within the valid range, before accessing the corresponding elements
-        cpu = int(coreid_info[i].split(":")[-1])
-        if i + 2 < len(coreid_info):
-            core = int(coreid_info[i + 2].split(":")[-1])
-            cpu_core[cpu] = core
-        else: continue # handle the case where the index is out of range
-
-    online_cpu_count = len(cpu_core)
-    offline_cpus = [str(cpu) for cpu in range(total_cpu_count) if cpu not in cpu_core]
-
-    # temperatures
-    temp_sensors = psutil.sensors_temperatures()
-    temp_per_cpu = [float("nan")] * online_cpu_count
+    print(f"CPU max frequency: {facts.max_freq:.0f} MHz" if facts.max_freq else "CPU max frequency: Unknown")
+    print(f"CPU min frequency: {facts.min_freq:.0f} MHz\n" if facts.min_freq else "CPU min frequency: Unknown\n")
+
+    # core ids of online cpus are static, only the current frequencies are read from /proc/cpuinfo
+    cpu_core = facts.core_ids
     try:
-        # the priority for CPU temp is as follows: coretemp sensor -> sensor with CPU in the label -> acpi -> k10temp
-        if "coretemp" in temp_sensors:
-            # list labels in 'coretemp'
-            core_temp_labels = [temp.label for temp in temp_sensors["coretemp"]]
-            for i, cpu in enumerate(cpu_core):
-                # get correct index in temp_sensors
-                core = cpu_core[cpu]
-                cpu_temp_index = core_temp_labels.index(f"Core {core}")
-                temp_per_cpu[i] = temp_sensors["coretemp"][cpu_temp_index].current
-        else:
-            # iterate over all sensors
-            for sensor in temp_sensors:
-                # iterate over all temperatures in the current sensor
-                for temp in temp_sensors[sensor]:
-                    if ('CPU' in temp.label or 'Tctl' in temp.label) and temp.current != 0:
-                        temp_per_cpu = [temp.current] * online_cpu_count
-                        break
-                else: continue
-                break
-            else:
-                for sensor in ["acpitz", "k10temp", "zenpower"]:
-                    if sensor in temp_sensors and temp_sensors[sensor][0].current != 0:
-                        temp_per_cpu = [temp_sensors[sensor][0].current] * online_cpu_count
-                        break
-    except Exception as e: print(repr(e))
+        with open("/proc/cpuinfo", "r") as f: freq_per_cpu = [float(line.split(":")[-1]) for line in f if line.startswith("cpu MHz")]
+    except OSError: freq_per_cpu = []
+
+    offline_cpus = [str(cpu) for cpu in facts.offline_cpus]
+
+    # temperatures, the priority for CPU temp is as follows: coretemp sensor -> sensor with CPU in the label -> acpi -> k10temp
+    temp_per_cpu = [temperatures.cpu(cpu) for cpu in cpu_core]
 
     print("Core\tUsage\tTemperature\tFrequency")
     for (cpu, usage, freq, temp) in zip(cpu_core, usage_per_cpu, freq_per_cpu, temp_per_cpu):
@@ -976,6 +1141,8 @@ def sysinfo():
     if offline_cpus: print(f"\nDisabled CPUs: {','.join(offline_cpus)}")
 
     # print current fan speed (only if > 0)
+    import psutil
+
     current_fans = list(psutil.sensors_fans())
     for current_fan in current_fans:
         fan_speed = psutil.sensors_fans()[current_fan][0].current
@@ -983,19 +1150,14 @@ def sysinfo():
             print(f"\nCPU fan speed: {fan_speed} RPM")
 
 def read_stats():
-    if os.path.isfile(auto_cpufreq_stats_path): call(["tail", "-n 50", "-f", str(auto_cpufreq_stats_path)], stderr=DEVNULL)
+    if os.path.isfile(auto_cpufreq_stats_path):
+        try:
+            for record in StatsLog(auto_cpufreq_stats_path).follow():
+                text = render_text(record)
+                if text is not None: print(text, flush=True)
+        except KeyboardInterrupt: pass
     footer()
 
-# check if program (argument) is running
-def is_running(program, argument):
-    # iterate over all processes found by psutil
-    # and find the one with name and args passed to the function
-    for p in psutil.process_iter():
-        try: cmd = p.cmdline()
-        except: continue
-        for s in filter(lambda x: program in x, cmd):
-            if argument in cmd: return True
-
 def daemon_running_msg():
     print("\n" + "-" * 24 + " auto-cpufreq running " + "-" * 30 + "\n")
     print(
@@ -1010,20 +1172,23 @@ def daemon_not_running_msg():
     )
     footer()
 
+# a running daemon holds the lock on its pidfile
+def daemon_is_running(): return daemon_lock.held()
+
 # check if auto-cpufreq --daemon is running
 def running_daemon_check():
-    if is_running("auto-cpufreq", "--daemon"):
+    if daemon_is_running():
         daemon_running_msg()
         exit(1)
-    elif IS_INSTALLED_WITH_SNAP and SNAP_DAEMON_CHECK == "enabled":
+    elif IS_INSTALLED_WITH_SNAP and snap_daemon_check() == "enabled":
         daemon_running_msg()
         exit(1)
 
 # check if auto-cpufreq --daemon is not running
 def not_running_daemon_check():
-    if not is_running("auto-cpufreq", "--daemon"):
+    if not daemon_is_running():
         daemon_not_running_msg()
         exit(1)
-    elif IS_INSTALLED_WITH_SNAP and SNAP_DAEMON_CHECK == "disabled":
+    elif IS_INSTALLED_WITH_SNAP and snap_daemon_check() == "disabled":
         daemon_not_running_msg()
         exit(1)
@@ -1,14 +1,40 @@
+from functools import cache
 from os import getenv, path
 from subprocess import getoutput
 
 ALL_GOVERNORS = ('performance', 'ondemand', 'conservative', 'schedutil', 'userspace', 'powersave') # from the highest performance to the lowest
-AVAILABLE_GOVERNORS = getoutput('cat /sys/devices/system/cpu/cpu0/cpufreq/scaling_available_governors').strip().split(' ')
-AVAILABLE_GOVERNORS_SORTED = tuple(filter(lambda gov: gov in AVAILABLE_GOVERNORS, ALL_GOVERNORS))
 
 GITHUB = "https://github.com/AdnanHodzic/auto-cpufreq"
-IS_INSTALLED_WITH_AUR = path.isfile("/etc/arch-release") and bool(getoutput("pacman -Qs auto-cpufreq"))
 IS_INSTALLED_WITH_SNAP = getenv("PKG_MARKER") == "SNAP"
 POWER_SUPPLY_DIR = "/sys/class/power_supply/"
-SNAP_DAEMON_CHECK = getoutput("snapctl get daemon")
 
 CPU_TEMP_SENSOR_PRIORITY = ("coretemp", "acpitz", "k10temp", "zenpower")
+
+# values below read sysfs or fork, they're computed when first needed instead of on every import
+
+@cache
+def available_governors() -> tuple[str, ...]:
+    try:
+        with open("/sys/devices/system/cpu/cpu0/cpufreq/scaling_available_governors", "r") as f: return tuple(f.read().split())
+    except OSError: return ()
+
+@cache
+def available_governors_sorted() -> tuple[str, ...]: return tuple(filter(lambda gov: gov in available_governors(), ALL_GOVERNORS))
+
+@cache
+def is_installed_with_aur() -> bool: return path.isfile("/etc/arch-release") and bool(getoutput("pacman -Qs auto-cpufreq"))
+
+@cache
+def snap_daemon_check() -> str: return getoutput("snapctl get daemon") if IS_INSTALLED_WITH_SNAP else ""
+
+_LAZY = {
+    "AVAILABLE_GOVERNORS": available_governors,
+    "AVAILABLE_GOVERNORS_SORTED": available_governors_sorted,
+    "IS_INSTALLED_WITH_AUR": is_installed_with_aur,
+    "SNAP_DAEMON_CHECK": snap_daemon_check,
+}
+
+def __getattr__(name):
+    # the former constants keep working for code outside this package, evaluated on first access
+    if name in _LAZY: return _LAZY[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
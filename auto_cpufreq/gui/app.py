@@ -7,7 +7,7 @@ from io import StringIO
 from subprocess import PIPE, run
 from threading import Thread
 
-from auto_cpufreq.core import check_for_update, is_running
+from auto_cpufreq.core import check_for_update, daemon_is_running
 from auto_cpufreq.globals import GITHUB, IS_INSTALLED_WITH_SNAP
 from auto_cpufreq.gui.objects import BatteryInfoBox, BluetoothBootControl, CPUFreqScalingBox, CurrentGovernorBox, DaemonNotRunningView, DropDownMenu, MonitorModeView, RadioButtonView, CPUTurboOverride, SystemStatsLabel, SystemStatisticsBox, UpdateDialog
 from auto_cpufreq.gui.objects import get_stats
@@ -114,7 +114,7 @@ class ToolWindow(Gtk.Window):
 
     def build(self):
         if IS_INSTALLED_WITH_SNAP: self.snap()
-        elif is_running("auto-cpufreq", "--daemon"): self.main()
+        elif daemon_is_running(): self.main()
         else: self.daemon_not_running()
 
     def load_css(self):
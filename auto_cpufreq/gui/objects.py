@@ -12,23 +12,28 @@ from threading import Thread
 import time
 
 from auto_cpufreq.config.config import config, find_config_file
-from auto_cpufreq.core import distro_info, get_formatted_version, get_override, get_turbo_override, sysinfo
-from auto_cpufreq.globals import GITHUB, IS_INSTALLED_WITH_AUR, IS_INSTALLED_WITH_SNAP
+from auto_cpufreq.core import auto_cpufreq_stats_path, backend, distro_info, get_formatted_version, get_overrides, sysinfo
+from auto_cpufreq.globals import GITHUB, IS_INSTALLED_WITH_SNAP, is_installed_with_aur
+from auto_cpufreq.modules.daemon_api import query
+from auto_cpufreq.modules.stats_log import StatsLog, render_text
 from auto_cpufreq.modules.system_info import system_info
 from auto_cpufreq.power_helper import bluetoothctl_exists
 
-auto_cpufreq_stats_path = ("/var/snap/auto-cpufreq/current" if IS_INSTALLED_WITH_SNAP else "/var/run") + "/auto-cpufreq.stats"
-
 def get_stats():
     if isfile(auto_cpufreq_stats_path):
-        with open(auto_cpufreq_stats_path, "r") as file: stats = [line for line in (file.readlines() [-50:])]
-        return "".join(stats)
+        stats = [render_text(record) for record in StatsLog(auto_cpufreq_stats_path).tail(50, type="log")]
+        return "".join(line + "\n" for line in stats)
+
+def daemon_overrides():
+    # ask the daemon first, it holds the overrides it is actually applying
+    state = query({"cmd": "state", "history": 0})
+    return state["overrides"] if state is not None else get_overrides()
 
 def get_version():
     # snap package
     if IS_INSTALLED_WITH_SNAP: return getoutput(r"echo \(Snap\) $SNAP_VERSION")
     # aur package
-    elif IS_INSTALLED_WITH_AUR: return getoutput("pacman -Qi auto-cpufreq | grep Version")
+    elif is_installed_with_aur(): return getoutput("pacman -Qi auto-cpufreq | grep Version")
     else:
         # source code (auto-cpufreq-installer)
         try: return get_formatted_version()
@@ -97,7 +102,7 @@ class RadioButtonView(Gtk.Box):
             else: self.set_by_app = False
 
     def set_selected(self):
-        override = get_override()
+        override = daemon_overrides()["governor"]
         match override:
             case "powersave": self.powersave.set_active(True)
             case "performance": self.performance.set_active(True)
@@ -143,7 +148,7 @@ class CPUTurboOverride(Gtk.Box):
             else: self.set_by_app = False
 
     def set_selected(self):
-        override = get_turbo_override()
+        override = daemon_overrides()["turbo"]
         match override:
             case "never": self.never.set_active(True)
             case "always": self.always.set_active(True)
@@ -223,13 +228,13 @@ class CurrentGovernorBox(Gtk.Box):
     def __init__(self):
         super().__init__(spacing=25)
         self.static = Gtk.Label(label="Current Governor", name="bold")
-        self.governor = Gtk.Label(label=getoutput("cpufreqctl.auto-cpufreq --governor").strip().split(" ")[0], halign=Gtk.Align.END)
+        self.governor = Gtk.Label(label=backend.get_governor(0) or "", halign=Gtk.Align.END)
 
         self.pack_start(self.static, False, False, 0)
         self.pack_start(self.governor, False, False, 0)
 
     def refresh(self):
-        self.governor.set_label(getoutput("cpufreqctl.auto-cpufreq --governor").strip().split(" ")[0])
+        self.governor.set_label(backend.get_governor(0) or "")
 
 class BatteryInfoBox(Gtk.Box):
     def __init__(self):
@@ -737,6 +742,7 @@ class MonitorModeView(Gtk.Box):
             self.right_box.pack_start(self._label(f"Battery status: {str(report.battery_info)}"), False, False, 0)
             battery_level = f"{report.battery_info.battery_level}%" if report.battery_info.battery_level is not None else "Unknown"
             self.right_box.pack_start(self._label(f"Battery percentage: {battery_level}"), False, False, 0)
+            if report.battery_info.combined: self.right_box.pack_start(self._label(f"Batteries: {report.battery_info.combined}"), False, False, 0)
             ac_status = "Yes" if report.battery_info.is_ac_plugged else "No" if report.battery_info.is_ac_plugged is not None else "Unknown"
             self.right_box.pack_start(self._label(f"AC plugged: {ac_status}"), False, False, 0)
             self.right_box.pack_start(self._label(f"Charging start threshold: {report.battery_info.charging_start_threshold}"), False, False, 0)
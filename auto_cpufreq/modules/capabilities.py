@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - hardware capability probe
+import os
+from dataclasses import dataclass, field
+from threading import Lock
+
+from auto_cpufreq.modules.sysfs_backend import CPU_ROOT, FIRMWARE_ROOT
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path, "r") as f: return f.read().strip()
+    except OSError: return None
+
+
+@dataclass(frozen=True)
+class Knob:
+    path: str
+    exists: bool = False
+    writable: bool = False
+    choices: tuple[str, ...] = ()
+
+    def __bool__(self) -> bool: return self.exists
+
+    @classmethod
+    def probe(cls, path: str, choices_path: str | None = None) -> "Knob":
+        exists = os.path.exists(path)
+        choices = tuple((_read(choices_path) or "").split()) if exists and choices_path else ()
+        return cls(path, exists, exists and os.access(path, os.W_OK), choices)
+
+
+@dataclass(frozen=True)
+class Capabilities:
+    driver: str | None = None
+    intel_pstate: bool = False
+    intel_pstate_status: str | None = None
+    amd_pstate: bool = False
+    amd_pstate_status: str | None = None
+    hwp_dynamic_boost: bool = False
+    governors: tuple[str, ...] = ()
+    epp: Knob = field(default_factory=lambda: Knob(""))
+    epb: Knob = field(default_factory=lambda: Knob(""))
+    platform_profile: Knob = field(default_factory=lambda: Knob(""))
+    no_turbo: Knob = field(default_factory=lambda: Knob(""))
+    boost: Knob = field(default_factory=lambda: Knob(""))
+
+    @property
+    def pstate_active(self) -> bool:
+        """
+        intel_pstate or amd-pstate-epp in active mode, where EPP other than performance can't be used with the performance governor
+        """
+        if self.intel_pstate: return self.intel_pstate_status == "active"
+        return self.amd_pstate and self.amd_pstate_status == "active"
+
+
+def probe(cpu_root: str = CPU_ROOT, firmware_root: str = FIRMWARE_ROOT) -> Capabilities:
+    cpufreq = f"{cpu_root}/cpu0/cpufreq"
+    intel_pstate = os.path.exists(f"{cpu_root}/intel_pstate")
+    dynboost = _read(f"{cpu_root}/intel_pstate/hwp_dynamic_boost")
+    return Capabilities(
+        driver=_read(f"{cpufreq}/scaling_driver"),
+        intel_pstate=intel_pstate,
+        intel_pstate_status=_read(f"{cpu_root}/intel_pstate/status"),
+        amd_pstate=os.path.exists(f"{cpu_root}/amd_pstate"),
+        amd_pstate_status=_read(f"{cpu_root}/amd_pstate/status"),
+        hwp_dynamic_boost=bool(dynboost and dynboost.isdigit() and int(dynboost)),
+        governors=tuple((_read(f"{cpufreq}/scaling_available_governors") or "").split()),
+        epp=Knob.probe(f"{cpufreq}/energy_performance_preference", f"{cpufreq}/energy_performance_available_preferences"),
+        # EPB is set through the per cpu power/energy_perf_bias file, and only used together with intel_pstate
+        epb=Knob.probe(f"{cpu_root}/cpu0/power/energy_perf_bias") if intel_pstate else Knob(f"{cpu_root}/cpu0/power/energy_perf_bias"),
+        platform_profile=Knob.probe(f"{firmware_root}/acpi/platform_profile", f"{firmware_root}/acpi/platform_profile_choices"),
+        no_turbo=Knob.probe(f"{cpu_root}/intel_pstate/no_turbo"),
+        boost=Knob.probe(f"{cpu_root}/cpufreq/boost"),
+    )
+
+
+class CapabilityProbe:
+    """
+    Holds the probed capabilities and probes again only when the cached static facts change,
+    i.e. after cpu hotplug or a driver (mode) change such as intel_pstate active -> passive,
+    so decision code branches on attributes instead of checking sysfs paths every tick.
+    """
+
+    def __init__(self, facts=None, cpu_root: str = CPU_ROOT, firmware_root: str = FIRMWARE_ROOT):
+        self.facts = facts # StaticFactsCache
+        self.cpu_root = cpu_root
+        self.firmware_root = firmware_root
+        self.probes = 0
+        self._capabilities: Capabilities | None = None
+        self._probed_for = None
+        self._lock = Lock()
+
+    def get(self) -> Capabilities:
+        with self._lock:
+            facts = self.facts.get() if self.facts is not None else None
+            if self._capabilities is None or facts is not self._probed_for:
+                self._capabilities = probe(self.cpu_root, self.firmware_root)
+                self._probed_for = facts
+                self.probes += 1
+            return self._capabilities
+
+    def refresh(self) -> Capabilities:
+        with self._lock: self._capabilities = None
+        return self.get()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - cpu cluster detection for hybrid and multi-socket systems
+from dataclasses import dataclass
+from statistics import mean
+from threading import Lock
+from typing import Sequence
+
+from auto_cpufreq.modules.load_sampler import LoadSnapshot
+from auto_cpufreq.modules.static_facts import CPU_ROOT, parse_cpu_list
+
+DEVICES_ROOT = "/sys/devices"
+# snapshots averaged for a cluster's load, so a single busy sample doesn't flip its decision
+CLUSTER_LOAD_WINDOW = 5
+
+
+@dataclass(frozen=True)
+class Cluster:
+    name: str # config sections for the cluster are named [<profile>.<name>]
+    cpus: tuple[int, ...]
+
+    def load(self, history: Sequence[LoadSnapshot], window: int = CLUSTER_LOAD_WINDOW) -> float:
+        """
+        Average usage of the cluster's cpus over the last window snapshots
+        """
+        loads = []
+        for snapshot in list(history)[-window:]:
+            usage = dict(zip(snapshot.cpu_ids, snapshot.per_cpu))
+            values = [usage[cpu] for cpu in self.cpus if cpu in usage]
+            if values: loads.append(mean(values))
+        return round(mean(loads), 1) if loads else 0.0
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path, "r") as f: return f.read().strip()
+    except OSError: return None
+
+
+def detect_clusters(online_cpus: Sequence[int], package_ids: dict[int, int], cpu_root: str = CPU_ROOT, devices_root: str = DEVICES_ROOT) -> list[Cluster]:
+    """
+    Split the online cpus into clusters, in order of preference:
+      - Intel hybrid core types (cpu_core / cpu_atom PMUs): pcores, ecores
+      - differing cpu_capacity (ARM big.LITTLE): pcores for the highest capacity, ecores for the lowest, mcores in between
+      - physical packages: package0, package1, ...
+    Returns an empty list when all cpus are alike, there is nothing to set per cluster then.
+    """
+    online = set(online_cpus)
+
+    pcores, ecores = _read(f"{devices_root}/cpu_core/cpus"), _read(f"{devices_root}/cpu_atom/cpus")
+    if pcores and ecores:
+        clusters = [Cluster("pcores", tuple(cpu for cpu in parse_cpu_list(pcores) if cpu in online)),
+                    Cluster("ecores", tuple(cpu for cpu in parse_cpu_list(ecores) if cpu in online))]
+        return [cluster for cluster in clusters if cluster.cpus]
+
+    capacities = {}
+    for cpu in sorted(online):
+        capacity = _read(f"{cpu_root}/cpu{cpu}/cpu_capacity")
+        if capacity and capacity.isdigit(): capacities[cpu] = int(capacity)
+    levels = sorted(set(capacities.values()), reverse=True)
+    if len(capacities) == len(online) and len(levels) > 1:
+        names = {levels[0]: "pcores", levels[-1]: "ecores"}
+        clusters: dict[str, list[int]] = {}
+        for cpu, capacity in capacities.items():
+            clusters.setdefault(names.get(capacity, "mcores"), []).append(cpu)
+        return [Cluster(name, tuple(cpus)) for name, cpus in clusters.items()]
+
+    packages: dict[int, list[int]] = {}
+    for cpu in sorted(online): packages.setdefault(package_ids.get(cpu, 0), []).append(cpu)
+    if len(packages) > 1: return [Cluster(f"package{package}", tuple(cpus)) for package, cpus in sorted(packages.items())]
+    return []
+
+
+class ClusterMap:
+    """
+    Detected clusters, detected again only when the cached static facts change (cpu hotplug)
+    """
+
+    def __init__(self, facts, cpu_root: str = CPU_ROOT, devices_root: str = DEVICES_ROOT):
+        self.facts = facts # StaticFactsCache
+        self.cpu_root = cpu_root
+        self.devices_root = devices_root
+        self._clusters: list[Cluster] = []
+        self._detected_for = None
+        self._lock = Lock()
+
+    def get(self) -> list[Cluster]:
+        with self._lock:
+            facts = self.facts.get()
+            if facts is not self._detected_for:
+                self._clusters = detect_clusters(facts.online_cpus, facts.package_ids, self.cpu_root, self.devices_root)
+                self._detected_for = facts
+            return self._clusters
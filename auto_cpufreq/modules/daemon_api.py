@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - local Unix socket API served by the daemon
+import json, os, socket, struct
+from collections import deque
+from typing import Any, Callable
+
+from auto_cpufreq.globals import IS_INSTALLED_WITH_SNAP
+
+if IS_INSTALLED_WITH_SNAP: SOCKET_PATH = "/var/snap/auto-cpufreq/current/auto-cpufreq.sock"
+else: SOCKET_PATH = "/run/auto-cpufreq.sock"
+
+Handler = Callable[[dict[str, Any]], dict[str, Any]]
+
+
+def _peer_uid(sock) -> int | None:
+    try:
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        return struct.unpack("3i", creds)[1]
+    except (AttributeError, OSError): return None
+
+
+class DaemonAPI:
+    """
+    Serves the daemon's latest tick snapshot, decision history and override state over a
+    Unix socket, and accepts override changes, so clients answer in one round trip instead
+    of scanning processes or sampling the system themselves.
+
+    Protocol: one JSON object per line, e.g. {"cmd": "state"}, answered by one JSON object.
+    Requests are served on the daemon's event loop, so they never see a half-applied tick.
+    """
+
+    def __init__(self, path: str = SOCKET_PATH, history: int = 60):
+        self.path = path
+        self.history: deque[dict[str, Any]] = deque(maxlen=history)
+        self._routes: dict[str, tuple[Handler, bool]] = {}
+        self._server = None # asyncio.AbstractServer
+
+    def route(self, cmd: str, handler: Handler, root_only: bool = False) -> None:
+        self._routes[cmd] = (handler, root_only)
+
+    def publish(self, tick: dict[str, Any]) -> None:
+        self.history.append(tick)
+
+    def handle(self, request: dict[str, Any], uid: int | None = None) -> dict[str, Any]:
+        cmd = request.get("cmd")
+        if cmd == "ping": return {"ok": True, "pid": os.getpid()}
+        if cmd == "state":
+            count = max(int(request.get("history", 10)), 0)
+            snapshot = self.history[-1] if self.history else None
+            history = list(self.history)[-count:] if count else []
+            overrides = self._routes["overrides"][0](request) if "overrides" in self._routes else {}
+            return {"ok": True, "snapshot": snapshot, "history": history, "overrides": overrides}
+        if cmd not in self._routes: return {"ok": False, "error": f"Unknown command: {cmd}"}
+        handler, root_only = self._routes[cmd]
+        if root_only and uid != 0: return {"ok": False, "error": "Must be run as root"}
+        return {"ok": True, **handler(request)}
+
+    async def start(self) -> bool:
+        import asyncio # only the daemon serves the API, clients just query() it
+
+        try:
+            if os.path.exists(self.path): os.unlink(self.path) # stale socket of a previous daemon
+            self._server = await asyncio.start_unix_server(self._serve, self.path, limit=64 * 1024)
+            # anyone may read the state, changing overrides is checked against the peer's uid
+            os.chmod(self.path, 0o666)
+        except OSError as e:
+            print(f"WARNING: Can't serve the daemon API on {self.path}: {e!r}")
+            self._server = None
+            return False
+        return True
+
+    async def _serve(self, reader, writer) -> None:
+        try:
+            line = await reader.readline()
+            request = json.loads(line)
+            if not isinstance(request, dict): raise ValueError("request must be a JSON object")
+            response = self.handle(request, _peer_uid(writer.get_extra_info("socket")))
+        except ValueError as e: response = {"ok": False, "error": f"Invalid request: {e}"}
+        except Exception as e: response = {"ok": False, "error": repr(e)}
+        try:
+            writer.write(json.dumps(response, default=str).encode() + b"\n")
+            await writer.drain()
+        except OSError: pass # client went away
+        finally: writer.close()
+
+    def stop(self) -> None:
+        if self._server is None: return
+        self._server.close()
+        self._server = None
+        try: os.unlink(self.path)
+        except OSError: pass
+
+
+def query(request: dict[str, Any], path: str = SOCKET_PATH, timeout: float = 1.0) -> dict[str, Any] | None:
+    """
+    Send one request to the running daemon, returns None if no daemon answered
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = sock.recv(65536)
+                if not chunk: break
+                data += chunk
+        response = json.loads(data)
+    except (OSError, ValueError): return None
+    return response if isinstance(response, dict) else None
+
+
+daemon_api = DaemonAPI()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - asyncio core of the daemon
+from math import ceil
+
+from auto_cpufreq.battery_scripts.battery import start_battery_daemon
+from auto_cpufreq.config.config import config
+from auto_cpufreq.core import active_profile, countdown, cpufreqctl, distro_info, footer, gov_check, record_tick, set_autofreq, sysinfo
+from auto_cpufreq.modules.daemon_api import daemon_api
+from auto_cpufreq.modules.event_loop import Wakeups, daemon_loop
+from auto_cpufreq.modules.load_forecast import load_forecaster
+from auto_cpufreq.modules.load_sampler import load_sampler
+from auto_cpufreq.modules.power_supply_events import power_supply_events
+from auto_cpufreq.modules.process_rules import process_rules
+from auto_cpufreq.modules.psi import pressure_monitor
+from auto_cpufreq.modules.scheduler import Cadence, Scheduler
+
+
+async def control_loop() -> None:
+    """
+    The daemon's control loop, the main task of its event loop. The config file watch, battery
+    charge thresholds, load sampling, power supply and process events and the API server all run as
+    callbacks on the same loop, and only get to run while the tick awaits its next wakeup: a config
+    reload or an override change never lands halfway through a tick, so each tick sees a single config
+    generation. Wakeups arriving together are coalesced into one tick.
+    """
+    wakeups = Wakeups()
+    start_battery_daemon(daemon_loop)
+    config.watch(daemon_loop, on_change=lambda: wakeups.wake("config"))
+    await daemon_api.start()
+    # AC/battery changes wake the tick up immediately, polling remains the fallback
+    power_supply_events.start(wakeup=wakeups.source("power supply"), loop=daemon_loop)
+    # optional: cpu pressure (PSI) wakes it up too, from a thread as asyncio can't wait for POLLPRI,
+    # the trigger is (re-)registered with each config generation's psi settings
+    pressure_wakeup = wakeups.source("pressure")
+    # so do exec/exit of processes matched by [process_rules.*] when running as root
+    process_rules.start(wakeup=wakeups.source("process"), loop=daemon_loop)
+    load_sampler.start(daemon_loop)
+
+    scheduler = Scheduler()
+    scheduler.add("gov_check", gov_check, Cadence.ONCE)
+    scheduler.add("cpufreqctl", cpufreqctl, Cadence.ONCE)
+    scheduler.add("distro_info", distro_info, Cadence.SLOW)
+    scheduler.add("sysinfo", sysinfo, Cadence.SLOW)
+    scheduler.add("set_autofreq", set_autofreq, Cadence.FAST)
+    woken: set[str] = set()
+    configured_generation = None
+    try:
+        while True:
+            footer()
+            generation = config.generation
+            # settings are validated when the config is (re)loaded, apply them only then
+            if generation != configured_generation:
+                configured_generation = generation
+                scheduler.configure(config.settings)
+                pressure_monitor.stop()
+                pressure_monitor.configure(config.settings.daemon)
+                pressure_monitor.start(wakeup=pressure_wakeup)
+            ran = scheduler.run_due()
+            latencies = {reason: source.latency() for reason, source in (("power supply", power_supply_events), ("process", process_rules)) if reason in woken}
+            for reason, latency in latencies.items():
+                if latency is not None: print(f"Reacted to {reason} event in {latency:.0f} ms")
+            scheduler.print_timings(ran)
+            # only an AC/battery change is a transition, process and pressure wakeups aren't
+            interval = scheduler.next_interval(load_sampler.history, active_profile(), "power supply" in woken)
+            if scheduler.adaptive.enabled:
+                # sample load over the whole tick, no point in waking up in between
+                load_sampler.interval = interval
+                print(f"Next refresh in {interval:g} s ({scheduler.adaptive.reason})")
+            # forecast the load at the end of the coming interval
+            load_forecaster.set_horizon(ceil(interval / load_sampler.interval))
+            record_tick(
+                interval=interval,
+                interval_reason=scheduler.adaptive.reason if scheduler.adaptive.enabled else "fixed",
+                event_latency_ms=min((latency for latency in latencies.values() if latency is not None), default=None),
+                wakeups=sorted(woken),
+                wakeups_coalesced=wakeups.coalesced,
+                config_generation=generation,
+                stages=scheduler.timings(),
+            )
+            woken = await countdown(interval, wakeups)
+    finally:
+        power_supply_events.stop()
+        pressure_monitor.stop()
+        process_rules.stop()
+        load_sampler.stop()
+        daemon_api.stop()
+
+
+def run() -> None:
+    """
+    Run the daemon until SIGINT/SIGTERM
+    """
+    daemon_loop.run(control_loop())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - single instance daemon lock
+import fcntl, os
+
+from auto_cpufreq.globals import IS_INSTALLED_WITH_SNAP
+
+if IS_INSTALLED_WITH_SNAP: LOCK_PATH = "/var/snap/auto-cpufreq/current/auto-cpufreq.pid"
+else: LOCK_PATH = "/run/auto-cpufreq.pid"
+
+
+class DaemonLock:
+    """
+    pidfile the daemon holds an exclusive flock on for as long as it runs. The kernel drops
+    the lock when the process exits, however it exits, so a stale pidfile never counts as a
+    running daemon, and checking for one is a single open + flock instead of a process scan.
+    """
+
+    def __init__(self, path: str = LOCK_PATH):
+        self.path = path
+        self._fd: int | None = None
+
+    def acquire(self) -> bool:
+        """
+        Take the lock and write our pid, returns False if another daemon holds it
+        """
+        if self._fd is not None: return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        try: fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        # the file stays, removing it could let a starting daemon lock a file nobody else finds
+        if self._fd is None: return
+        os.ftruncate(self._fd, 0)
+        os.close(self._fd)
+        self._fd = None
+
+    def holder(self) -> int | None:
+        """
+        pid of the running daemon, None if no daemon holds the lock
+        """
+        if self._fd is not None: return os.getpid()
+        try: fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+        except OSError: return None # no daemon has run since boot (/run is a tmpfs)
+        try:
+            try: fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except BlockingIOError:
+                pid = os.pread(fd, 32, 0).decode().strip()
+                return int(pid) if pid.isdigit() else 0
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            return None
+        finally: os.close(fd)
+
+    def held(self) -> bool: return self.holder() is not None
+
+
+daemon_lock = DaemonLock()
+
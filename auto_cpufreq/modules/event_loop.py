@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - event loop of the daemon
+import asyncio
+from signal import SIGINT, SIGTERM
+from typing import Callable, Coroutine
+
+# wakeups arriving this close after the first one are handled by the same tick, the uevents of
+# one plug/unplug (AC adapter, then battery) arrive within a few ms
+COALESCE_DELAY = 0.01
+
+
+class DaemonLoop:
+    """
+    The daemon's single asyncio event loop, run in the main thread. The control loop is its main
+    task, timers (load sampling, battery charge thresholds) and readable file descriptors (config
+    file inotify, netlink event sockets) are callbacks on it, so nothing runs concurrently with a tick.
+    Callbacks must not block.
+    """
+
+    def __init__(self):
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def running(self) -> bool: return self.loop is not None and self.loop.is_running()
+
+    def run(self, main: Coroutine) -> None:
+        """
+        Run main to completion, SIGINT/SIGTERM cancel it so its cleanup still runs
+        """
+        self.loop = asyncio.new_event_loop()
+        task = self.loop.create_task(main)
+        for signum in (SIGINT, SIGTERM): self.loop.add_signal_handler(signum, task.cancel)
+        try: self.loop.run_until_complete(task)
+        except asyncio.CancelledError: pass
+        finally:
+            self.loop.close()
+            self.loop = None
+
+    def call_every(self, interval: float | Callable[[], float], callback: Callable[[], bool | None]) -> None:
+        """
+        Run callback now and then every interval seconds (a callable is asked for the next interval
+        each time), until it returns False
+        """
+        def run():
+            try: again = callback() is not False
+            except Exception as e:
+                print(f"ERROR: {getattr(callback, '__qualname__', callback)} failed: {e!r}")
+                again = True
+            if again and self.loop is not None: self.loop.call_later(interval() if callable(interval) else interval, run)
+        self.loop.call_soon(run)
+
+    def add_reader(self, fd: int, callback: Callable[[], None]) -> None:
+        """
+        Call callback whenever fd becomes readable
+        """
+        self.loop.add_reader(fd, callback)
+
+    def remove_reader(self, fd: int) -> None:
+        if self.loop is not None: self.loop.remove_reader(fd)
+
+
+class Wakeups:
+    """
+    Wakeup requests of the daemon's event sources. The control loop waits on them between ticks,
+    and all requests which arrive together are handed to it at once, so a burst of events
+    (the AC adapter's and the battery's uevents, a config file saved in several writes) runs one tick.
+    Create it on the running loop.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.coalesced = 0 # requests merged into an already pending wakeup
+        self._event = asyncio.Event()
+        self._reasons: set[str] = set()
+
+    def wake(self, reason: str) -> None:
+        if self._event.is_set(): self.coalesced += 1
+        self._reasons.add(reason)
+        self._event.set()
+
+    def source(self, reason: str) -> "WakeupSource": return WakeupSource(self, reason)
+
+    async def wait(self, timeout: float) -> set[str]:
+        """
+        Wait up to timeout seconds, returns the reasons of the wakeups (empty after the timeout)
+        """
+        try: await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError: return set()
+        await asyncio.sleep(COALESCE_DELAY)
+        self._event.clear()
+        reasons, self._reasons = self._reasons, set()
+        return reasons
+
+
+class WakeupSource:
+    """
+    Takes the place of the threading.Event an event source sets, callable from any thread
+    """
+
+    def __init__(self, wakeups: Wakeups, reason: str):
+        self.wakeups = wakeups
+        self.reason = reason
+
+    def set(self) -> None: self.wakeups.loop.call_soon_threadsafe(self.wakeups.wake, self.reason)
+
+
+daemon_loop = DaemonLoop()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - short term load forecasting
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from auto_cpufreq.modules.load_sampler import LoadSnapshot
+
+
+@dataclass
+class Forecast:
+    utilization: float = 0.0
+    max_core: float = 0.0
+    run_queue: float = 0.0
+    per_cpu: dict[int, float] = field(default_factory=dict)
+
+    def cpus(self, cpus: Sequence[int]) -> float:
+        """
+        Forecast average usage of a group of cpus (e.g. a cluster)
+        """
+        values = [self.per_cpu[cpu] for cpu in cpus if cpu in self.per_cpu]
+        return round(sum(values) / len(values), 1) if values else 0.0
+
+
+class Holt:
+    """
+    Holt's linear (double exponential) smoothing: a level and a trend, so a rising
+    series is extrapolated instead of lagging behind like a plain EWMA
+    """
+
+    __slots__ = ("alpha", "beta", "level", "trend")
+
+    def __init__(self, alpha: float, beta: float):
+        self.alpha = alpha
+        self.beta = beta
+        self.level: float | None = None
+        self.trend = 0.0
+
+    def forecast(self, steps: int = 1) -> float:
+        return 0.0 if self.level is None else self.level + steps * self.trend
+
+    def update(self, value: float) -> None:
+        """
+        Feed the next observation
+        """
+        if self.level is None:
+            self.level = value
+            return
+        previous = self.level
+        self.level = self.alpha * value + (1 - self.alpha) * (self.level + self.trend)
+        self.trend = self.beta * (self.level - previous) + (1 - self.beta) * self.trend
+
+
+class LoadForecaster:
+    """
+    Forecasts total and per core usage and the run queue length horizon samples ahead from the
+    sampler's history, so the policy can enable turbo or lift frequency caps before a burst peaks.
+    The horizon is the number of samples the sampler takes during one daemon tick. Errors of the
+    forecasts at that horizon are kept to evaluate the model.
+    """
+
+    def __init__(self, alpha: float = 0.5, beta: float = 0.3, error_window: int = 60):
+        self.alpha = alpha
+        self.beta = beta
+        self.utilization = Holt(alpha, beta)
+        self.run_queue = Holt(alpha, beta)
+        self.per_cpu: dict[int, Holt] = {}
+        self.errors: deque[float] = deque(maxlen=error_window)
+        self.samples = 0
+        self.horizon = 1
+        # utilization forecasts made after each of the last horizon samples, the oldest is for the next sample
+        self._pending: deque[float] = deque(maxlen=self.horizon)
+        self._last_timestamp = float("-inf")
+
+    def update(self, history: Sequence[LoadSnapshot]) -> int:
+        """
+        Feed every snapshot not seen yet, returns how many were fed
+        """
+        fed = 0
+        for snapshot in history:
+            if snapshot.timestamp <= self._last_timestamp: continue
+            self._last_timestamp = snapshot.timestamp
+            if len(self._pending) == self.horizon: self.errors.append(snapshot.total - self._pending[0])
+            self.utilization.update(snapshot.total)
+            self._pending.append(self.utilization.forecast(self.horizon))
+            self.run_queue.update(snapshot.run_queue)
+            for cpu, usage in zip(snapshot.cpu_ids, snapshot.per_cpu):
+                self.per_cpu.setdefault(cpu, Holt(self.alpha, self.beta)).update(usage)
+            self.samples += 1
+            fed += 1
+        return fed
+
+    def set_horizon(self, steps: int) -> None:
+        """
+        Forecast steps samples ahead, forecasts still pending for the previous horizon are dropped
+        """
+        steps = max(1, steps)
+        if steps == self.horizon: return
+        self.horizon = steps
+        self._pending = deque(maxlen=steps)
+
+    def forecast(self, steps: int | None = None) -> Forecast:
+        if steps is None: steps = self.horizon
+        def usage(value: float) -> float: return round(min(max(value, 0.0), 100.0), 1)
+        per_cpu = {cpu: usage(holt.forecast(steps)) for cpu, holt in self.per_cpu.items()}
+        return Forecast(
+            utilization=usage(self.utilization.forecast(steps)),
+            max_core=max(per_cpu.values(), default=0.0),
+            run_queue=round(max(self.run_queue.forecast(steps), 0.0), 1),
+            per_cpu=per_cpu,
+        )
+
+    def mae(self) -> float | None:
+        return round(sum(abs(error) for error in self.errors) / len(self.errors), 1) if self.errors else None
+
+    def bias(self) -> float | None:
+        # positive: the model predicts less load than there turns out to be
+        return round(sum(self.errors) / len(self.errors), 1) if self.errors else None
+
+    def stats(self) -> dict:
+        forecast = self.forecast()
+        return {
+            "utilization": forecast.utilization,
+            "max_core": forecast.max_core,
+            "run_queue": forecast.run_queue,
+            "last_error": round(self.errors[-1], 1) if self.errors else None,
+            "mae": self.mae(),
+            "bias": self.bias(),
+            "samples": self.samples,
+            "horizon": self.horizon,
+        }
+
+
+load_forecaster = LoadForecaster()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - non-blocking CPU load sampler
+import os
+from collections import deque
+from dataclasses import dataclass
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
+
+PROC_STAT = "/proc/stat"
+PROC_LOADAVG = "/proc/loadavg"
+
+
+@dataclass
+class LoadSnapshot:
+    timestamp: float
+    total: float
+    per_cpu: list[float]
+    cpu_ids: list[int]
+    max_core: float
+    ewma: float
+    load1m: float
+    run_queue: int = 0 # runnable tasks, not counting the sampler itself
+
+
+def read_proc_stat(path: str = PROC_STAT) -> dict[int | None, tuple[int, int]]:
+    """
+    Returns (busy, total) jiffies per cpu, the aggregated "cpu" line is stored under None
+    """
+    times = {}
+    with open(path, "r") as f:
+        for line in f:
+            if not line.startswith("cpu"): break
+            name, *values = line.split()
+            # user nice system idle iowait irq softirq steal, guest time is already part of user/nice
+            values = [int(value) for value in values[:8]]
+            total = sum(values)
+            idle = values[3] + (values[4] if len(values) > 4 else 0)
+            times[None if name == "cpu" else int(name[3:])] = (total - idle, total)
+    return times
+
+
+def read_loadavg(path: str = PROC_LOADAVG) -> tuple[float, int]:
+    """
+    Returns the 1 minute load average and the number of currently runnable tasks
+    """
+    with open(path, "r") as f: fields = f.read().split()
+    running = int(fields[3].split("/")[0]) if len(fields) > 3 else 1
+    return float(fields[0]), max(running - 1, 0)
+
+
+def _percent(previous: tuple[int, int] | None, current: tuple[int, int]) -> float:
+    if previous is None: return 0.0
+    busy, total = current[0] - previous[0], current[1] - previous[1]
+    if total <= 0: return 0.0
+    return round(min(max(busy / total * 100, 0.0), 100.0), 1)
+
+
+class LoadSampler:
+    """
+    Samples /proc/stat on its own cadence into a small ring buffer of snapshots.
+
+    Decision code reads snapshot() which never blocks once the sampler is running, and because
+    every consumer of a tick reads the same snapshot, all metrics of a tick come from the same instant.
+    """
+
+    def __init__(self, interval: float = 1.0, history: int = 30, alpha: float = 0.3):
+        self.interval = interval
+        self.alpha = alpha
+        self.history: deque[LoadSnapshot] = deque(maxlen=history)
+        self._previous: dict[int | None, tuple[int, int]] | None = None
+        self._previous_time = 0.0
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Thread | None = None
+        self._loop = None # DaemonLoop, when sampling on the daemon's event loop
+
+    @property
+    def running(self) -> bool:
+        if self._loop is not None: return self._loop.running and not self._stop.is_set()
+        return self._thread is not None and self._thread.is_alive()
+
+    def sample(self) -> LoadSnapshot | None:
+        """
+        Take one /proc/stat reading and store the deltas against the previous one
+        """
+        with self._lock:
+            try: current = read_proc_stat()
+            except OSError: return None
+            now = monotonic()
+            previous, self._previous, self._previous_time = self._previous, current, now
+            if previous is None: return None
+
+            cpu_ids = sorted(cpu for cpu in current if cpu is not None)
+            per_cpu = [_percent(previous.get(cpu), current[cpu]) for cpu in cpu_ids]
+            total = _percent(previous.get(None), current[None])
+            try: load1m, run_queue = read_loadavg()
+            except (OSError, ValueError): load1m, run_queue = os.getloadavg()[0], 0
+            ewma = total if not self.history else round(self.alpha * total + (1 - self.alpha) * self.history[-1].ewma, 1)
+
+            snapshot = LoadSnapshot(
+                timestamp=now,
+                total=total,
+                per_cpu=per_cpu,
+                cpu_ids=cpu_ids,
+                max_core=max(per_cpu, default=0.0),
+                ewma=ewma,
+                load1m=load1m,
+                run_queue=run_queue,
+            )
+            self.history.append(snapshot)
+            return snapshot
+
+    def snapshot(self) -> LoadSnapshot:
+        """
+        Latest snapshot, when no background thread is running a fresh sample is taken if the last one is stale
+        """
+        if not self.running and monotonic() - self._previous_time >= min(self.interval, 0.5):
+            self.sample()
+        if not self.history:
+            # the very first snapshot needs two readings to compute a delta
+            if self._previous is None: self.sample()
+            sleep(0.1)
+            self.sample()
+        if not self.history: return LoadSnapshot(monotonic(), 0.0, [], [], 0.0, 0.0, os.getloadavg()[0])
+        return self.history[-1]
+
+    def start(self, loop=None) -> None:
+        """
+        Sample in the background, on the given DaemonLoop or else in a thread of its own
+        """
+        if self.running: return
+        self._stop.clear()
+        if loop is not None:
+            self._loop = loop
+            loop.call_every(lambda: self.interval, self._sample_on_loop)
+            return
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        self.sample()
+        while not self._stop.wait(self.interval): self.sample()
+
+    def _sample_on_loop(self) -> bool:
+        if self._stop.is_set(): return False
+        self.sample()
+        return True
+
+
+load_sampler = LoadSampler()
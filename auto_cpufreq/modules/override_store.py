@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - governor/turbo override store
+import io, json, os, pickle
+from dataclasses import dataclass
+from pathlib import Path
+
+from auto_cpufreq.globals import IS_INSTALLED_WITH_SNAP
+
+if IS_INSTALLED_WITH_SNAP: STATE_DIR = Path("/var/snap/auto-cpufreq/current")
+else: STATE_DIR = Path("/opt/auto-cpufreq")
+STORE_PATH = STATE_DIR / "overrides.json"
+# pickles of a single string, written by previous versions
+LEGACY_PATHS = {"governor": STATE_DIR / "override.pickle", "turbo": STATE_DIR / "turbo-override.pickle"}
+
+
+@dataclass(frozen=True)
+class Knob:
+    default: str # value when there is no override
+    values: tuple[str, ...] # values an override may set
+
+
+KNOBS = {
+    "governor": Knob("default", ("powersave", "performance")),
+    "turbo": Knob("auto", ("always", "never")),
+}
+
+
+class _StringUnpickler(pickle.Unpickler):
+    # the legacy files only ever held a str, which unpickles without looking up any class
+    def find_class(self, module, name): raise pickle.UnpicklingError(f"{module}.{name} is not allowed")
+
+
+def _read_legacy(path: Path) -> str | None:
+    try: value = _StringUnpickler(io.BytesIO(path.read_bytes())).load()
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError): return None
+    return value if isinstance(value, str) else None
+
+
+class OverrideStore:
+    """
+    Overrides set with --force and --turbo, one value per knob. The daemon reads the file once
+    and keeps them in memory, the CLI pushes changes to it through the daemon API. Every change
+    is written as JSON to a temporary file which then replaces the store, so it survives
+    restarts and a crash never leaves a partly written store behind.
+    """
+
+    def __init__(self, path: Path = STORE_PATH, legacy_paths: dict[str, Path] = LEGACY_PATHS):
+        self.path = path
+        self.legacy_paths = legacy_paths
+        self._values: dict[str, str] | None = None
+
+    def _load(self) -> dict[str, str]:
+        if self._values is not None: return self._values
+        values = {}
+        try:
+            with open(self.path, "r") as f: stored = json.load(f)
+            if not isinstance(stored, dict): raise ValueError("not a JSON object")
+            values = {knob: value for knob, value in stored.items() if knob in KNOBS and value in KNOBS[knob].values}
+        except FileNotFoundError:
+            # first run after an update: take over the pickled overrides
+            for knob, path in self.legacy_paths.items():
+                value = _read_legacy(path)
+                if value in KNOBS[knob].values: values[knob] = value
+        except (OSError, ValueError) as e: print(f"WARNING: Ignoring unreadable override store {self.path}: {e!r}")
+        self._values = values
+        if values and not self.path.exists(): self._save()
+        return values
+
+    def _save(self) -> bool:
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+        try:
+            with open(tmp, "w") as f:
+                json.dump(self._values, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"WARNING: Can't save overrides to {self.path}, they only last until the daemon stops: {e!r}")
+            tmp.unlink(missing_ok=True)
+            return False
+        for path in self.legacy_paths.values(): path.unlink(missing_ok=True)
+        return True
+
+    def get(self, knob: str) -> str: return self._load().get(knob, KNOBS[knob].default)
+
+    def all(self) -> dict[str, str]: return {knob: self.get(knob) for knob in KNOBS}
+
+    def set(self, knob: str, value: str | None) -> None:
+        """
+        Set a knob's override, None or its default value removes it
+        """
+        if value == KNOBS[knob].default: value = None
+        if value is not None and value not in KNOBS[knob].values: raise ValueError(f"Invalid {knob} override: {value}")
+        values = self._load()
+        if values.get(knob) == value: return
+        if value is None: del values[knob]
+        else: values[knob] = value
+        self._save()
+
+    def remove(self) -> None:
+        """
+        Forget every override and delete the store, used when auto-cpufreq is removed
+        """
+        self._values = {}
+        for path in (self.path, *self.legacy_paths.values()): path.unlink(missing_ok=True)
+
+
+overrides = OverrideStore()
+
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - kernel power_supply uevent listener
+import os, socket, sys
+from threading import Event, Thread
+from time import monotonic
+from typing import Callable
+
+from auto_cpufreq.globals import POWER_SUPPLY_DIR
+
+NETLINK_KOBJECT_UEVENT = 15
+KERNEL_UEVENT_GROUP = 1 # group 2 carries udev re-broadcasts, kernel events are on group 1
+
+
+def parse_uevent(data: bytes) -> dict[str, str]:
+    """
+    Parse a kernel uevent datagram: "ACTION@DEVPATH\\0KEY=VALUE\\0KEY=VALUE..."
+    """
+    parts = data.split(b"\0")
+    uevent = {}
+    for part in parts[1:]:
+        key, sep, value = part.decode(errors="replace").partition("=")
+        if sep: uevent[key] = value
+    return uevent
+
+
+class PowerSupplyEventSource:
+    """
+    Listens to kernel power_supply uevents on a NETLINK_KOBJECT_UEVENT socket and wakes up
+    whoever is waiting on it, so AC plug/unplug is acted on immediately instead of on the next poll.
+    """
+
+    reason = "power supply"
+
+    def __init__(self):
+        self.wakeup = Event()
+        self.last_event: dict[str, str] | None = None
+        self.last_event_time: float | None = None
+        self.available = False
+        self.hotplug_hooks: list[Callable[[], None]] = [] # called when a power supply is added or removed
+        self._sock: socket.socket | None = None
+        self._loop = None
+
+    def start(self, wakeup=None, loop=None) -> bool:
+        """
+        Open the netlink socket and start listening, returns False (periodic polling is used) if that isn't possible.
+        wakeup (anything with a set() method) replaces the own Event, loop is the daemon's event loop
+        to read the socket on instead of a thread of its own.
+        """
+        if self.available: return True
+        if wakeup is not None: self.wakeup = wakeup
+        try:
+            self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            self._sock.bind((0, KERNEL_UEVENT_GROUP))
+        except (AttributeError, OSError) as e:
+            print(f"WARNING: Can't listen to power supply events, falling back to polling: {e!r}")
+            self._sock = None
+            return False
+
+        self.available = True
+        if loop is None: Thread(target=self._listen, daemon=True).start()
+        else:
+            self._sock.setblocking(False)
+            loop.add_reader(self._sock.fileno(), self._read)
+            self._loop = loop
+        return True
+
+    def stop(self) -> None:
+        self.available = False
+        if self._sock is None: return
+        if self._loop is not None: self._loop.remove_reader(self._sock.fileno())
+        self._loop = None
+        self._sock.close()
+        self._sock = None
+
+    def _listen(self) -> None:
+        while self.available:
+            try: data = self._sock.recv(16384)
+            except OSError: break
+            self.handle(data)
+
+    def _read(self) -> None:
+        # on the event loop: drain what is queued without blocking
+        while self.available:
+            try: data = self._sock.recv(16384)
+            except BlockingIOError: return
+            except OSError as e:
+                print(f"WARNING: Power supply events stopped, falling back to polling: {e!r}")
+                self.stop()
+                return
+            self.handle(data)
+
+    def handle(self, data: bytes) -> bool:
+        """
+        Process one uevent datagram, returns True if it was a power supply event
+        """
+        uevent = parse_uevent(data)
+        if uevent.get("SUBSYSTEM") != "power_supply": return False
+        self.last_event = uevent
+        self.last_event_time = monotonic()
+        if uevent.get("ACTION") in ("add", "remove"):
+            for hook in self.hotplug_hooks: hook()
+        self.wakeup.set()
+        return True
+
+    def inject(self, supply: str = "AC", action: str = "change", **properties: str) -> None:
+        """
+        Feed a synthetic uevent through the same path as the ones received from the kernel
+        """
+        devpath = f"/devices/virtual/power_supply/{supply}"
+        fields = {"ACTION": action, "DEVPATH": devpath, "SUBSYSTEM": "power_supply", "POWER_SUPPLY_NAME": supply}
+        fields.update({f"POWER_SUPPLY_{key.upper()}": value for key, value in properties.items()})
+        self.handle(f"{action}@{devpath}\0".encode() + b"\0".join(f"{k}={v}".encode() for k, v in fields.items()))
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Sleep for up to timeout seconds, returns True if woken up by a power supply event
+        """
+        woken = self.wakeup.wait(timeout)
+        self.wakeup.clear()
+        return woken
+
+    def latency(self) -> float | None:
+        """
+        Milliseconds passed since the last power supply event
+        """
+        return None if self.last_event_time is None else (monotonic() - self.last_event_time) * 1000
+
+
+def trigger(supply: str) -> None:
+    """
+    Ask the kernel to emit a synthetic "change" uevent for a power supply (requires root),
+    used to measure how long the daemon takes from the event to the governor switch
+    """
+    with open(os.path.join(POWER_SUPPLY_DIR, supply, "uevent"), "w") as f: f.write("change")
+
+
+power_supply_events = PowerSupplyEventSource()
+
+
+if __name__ == "__main__":
+    # usage: python3 -m auto_cpufreq.modules.power_supply_events [SUPPLY]
+    # triggers a synthetic uevent, the daemon reports the reaction latency in its stats
+    trigger(sys.argv[1] if len(sys.argv) > 1 else "AC")
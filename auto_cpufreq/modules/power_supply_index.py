@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - power supply index with an aggregate battery view
+import os
+from dataclasses import dataclass, field
+from threading import Lock
+
+from auto_cpufreq.config.config import config
+from auto_cpufreq.globals import POWER_SUPPLY_DIR
+from auto_cpufreq.modules.power_supply_events import power_supply_events
+
+# attributes read on every call, kept open; the others are read by path when asked for
+ATTRIBUTES = ("online", "status", "capacity", "power_now", "current_now", "voltage_now", "energy_now", "energy_full", "charge_now", "charge_full")
+# hard coded power supplies that are always ignored (peripherals reporting as batteries)
+ALWAYS_IGNORED = ("hidpp_battery",)
+
+
+@dataclass
+class PowerSupply:
+    name: str
+    path: str
+    type: str # Mains, Battery, USB, ...
+    fds: dict[str, int] = field(default_factory=dict)
+
+    def read(self, attribute: str) -> str | None:
+        fd = self.fds.get(attribute)
+        try:
+            if fd is not None: return os.pread(fd, 64, 0).decode().strip()
+            with open(f"{self.path}/{attribute}", "r") as f: return f.read().strip()
+        except (OSError, UnicodeDecodeError): return None
+
+    def read_int(self, attribute: str) -> int | None:
+        value = self.read(attribute)
+        return int(value) if value is not None and value.lstrip("-").isdigit() else None
+
+
+@dataclass
+class BatteryView:
+    """
+    All batteries as one (e.g. the internal and the swappable battery of a ThinkPad)
+    """
+    names: list[str]
+    status: str | None # Charging if any battery charges, else Discharging if any discharges, else the first one's
+    capacity: int | None # combined percentage, weighted by each battery's full energy when known
+    energy_now_wh: float | None
+    energy_full_wh: float | None
+    power_w: float | None # combined drain (or charge) rate
+
+
+def _energy(battery: PowerSupply, now: str) -> float | None:
+    """
+    energy_<now> in Wh, or charge_<now> (µAh) times the voltage for batteries reporting charge only
+    """
+    energy = battery.read_int(f"energy_{now}")
+    if energy is not None: return energy / 1_000_000
+    charge, voltage = battery.read_int(f"charge_{now}"), battery.read_int("voltage_now")
+    if charge is None or not voltage: return None
+    return charge * voltage / 1_000_000_000_000
+
+
+def _power(battery: PowerSupply) -> float | None:
+    # power_now isn't found on all laptops, calculate it from current and voltage then
+    power = battery.read_int("power_now")
+    if power is not None: return abs(power) / 1_000_000
+    current, voltage = battery.read_int("current_now"), battery.read_int("voltage_now")
+    if current is None or voltage is None: return None
+    return abs(current) * voltage / 1_000_000_000_000
+
+
+class PowerSupplyIndex:
+    """
+    Classifies the supplies under /sys/class/power_supply once, skipping the configured
+    [power_supply_ignore_list], and keeps their online/status/capacity/... attributes open,
+    so the charging check of every tick is one read per supply instead of a directory walk and a
+    type file read per supply. The daemon re-scans when a power supply is added or removed
+    (uevent), without the uevent listener the directory listing is compared on every call.
+    """
+
+    def __init__(self, root: str = POWER_SUPPLY_DIR, events=power_supply_events):
+        self.root = root
+        self.events = events
+        self.supplies: list[PowerSupply] = []
+        self.scans = 0
+        self._names: list[str] | None = None
+        self._ignore_for = None
+        self._ignore: list[str] = []
+        self._stale = True
+        self._lock = Lock()
+        events.hotplug_hooks.append(self.invalidate)
+
+    def invalidate(self) -> None: self._stale = True
+
+    def ignore_list(self) -> list[str]:
+        # the config object is replaced on every reload, build the list only then
+        conf = config.get_config()
+        if conf is not self._ignore_for:
+            self._ignore_for = conf
+            ignored = list(conf["power_supply_ignore_list"].values()) if conf.has_section("power_supply_ignore_list") else []
+            self._ignore = ignored + list(ALWAYS_IGNORED)
+            self._stale = True
+        return self._ignore
+
+    def _listdir(self) -> list[str]:
+        try: return sorted(os.listdir(self.root))
+        except OSError: return []
+
+    def close(self) -> None:
+        for supply in self.supplies:
+            for fd in supply.fds.values():
+                try: os.close(fd)
+                except OSError: pass
+        self.supplies = []
+
+    def scan(self) -> None:
+        self.close()
+        ignored = self.ignore_list()
+        self._names = self._listdir()
+        for name in self._names:
+            if any(item in name for item in ignored): continue
+            path = os.path.join(self.root, name)
+            try:
+                with open(f"{path}/type", "r") as f: supply_type = f.read().strip()
+            except OSError: continue
+            supply = PowerSupply(name, path, supply_type)
+            for attribute in ATTRIBUTES:
+                try: supply.fds[attribute] = os.open(f"{path}/{attribute}", os.O_RDONLY | os.O_CLOEXEC)
+                except OSError: pass
+            self.supplies.append(supply)
+        self.scans += 1
+        self._stale = False
+
+    def get(self) -> list[PowerSupply]:
+        with self._lock:
+            self.ignore_list()
+            if not self._stale and not self.events.available and self._listdir() != self._names: self._stale = True
+            if self._stale: self.scan()
+            return self.supplies
+
+    def mains(self) -> list[PowerSupply]: return [supply for supply in self.get() if supply.type == "Mains"]
+
+    def batteries(self) -> list[PowerSupply]: return [supply for supply in self.get() if supply.type == "Battery"]
+
+    def battery(self, name: str) -> PowerSupply | None:
+        return next((supply for supply in self.get() if supply.name == name and supply.type == "Battery"), None)
+
+    def ac_online(self) -> bool | None:
+        """
+        Whether any AC adapter is online, None when there is none
+        """
+        mains = self.mains()
+        if not mains: return None
+        online = [supply.read("online") for supply in mains]
+        # a supply that can't be read any more went away (driver unbound), look again next time
+        if None in online: self.invalidate()
+        return "1" in online
+
+    def charging(self) -> bool:
+        """
+        Whether the system runs on a power source: any AC adapter online, or no battery discharging.
+        Without power supplies (desktops) or when it can't be determined, a power cable is assumed.
+        """
+        if self.ac_online(): return True
+        return not any(battery.read("status") == "Discharging" for battery in self.batteries())
+
+    def battery_view(self, batteries: list[PowerSupply] | None = None) -> BatteryView | None:
+        """
+        Aggregate of all (or the given) batteries, None without a battery
+        """
+        if batteries is None: batteries = self.batteries()
+        if not batteries: return None
+        statuses = [battery.read("status") for battery in batteries]
+        status = next((s for s in ("Charging", "Discharging") if s in statuses), statuses[0])
+
+        energy_now = [_energy(battery, "now") for battery in batteries]
+        energy_full = [_energy(battery, "full") for battery in batteries]
+        known = None not in energy_now and None not in energy_full
+        energy_now_wh = sum(energy_now) if known else None
+        energy_full_wh = sum(energy_full) if known else None
+        if known and energy_full_wh: capacity = round(energy_now_wh / energy_full_wh * 100)
+        else:
+            capacities = [c for c in (battery.read_int("capacity") for battery in batteries) if c is not None]
+            capacity = round(sum(capacities) / len(capacities)) if capacities else None
+
+        powers = [p for p in (_power(battery) for battery in batteries) if p is not None]
+        return BatteryView(
+            names=[battery.name for battery in batteries],
+            status=status,
+            capacity=capacity,
+            energy_now_wh=round(energy_now_wh, 2) if energy_now_wh is not None else None,
+            energy_full_wh=round(energy_full_wh, 2) if energy_full_wh is not None else None,
+            power_w=round(sum(powers), 2) if powers else None,
+        )
+
+
+power_supply_index = PowerSupplyIndex()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - process exec/exit events from the kernel proc connector
+import errno, os, socket, struct
+from threading import Thread
+from typing import Callable
+
+NETLINK_CONNECTOR = 11
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+PROC_CN_MCAST_LISTEN = 1
+PROC_CN_MCAST_IGNORE = 2
+NLMSG_DONE = 3
+
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_COMM = 0x00000200
+PROC_EVENT_EXIT = 0x80000000
+EVENTS = {PROC_EVENT_EXEC: "exec", PROC_EVENT_COMM: "comm", PROC_EVENT_EXIT: "exit"}
+
+NLMSGHDR = struct.Struct("=IHHII") # len, type, flags, seq, pid
+CN_MSG = struct.Struct("=IIIIHH") # idx, val, seq, ack, len, flags
+PROC_EVENT = struct.Struct("=IIQII") # what, cpu, timestamp_ns, event_data.pid, event_data.tgid
+
+
+def _control(op: int) -> bytes:
+    payload = CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, 4, 0) + struct.pack("=I", op)
+    return NLMSGHDR.pack(NLMSGHDR.size + len(payload), NLMSG_DONE, 0, 0, os.getpid()) + payload
+
+
+def parse_proc_events(data: bytes) -> list[tuple[str, int]]:
+    """
+    Parse a proc connector datagram into (event, pid) pairs, only exec/comm/exit of whole processes
+    (thread group leaders) are returned, threads starting and exiting are of no interest
+    """
+    events = []
+    offset = 0
+    while offset + NLMSGHDR.size <= len(data):
+        length = NLMSGHDR.unpack_from(data, offset)[0]
+        if length < NLMSGHDR.size or offset + length > len(data): break # malformed or truncated
+        start = offset + NLMSGHDR.size + CN_MSG.size
+        if start + PROC_EVENT.size <= offset + length:
+            what, _cpu, _timestamp, pid, tgid = PROC_EVENT.unpack_from(data, start)
+            if what in EVENTS and pid == tgid: events.append((EVENTS[what], tgid))
+        offset += (length + 3) & ~3 # netlink messages are 4 byte aligned
+    return events
+
+
+class ProcConnector:
+    """
+    Subscribes to the kernel proc connector (NETLINK_CONNECTOR, needs CAP_NET_ADMIN) and calls
+    handler(event, pid) for every process exec, rename (comm) and exit as they happen.
+    When events were dropped because the socket buffer overflowed, handler("lost", 0) is called,
+    the listener's view of running processes has to be rebuilt then.
+    Events are read by a thread of its own, or by a reader on the daemon's event loop if one is given.
+    """
+
+    def __init__(self, handler: Callable[[str, int], None]):
+        self.handler = handler
+        self.available = False
+        self.events = 0
+        self.overflows = 0
+        self._sock: socket.socket | None = None
+        self._loop = None
+
+    def start(self, loop=None) -> bool:
+        if self.available: return True
+        try:
+            self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_CONNECTOR)
+            self._sock.bind((0, CN_IDX_PROC))
+            self._sock.send(_control(PROC_CN_MCAST_LISTEN))
+        except (AttributeError, OSError) as e:
+            print(f"WARNING: Can't listen to process events, scanning /proc every refresh instead: {e!r}")
+            if self._sock is not None: self._sock.close()
+            self._sock = None
+            return False
+
+        self.available = True
+        if loop is None: Thread(target=self._listen, daemon=True).start()
+        else:
+            self._sock.setblocking(False)
+            loop.add_reader(self._sock.fileno(), self._read)
+            self._loop = loop
+        return True
+
+    def stop(self) -> None:
+        if not self.available: return
+        self.available = False
+        if self._loop is not None: self._loop.remove_reader(self._sock.fileno())
+        self._loop = None
+        try: self._sock.send(_control(PROC_CN_MCAST_IGNORE))
+        except OSError: pass
+        self._sock.close()
+
+    def _listen(self) -> None:
+        while self.available:
+            try: data = self._sock.recv(65536)
+            except OSError as e:
+                if e.errno != errno.ENOBUFS: break
+                self.overflows += 1
+                self.handler("lost", 0)
+                continue
+            self.handle(data)
+
+    def _read(self) -> None:
+        # on the event loop: drain what is queued without blocking
+        while self.available:
+            try: data = self._sock.recv(65536)
+            except BlockingIOError: return
+            except OSError as e:
+                if e.errno != errno.ENOBUFS:
+                    print(f"WARNING: Process events stopped: {e!r}")
+                    self.stop()
+                    return
+                self.overflows += 1
+                self.handler("lost", 0)
+                continue
+            self.handle(data)
+
+    def handle(self, data: bytes) -> None:
+        for event, pid in parse_proc_events(data):
+            self.events += 1
+            self.handler(event, pid)
+
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - per process workload rules
+import os, pwd
+from configparser import ConfigParser
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from threading import Event, Lock
+from time import monotonic
+
+from auto_cpufreq.modules.capabilities import Capabilities, probe
+from auto_cpufreq.modules.proc_connector import ProcConnector
+
+PROC_ROOT = "/proc"
+SECTION_PREFIX = "process_rules."
+OVERRIDES = ("profile", "governor", "energy_performance_preference", "turbo", "scaling_max_freq", "scaling_min_freq")
+PROFILES = ("charger", "battery")
+TURBO_VALUES = ("always", "never", "auto")
+
+
+@dataclass(frozen=True)
+class ProcessInfo:
+    pid: int
+    name: str # comm, truncated to 15 characters by the kernel
+    uid: int
+
+
+def read_process(pid: int, proc_root: str = PROC_ROOT) -> ProcessInfo | None:
+    """
+    Read the name from /proc/<pid>/stat and the owner of /proc/<pid>, None if the process is gone
+    """
+    try:
+        with open(f"{proc_root}/{pid}/stat", "rb") as f: stat = f.read().decode(errors="replace")
+        uid = os.stat(f"{proc_root}/{pid}").st_uid
+    except OSError: return None
+    # the name may contain spaces and parentheses, it ends at the last ")"
+    start, end = stat.find("("), stat.rfind(")")
+    if start < 0 or end < 0: return None
+    return ProcessInfo(pid, stat[start + 1:end], uid)
+
+
+def read_cgroup(pid: int, proc_root: str = PROC_ROOT) -> str | None:
+    """
+    Path of the process in the cgroup v2 hierarchy (the v1 name=systemd path as fallback)
+    """
+    try:
+        with open(f"{proc_root}/{pid}/cgroup", "r") as f: lines = f.read().splitlines()
+    except OSError: return None
+    paths = dict(line.split(":", 2)[1:] for line in lines if line.count(":") >= 2)
+    return paths.get("", paths.get("name=systemd"))
+
+
+class ProcessScanner:
+    """
+    Keeps a table of running processes between ticks. Each scan lists /proc and only reads
+    processes which weren't there on the previous scan, vanished pids are dropped, so
+    the cost of a tick follows the number of new processes instead of all processes.
+    A pid which is reused between two scans, or a process exec()ing another program, keeps the
+    name and owner it was read with, only the proc connector's events (update()) refresh those.
+    """
+
+    def __init__(self, proc_root: str = PROC_ROOT):
+        self.proc_root = proc_root
+        self.processes: dict[int, ProcessInfo] = {}
+        self.reads = 0 # processes read on the last scan
+        self._cgroups: dict[int, str | None] = {}
+
+    def scan(self) -> dict[int, ProcessInfo]:
+        pids = {int(entry) for entry in os.listdir(self.proc_root) if entry.isdigit()}
+        for pid in self.processes.keys() - pids:
+            del self.processes[pid]
+            self._cgroups.pop(pid, None)
+
+        self.reads = 0
+        for pid in pids - self.processes.keys():
+            info = read_process(pid, self.proc_root)
+            self.reads += 1
+            if info is not None: self.processes[pid] = info
+        return self.processes
+
+    def update(self, pid: int) -> ProcessInfo | None:
+        """
+        (Re-)read a single process, after it was started or exec()ed another program
+        """
+        self._cgroups.pop(pid, None)
+        info = read_process(pid, self.proc_root)
+        if info is None: self.processes.pop(pid, None)
+        else: self.processes[pid] = info
+        return info
+
+    def remove(self, pid: int) -> ProcessInfo | None:
+        self._cgroups.pop(pid, None)
+        return self.processes.pop(pid, None)
+
+    def cgroup(self, pid: int) -> str | None:
+        """
+        cgroup of a process, read once on first use since only rules matching by cgroup need it
+        """
+        if pid not in self._cgroups: self._cgroups[pid] = read_cgroup(pid, self.proc_root)
+        return self._cgroups[pid]
+
+
+def _split(value: str) -> tuple[str, ...]:
+    return tuple(item for item in value.replace(",", " ").split() if item)
+
+
+@dataclass(frozen=True)
+class ProcessRule:
+    name: str
+    match_name: tuple[str, ...] = () # glob patterns on the process name
+    match_uid: tuple[int, ...] = ()
+    match_cgroup: tuple[str, ...] = () # glob patterns on the cgroup path
+    overrides: dict[str, str | int] = field(default_factory=dict)
+
+    def matches(self, process: ProcessInfo, scanner: ProcessScanner) -> bool:
+        """
+        Every given match_* option has to match, any of the values of an option does
+        """
+        if self.match_name and not any(fnmatchcase(process.name, pattern) for pattern in self.match_name): return False
+        if self.match_uid and process.uid not in self.match_uid: return False
+        if self.match_cgroup:
+            cgroup = scanner.cgroup(process.pid)
+            if cgroup is None or not any(fnmatchcase(cgroup, pattern) for pattern in self.match_cgroup): return False
+        return True
+
+
+def parse_rule(conf: ConfigParser, section: str, capabilities: Capabilities = Capabilities()) -> ProcessRule | None:
+    """
+    Parse a [process_rules.<name>] section, invalid options are skipped, None if it matches nothing.
+    Governor and EPP are checked against the choices in capabilities, when the system reports any.
+    """
+    name = section[len(SECTION_PREFIX):]
+    options = conf[section]
+
+    uids = []
+    for user in _split(options.get("match_uid", "")):
+        if user.isdigit(): uids.append(int(user))
+        else:
+            try: uids.append(pwd.getpwnam(user).pw_uid)
+            except KeyError: print(f"Invalid value for 'match_uid' in [{section}]: unknown user {user}")
+
+    overrides: dict[str, str | int] = {}
+    for option in OVERRIDES:
+        if option not in options: continue
+        value = options[option].strip()
+        if option == "profile" and value not in PROFILES:
+            print(f"Invalid value for 'profile' in [{section}]: {value}, use charger or battery")
+        elif option == "turbo" and value not in TURBO_VALUES:
+            print(f"Invalid value for 'turbo' in [{section}]: {value}, use always, never or auto")
+        elif option in ("scaling_max_freq", "scaling_min_freq") and not value.isdigit():
+            print(f"Invalid value for '{option}' in [{section}]: {value}")
+        elif option == "governor" and capabilities.governors and value not in capabilities.governors:
+            print(f"Invalid value for 'governor' in [{section}]: {value}, use one of {', '.join(capabilities.governors)}")
+        elif option == "energy_performance_preference" and capabilities.epp.choices and value not in capabilities.epp.choices:
+            print(f"Invalid value for 'energy_performance_preference' in [{section}]: {value}, use one of {', '.join(capabilities.epp.choices)}")
+        else: overrides[option] = int(value) if value.isdigit() else value
+
+    rule = ProcessRule(name, _split(options.get("match_name", "")), tuple(uids), _split(options.get("match_cgroup", "")), overrides)
+    if not (rule.match_name or rule.match_uid or rule.match_cgroup):
+        print(f"Ignoring [{section}], it has no match_name, match_uid or match_cgroup")
+        return None
+    return rule
+
+
+@dataclass
+class RuleMatch:
+    """
+    Overrides of the matching rules, rules earlier in the config file take precedence
+    """
+    overrides: dict[str, str | int] = field(default_factory=dict)
+    sources: dict[str, str] = field(default_factory=dict) # override -> rule name
+    matched: dict[str, list[str]] = field(default_factory=dict) # rule name -> matching process names
+
+    def get(self, option: str): return self.overrides.get(option)
+
+    def describe(self, option: str) -> str:
+        rule = self.sources[option]
+        names = sorted(set(self.matched[rule]))
+        more = f" and {len(names) - 3} more" if len(names) > 3 else ""
+        return f"process rule '{rule}' ({', '.join(names[:3])}{more})"
+
+
+class ProcessRules:
+    """
+    Rules from the [process_rules.<name>] sections, evaluated against the process table.
+    With the proc connector running (root) the table is kept up to date by exec/exit events, and an
+    exec or exit of a process a rule matches wakes the daemon up right away. Otherwise, or after
+    events were lost, /proc is scanned incrementally on every refresh. Nothing is read without rules.
+    """
+
+    reason = "process"
+
+    def __init__(self, proc_root: str = PROC_ROOT):
+        self.scanner = ProcessScanner(proc_root)
+        self.connector = ProcConnector(self.handle_event)
+        self.rules: list[ProcessRule] = []
+        self.last = RuleMatch()
+        self.wakeup = Event()
+        self.stale = True # the process table has to be rebuilt by a scan
+        self.last_event_time: float | None = None
+        self._matched_pids: set[int] = set()
+        self._parsed_for: ConfigParser | None = None
+        self._lock = Lock()
+
+    @property
+    def available(self) -> bool: return self.connector.available
+
+    def start(self, wakeup=None, loop=None) -> bool:
+        """
+        Listen to process events (on loop if given), wakeup is set when a matching process starts or exits
+        """
+        if wakeup is not None: self.wakeup = wakeup
+        return self.connector.start(loop)
+
+    def stop(self) -> None: self.connector.stop()
+
+    def handle_event(self, event: str, pid: int) -> None:
+        with self._lock:
+            if event == "lost" or not self.rules:
+                # without rules events aren't tracked, the table is scanned once rules are configured
+                self.stale = True
+                return
+            if event == "exit":
+                relevant = self.scanner.remove(pid) is not None and pid in self._matched_pids
+            else:
+                info = self.scanner.update(pid)
+                relevant = info is not None and any(rule.matches(info, self.scanner) for rule in self.rules)
+                # a matched process which exec()ed something else may no longer match
+                relevant = relevant or pid in self._matched_pids
+        if relevant:
+            self.last_event_time = monotonic()
+            self.wakeup.set()
+
+    def latency(self) -> float | None:
+        """
+        Milliseconds passed since the last process event a rule matched
+        """
+        return None if self.last_event_time is None else (monotonic() - self.last_event_time) * 1000
+
+    def configure(self, conf: ConfigParser) -> list[ProcessRule]:
+        # the config object is replaced on every reload, parse the rules only then
+        if conf is not self._parsed_for:
+            self._parsed_for = conf
+            sections = [section for section in conf.sections() if section.startswith(SECTION_PREFIX)]
+            capabilities = probe() if sections else Capabilities()
+            self.rules = [rule for section in sections for rule in [parse_rule(conf, section, capabilities)] if rule is not None]
+        return self.rules
+
+    def evaluate(self, conf: ConfigParser) -> RuleMatch:
+        with self._lock:
+            match = RuleMatch()
+            matched_pids = set()
+            if self.configure(conf):
+                if self.stale or not self.connector.available:
+                    self.scanner.scan()
+                    self.stale = False
+                for rule in self.rules:
+                    pids = [pid for pid, process in self.scanner.processes.items() if rule.matches(process, self.scanner)]
+                    if not pids: continue
+                    matched_pids.update(pids)
+                    match.matched[rule.name] = [self.scanner.processes[pid].name for pid in pids]
+                    for option, value in rule.overrides.items():
+                        if option in match.overrides: continue
+                        match.overrides[option] = value
+                        match.sources[option] = rule.name
+            self._matched_pids = matched_pids
+            self.last = match
+            return match
+
+    def stats(self) -> dict:
+        return {
+            "rules": len(self.rules),
+            "processes": len(self.scanner.processes),
+            "read_last_scan": self.scanner.reads,
+            "events": self.connector.events if self.connector.available else None,
+            "matched": {rule: len(names) for rule, names in self.last.matched.items()},
+            "overrides": dict(self.last.overrides),
+        }
+
+
+process_rules = ProcessRules()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - pressure stall information (PSI) load source
+import os, select
+from dataclasses import dataclass
+from threading import Event, Thread
+from time import monotonic
+
+PRESSURE_DIR = "/proc/pressure"
+RESOURCES = ("cpu", "memory", "io")
+DEFAULT_THRESHOLD = 10.0 # % of time some tasks were stalled waiting for a cpu
+TRIGGER_WINDOW_US = 2_000_000 # without CAP_SYS_RESOURCE (e.g. the snap) the kernel only accepts multiples of 2 s
+
+
+@dataclass
+class Pressure:
+    # share of time (%) at least one task ("some") or all tasks ("full") were stalled, over 10 s and 60 s
+    some_avg10: float = 0.0
+    some_avg60: float = 0.0
+    full_avg10: float = 0.0
+    full_avg60: float = 0.0
+
+
+def read_pressure(resource: str, pressure_dir: str = PRESSURE_DIR) -> Pressure:
+    """
+    Parse /proc/pressure/<resource>: "some avg10=0.00 avg60=0.00 avg300=0.00 total=0" (+ a "full" line)
+    """
+    pressure = Pressure()
+    with open(f"{pressure_dir}/{resource}", "r") as f:
+        for line in f:
+            kind, *values = line.split()
+            values = dict(value.split("=", 1) for value in values)
+            if kind not in ("some", "full"): continue
+            setattr(pressure, f"{kind}_avg10", float(values.get("avg10", 0)))
+            setattr(pressure, f"{kind}_avg60", float(values.get("avg60", 0)))
+    return pressure
+
+
+class PressureMonitor:
+    """
+    Optional PSI based load signal: tasks actually waiting for a cpu, rather than how busy the cpus are.
+
+    A PSI trigger on /proc/pressure/cpu makes the kernel wake the daemon as soon as cpu stall exceeds
+    the threshold, instead of the change being noticed on the next poll. Without PSI support in the
+    kernel (CONFIG_PSI, psi=0) the monitor stays unavailable and decisions use cpu usage alone.
+    """
+
+    reason = "pressure"
+
+    def __init__(self, pressure_dir: str = PRESSURE_DIR):
+        self.pressure_dir = pressure_dir
+        self.enabled = False
+        self.threshold = DEFAULT_THRESHOLD
+        self.available = False # trigger registered, wakeups happen
+        self.wakeup = Event()
+        self.triggers = 0
+        self.last_trigger_time: float | None = None
+        self._stopped = Event() # of the running watch thread
+
+    def configure(self, settings) -> None:
+        """
+        Take psi and psi_threshold from the compiled [daemon] settings (DaemonSettings)
+        """
+        self.enabled = settings.psi
+        self.threshold = settings.psi_threshold
+
+    def supported(self) -> bool:
+        try: read_pressure("cpu", self.pressure_dir)
+        except (OSError, ValueError): return False # missing, or EOPNOTSUPP when disabled with psi=0
+        return True
+
+    def start(self, wakeup=None) -> bool:
+        """
+        Register the cpu pressure trigger, wakeup (anything with a thread safe set() method) is set
+        whenever it fires, returns False if PSI can't be used. The trigger is signalled with POLLPRI,
+        which asyncio can't wait for, so it is watched by a thread of its own.
+        """
+        if not self.enabled or self.available: return self.available
+        if wakeup is not None: self.wakeup = wakeup
+        stall_us = int(TRIGGER_WINDOW_US * self.threshold / 100)
+        fd = None
+        try:
+            fd = os.open(f"{self.pressure_dir}/cpu", os.O_RDWR | os.O_NONBLOCK)
+            os.write(fd, f"some {stall_us} {TRIGGER_WINDOW_US}\0".encode())
+        except OSError as e:
+            print(f"WARNING: Can't register a cpu pressure trigger, {'falling back to polling' if self.supported() else 'PSI is not supported by the kernel'}: {e!r}")
+            if fd is not None: os.close(fd)
+            return False
+
+        self.available = True
+        # each thread gets its own stop event, a restart must not keep the previous thread running
+        self._stopped = Event()
+        Thread(target=self._watch, args=(fd, self._stopped), daemon=True).start()
+        return True
+
+    def stop(self) -> None:
+        self.available = False
+        self._stopped.set()
+
+    def _watch(self, fd: int, stopped: Event) -> None:
+        poller = select.poll()
+        poller.register(fd, select.POLLPRI)
+        try:
+            while not stopped.is_set():
+                # the timeout only serves noticing stop()
+                for _, event in poller.poll(1000):
+                    if event & select.POLLERR:
+                        print("WARNING: cpu pressure trigger went away, falling back to polling")
+                        self.available = False
+                        stopped.set()
+                        break
+                    if event & select.POLLPRI:
+                        self.triggers += 1
+                        self.last_trigger_time = monotonic()
+                        self.wakeup.set()
+        finally: os.close(fd)
+
+    def read(self) -> dict[str, Pressure] | None:
+        """
+        Current pressure of every resource, None when PSI isn't enabled or supported
+        """
+        if not self.enabled: return None
+        pressures = {}
+        for resource in RESOURCES:
+            try: pressures[resource] = read_pressure(resource, self.pressure_dir)
+            except (OSError, ValueError): continue
+        return pressures or None
+
+    def stalled(self, pressures: dict[str, Pressure] | None) -> bool:
+        """
+        Whether tasks are waiting for a cpu for more than threshold % of the time
+        """
+        return pressures is not None and "cpu" in pressures and pressures["cpu"].some_avg10 >= self.threshold
+
+
+pressure_monitor = PressureMonitor()
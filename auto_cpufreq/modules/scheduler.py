@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - daemon stage scheduler
+from dataclasses import dataclass
+from enum import Enum
+from statistics import pstdev
+from time import monotonic, perf_counter
+from typing import Callable, Sequence
+
+from auto_cpufreq.modules.load_sampler import LoadSnapshot
+
+DEFAULT_FAST_INTERVAL = 2.0
+DEFAULT_SLOW_INTERVAL = 60.0
+
+# default adaptive tick bounds per profile (in seconds)
+DEFAULT_TICK_BOUNDS = {
+    "charger": (0.25, 10.0),
+    "battery": (0.25, 30.0),
+}
+# keep polling fast for this long after an AC/battery transition
+TRANSITION_HOLD = 10.0
+# total cpu usage (% points) standard deviation which counts as quickly changing / steady load
+VOLATILE_LOAD = 15.0
+STEADY_LOAD = 5.0
+# EWMA of total cpu usage below which the system is considered idle
+IDLE_LOAD = 10.0
+
+
+class Cadence(str, Enum):
+    ONCE = "once" # at daemon startup
+    FAST = "fast" # load/AC/turbo decisions
+    SLOW = "slow" # informational reporting
+
+    def __str__(self) -> str:
+        return self.value
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[], None]
+    cadence: Cadence
+    last_run: float | None = None
+    runs: int = 0
+    last_duration: float = 0.0
+    total_duration: float = 0.0
+
+    @property
+    def avg_duration(self) -> float: return self.total_duration / self.runs if self.runs else 0.0
+
+
+class Scheduler:
+    """
+    Runs daemon stages on separate cadences so things which never change (distro, cpu model,
+    driver) aren't recomputed on every decision tick, and records how long every stage takes.
+    """
+
+    def __init__(self, fast_interval: float = DEFAULT_FAST_INTERVAL, slow_interval: float = DEFAULT_SLOW_INTERVAL):
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.stages: list[Stage] = []
+        self.adaptive = AdaptiveInterval()
+
+    def add(self, name: str, func: Callable[[], None], cadence: Cadence) -> None:
+        self.stages.append(Stage(name, func, cadence))
+
+    def configure(self, settings) -> None:
+        """
+        Take cadences and adaptive tick bounds from the compiled config settings (Settings)
+        """
+        self.fast_interval = settings.daemon.fast_interval
+        self.slow_interval = settings.daemon.slow_interval
+        self.adaptive.enabled = settings.daemon.adaptive_interval
+        for name, (min_default, max_default) in DEFAULT_TICK_BOUNDS.items():
+            profile = settings.profile(name)
+            self.adaptive.bounds[name] = (profile.min_tick_interval or min_default, profile.max_tick_interval or max_default)
+
+    def is_due(self, stage: Stage, now: float) -> bool:
+        if stage.last_run is None: return True
+        if stage.cadence == Cadence.FAST: return True
+        if stage.cadence == Cadence.SLOW: return now - stage.last_run >= self.slow_interval
+        return False
+
+    def run_due(self) -> list[str]:
+        """
+        Run every stage that is due, in the order they were added, returns the names of the stages that ran
+        """
+        ran = []
+        for stage in self.stages:
+            now = monotonic()
+            if not self.is_due(stage, now): continue
+            start = perf_counter()
+            try: stage.func()
+            finally:
+                stage.last_duration = perf_counter() - start
+                stage.total_duration += stage.last_duration
+                stage.runs += 1
+                stage.last_run = now
+            ran.append(stage.name)
+        return ran
+
+    def timings(self) -> dict[str, dict[str, float | int | str]]:
+        return {
+            stage.name: {
+                "cadence": str(stage.cadence),
+                "runs": stage.runs,
+                "last_ms": round(stage.last_duration * 1000, 2),
+                "avg_ms": round(stage.avg_duration * 1000, 2),
+            }
+            for stage in self.stages
+        }
+
+    def next_interval(self, history: Sequence[LoadSnapshot], profile: str | None, power_supply_changed: bool = False) -> float:
+        """
+        Seconds to wait until the next fast tick, fast_interval unless adaptive_interval is enabled
+        """
+        if not self.adaptive.enabled: return self.fast_interval
+        return self.adaptive.next(history, profile, self.fast_interval, power_supply_changed)
+
+    def print_timings(self, ran: list[str]) -> None:
+        print("Stage timings: " + ", ".join(
+            f"{stage.name} {stage.last_duration * 1000:.1f} ms (avg {stage.avg_duration * 1000:.1f} ms)"
+            for stage in self.stages if stage.name in ran
+        ))
+
+
+class AdaptiveInterval:
+    """
+    Picks the daemon tick interval: polls fast while load changes quickly or right after an
+    AC/battery transition, and backs off towards the profile's max_tick_interval while idle,
+    so the daemon's own wakeups stop costing battery.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.bounds: dict[str, tuple[float, float]] = dict(DEFAULT_TICK_BOUNDS)
+        self.interval = DEFAULT_FAST_INTERVAL
+        self.reason = "default"
+        self._profile: str | None = None
+        self._transition_time = 0.0
+
+    def next(self, history: Sequence[LoadSnapshot], profile: str | None, base: float, power_supply_changed: bool = False) -> float:
+        min_interval, max_interval = self.bounds.get(profile or "", (min(base, 0.25), base))
+        now = monotonic()
+
+        if power_supply_changed or (self._profile is not None and profile != self._profile): self._transition_time = now
+        self._profile = profile
+
+        recent = [snapshot.total for snapshot in list(history)[-5:]]
+        volatility = pstdev(recent) if len(recent) > 1 else 0.0
+        idle = bool(history) and history[-1].ewma < IDLE_LOAD
+
+        if now - self._transition_time < TRANSITION_HOLD:
+            interval, self.reason = min_interval, "power source changed"
+        elif volatility >= VOLATILE_LOAD:
+            interval, self.reason = min_interval, "load changing quickly"
+        elif volatility >= STEADY_LOAD:
+            interval, self.reason = self.interval / 2, "load changing"
+        elif idle:
+            # back off gradually, wakeups on an idle system are pure overhead
+            interval, self.reason = max(self.interval, base) * 1.5, "idle"
+        else:
+            interval, self.reason = base, "load steady"
+
+        self.interval = round(min(max(interval, min_interval), max_interval), 2)
+        return self.interval
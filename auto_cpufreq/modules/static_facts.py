@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - hardware/distro facts which don't change while the daemon runs
+import os, platform, sys
+from dataclasses import dataclass, field
+from threading import Lock
+
+from auto_cpufreq.globals import IS_INSTALLED_WITH_SNAP
+
+CPU_ROOT = "/sys/devices/system/cpu"
+SNAP_OS_RELEASE = "/var/lib/snapd/hostfs/etc/os-release"
+
+
+def parse_cpu_list(value: str) -> list[int]:
+    """
+    Parse a kernel cpu list such as "0-3,6,8-9"
+    """
+    cpus = []
+    for part in value.strip().split(","):
+        if not part: continue
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path, "r") as f: return f.read().strip()
+    except OSError: return None
+
+
+def _model_name() -> str:
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            for line in f:
+                if line.startswith("model name"): return line.split(":", 1)[-1].strip()
+    except OSError: pass
+    return "UNKNOWN"
+
+
+def _distro() -> tuple[str, str, str]:
+    """
+    Returns (description, name, version) of the running distro
+    """
+    import distro # only commands showing system info need it
+
+    try: distro.id()
+    except PermissionError:
+        # Current work-around for Pop!_OS where symlink causes permission issues
+        print("[!] Warning: Cannot get distro name")
+        if IS_INSTALLED_WITH_SNAP and os.path.exists("/etc/pop-os/os-release"):
+            print("[!] Snap install on PopOS detected, you must manually run the following"
+                    " commands in another terminal:\n")
+            print("[!] Backup the /etc/os-release file:")
+            print("sudo mv /etc/os-release /etc/os-release-backup\n")
+            print("[!] Create hardlink to /etc/os-release:")
+            print("sudo ln /etc/pop-os/os-release /etc/os-release\n")
+            print("[!] Aborting. Restart auto-cpufreq when you created the hardlink")
+        else:
+            print("[!] Check /etc/os-release permissions and make sure it is not a symbolic link")
+            print("[!] Aborting...")
+        sys.exit(1)
+
+    if not IS_INSTALLED_WITH_SNAP:
+        return " ".join(x for x in distro.linux_distribution()), distro.name(pretty=True), distro.version()
+
+    name, version = "UNKNOWN distro", "UNKNOWN version"
+    try:
+        with open(SNAP_OS_RELEASE, "r") as searchfile:
+            for line in searchfile:
+                if line.startswith("NAME="): name = line[5 : line.find("$")].strip('"')
+                elif line.startswith("VERSION="): version = line[8 : line.find("$")].strip('"')
+    except PermissionError as e: print(repr(e))
+    return f"{name} {version}", "UNKNOWN", "UNKNOWN"
+
+
+@dataclass(frozen=True)
+class StaticSystemFacts:
+    model_name: str
+    architecture: str
+    kernel: str
+    distro: str
+    distro_name: str
+    distro_version: str
+    driver: str | None
+    present_cpus: tuple[int, ...]
+    online_cpus: tuple[int, ...]
+    # online cpu -> core id and physical package id
+    core_ids: dict[int, int] = field(default_factory=dict)
+    package_ids: dict[int, int] = field(default_factory=dict)
+    # hardware frequency limits in MHz
+    min_freq: float | None = None
+    max_freq: float | None = None
+
+    @property
+    def total_cores(self) -> int: return len(self.present_cpus)
+
+    @property
+    def offline_cpus(self) -> list[int]: return [cpu for cpu in self.present_cpus if cpu not in self.online_cpus]
+
+
+class StaticFactsCache:
+    """
+    Gathers the static system facts once and hands out the same object until a cpu is
+    hotplugged or the cpufreq driver changes, checking that costs two sysfs reads.
+    """
+
+    def __init__(self, backend, cpu_root: str = CPU_ROOT):
+        self.backend = backend
+        self.cpu_root = cpu_root
+        self.gathered = 0
+        self._facts: StaticSystemFacts | None = None
+        self._key: tuple[str | None, str | None] | None = None
+        self._lock = Lock()
+
+    def _current_key(self) -> tuple[str | None, str | None]:
+        # read sysfs directly, asking the script backend for the driver would cost a shell-out per check
+        return _read(f"{self.cpu_root}/online"), _read(f"{self.cpu_root}/cpu0/cpufreq/scaling_driver")
+
+    def get(self) -> StaticSystemFacts:
+        with self._lock:
+            key = self._current_key()
+            if self._facts is None or key != self._key:
+                if self._key is not None: self.backend.refresh() # cpus came and went, re-enumerate them
+                self._facts, self._key = self.gather(key), key
+                self.gathered += 1
+            return self._facts
+
+    def invalidate(self) -> None:
+        with self._lock: self._facts = None
+
+    def gather(self, key: tuple[str | None, str | None]) -> StaticSystemFacts:
+        import psutil # only gathered once per hardware change, CLI commands which never ask start faster
+
+        online_mask, _ = key
+        driver = self.backend.driver()
+        online = parse_cpu_list(online_mask) if online_mask else list(range(psutil.cpu_count(logical=True) or 1))
+        present_mask = _read(f"{self.cpu_root}/present")
+        present = parse_cpu_list(present_mask) if present_mask else online
+
+        core_ids, package_ids = {}, {}
+        for cpu in online:
+            core_id = _read(f"{self.cpu_root}/cpu{cpu}/topology/core_id")
+            package_id = _read(f"{self.cpu_root}/cpu{cpu}/topology/physical_package_id")
+            core_ids[cpu] = int(core_id) if core_id and core_id.lstrip("-").isdigit() else cpu
+            package_ids[cpu] = int(package_id) if package_id and package_id.lstrip("-").isdigit() else 0
+
+        # psutil reports wrong max/min freqs with offline cores with percpu=False
+        try: freqs = psutil.cpu_freq(percpu=True) or []
+        except (NotImplementedError, OSError): freqs = []
+        description, name, version = _distro()
+
+        return StaticSystemFacts(
+            model_name=_model_name(),
+            architecture=platform.machine(),
+            kernel=platform.release(),
+            distro=description,
+            distro_name=name,
+            distro_version=version,
+            driver=driver,
+            present_cpus=tuple(present),
+            online_cpus=tuple(online),
+            core_ids=core_ids,
+            package_ids=package_ids,
+            min_freq=min((freq.min for freq in freqs if freq.min), default=None),
+            max_freq=max((freq.max for freq in freqs if freq.max), default=None),
+        )
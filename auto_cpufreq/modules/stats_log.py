@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - structured, size capped stats log
+import io, json, os
+from time import sleep, time
+from typing import Any, Iterator
+
+MAX_STATS_SIZE = 2 * 1024 * 1024 # bytes per file, one rotated file is kept next to the live one
+
+
+class StatsLog:
+    """
+    Append-only log of typed JSON records, one per line:
+      - {"type": "log", "text": ...} human readable daemon output, line by line
+      - {"type": "tick", ...} snapshot of a daemon tick: load, decisions and timings
+
+    Once the file exceeds max_bytes it is rotated to <path>.1, so the log never grows without bound.
+    """
+
+    def __init__(self, path: str | os.PathLike, max_bytes: int = MAX_STATS_SIZE):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self._file: io.TextIOWrapper | None = None
+
+    def open(self) -> None:
+        self._file = open(self.path, "w")
+
+    def close(self) -> None:
+        if self._file is not None: self._file.close()
+        self._file = None
+
+    def write(self, record: dict[str, Any]) -> None:
+        if self._file is None: self.open()
+        record.setdefault("time", time())
+        self._file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+        self._file.flush()
+        if self._file.tell() >= self.max_bytes: self._rotate()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        os.replace(self.path, self.path + ".1")
+        self.open()
+
+    @staticmethod
+    def _parse(line: str) -> dict[str, Any] | None:
+        try: record = json.loads(line)
+        except ValueError: return None # partially written line or a stats file from an older version
+        return record if isinstance(record, dict) else None
+
+    def tail(self, count: int = 50, type: str | None = None) -> list[dict[str, Any]]:
+        """
+        Last count records (of the given type), read backwards from the end of the file
+        """
+        try: f = open(self.path, "rb")
+        except OSError: return []
+        records: list[dict[str, Any]] = []
+        with f:
+            end = f.seek(0, os.SEEK_END)
+            block = 64 * 1024
+            remainder = b""
+            while end > 0 and len(records) < count:
+                start = max(0, end - block)
+                f.seek(start)
+                chunk = f.read(end - start) + remainder
+                lines = chunk.split(b"\n")
+                # the first line may be cut in half unless we reached the start of the file
+                remainder = lines.pop(0) if start > 0 else b""
+                for line in reversed(lines):
+                    record = self._parse(line.decode(errors="replace")) if line else None
+                    if record is None or (type is not None and record.get("type") != type): continue
+                    records.append(record)
+                    if len(records) == count: break
+                end = start
+        return records[::-1]
+
+    def latest(self, type: str = "tick") -> dict[str, Any] | None:
+        records = self.tail(1, type)
+        return records[0] if records else None
+
+    def follow(self, backlog: int = 50, poll: float = 0.5) -> Iterator[dict[str, Any]]:
+        """
+        Yield the last backlog records and then every new record as it's written, across rotations
+        """
+        yield from self.tail(backlog)
+        f = None
+        partial = ""
+        while True:
+            if f is None:
+                try:
+                    f = open(self.path, "r")
+                    inode = os.fstat(f.fileno()).st_ino
+                    if partial == "": f.seek(0, os.SEEK_END)
+                except OSError:
+                    sleep(poll)
+                    continue
+
+            line = f.readline()
+            if line:
+                partial += line
+                if not partial.endswith("\n"): continue
+                record = self._parse(partial)
+                partial = ""
+                if record is not None: yield record
+                continue
+
+            try: stat = os.stat(self.path)
+            except OSError: stat = None
+            if stat is None or stat.st_ino != inode or stat.st_size < f.tell():
+                # the log was rotated or truncated, continue at the start of the new file
+                f.close()
+                f, partial = None, ""
+                try: f = open(self.path, "r")
+                except OSError: pass
+                else: inode = os.fstat(f.fileno()).st_ino
+                continue
+            sleep(poll)
+
+
+class StatsWriter(io.TextIOBase):
+    """
+    File-like object the daemon's stdout is redirected to, every printed line becomes a "log" record
+    """
+
+    def __init__(self, log: StatsLog):
+        self.log = log
+        self._buffer = ""
+
+    def writable(self) -> bool: return True
+
+    def write(self, text: str) -> int:
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines: self.log.write({"type": "log", "text": line})
+        return len(text)
+
+    def flush(self) -> None: pass # partial lines are kept until they are completed
+
+    def close(self) -> None:
+        if self._buffer: self.log.write({"type": "log", "text": self._buffer})
+        self._buffer = ""
+        self.log.close()
+        super().close()
+
+
+def render_text(record: dict[str, Any]) -> str | None:
+    """
+    Text renderer, gives back the daemon output as it was printed
+    """
+    if record.get("type") == "log": return record.get("text", "")
+    return None
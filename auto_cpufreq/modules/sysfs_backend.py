@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - in-process replacement for the cpufreqctl.auto-cpufreq script
+import os
+from subprocess import getoutput, run
+from time import perf_counter
+
+CPU_ROOT = "/sys/devices/system/cpu"
+FIRMWARE_ROOT = "/sys/firmware"
+CPUFREQCTL = "cpufreqctl.auto-cpufreq"
+
+# same string to number conversion cpufreqctl.sh uses for --epb
+EPB_VALUES = {
+    "performance": 0,
+    "balance_performance": 4,
+    "default": 6,
+    "balance_power": 8,
+    "power": 15,
+}
+
+
+# a single cpu, a group of cpus (e.g. a cluster) or None for all online cpus
+Cpus = int | list[int] | tuple[int, ...] | None
+
+
+def parse_epb(value: str | int) -> int | None:
+    """Convert an EPB name or a number in the range [0-15] to the value written to sysfs"""
+    value = str(value).strip()
+    if value.isdigit() and 0 <= int(value) <= 15: return int(value)
+    return EPB_VALUES.get(value)
+
+
+class SysfsBackend:
+    """
+    Reads and writes CPU frequency scaling knobs directly through sysfs.
+
+    Mirrors every option of scripts/cpufreqctl.sh without spawning a shell, so a daemon tick
+    no longer costs one fork/exec (plus a /proc/cpuinfo scan) per knob.
+
+    cpufreq knobs are written once per cpufreq policy rather than once per cpu, all cpus in
+    a policy's related_cpus share its settings (cpuN/cpufreq is a link to policyN).
+    """
+
+    name = "sysfs"
+
+    def __init__(self, cpu_root: str = CPU_ROOT, firmware_root: str = FIRMWARE_ROOT):
+        self.cpu_root = cpu_root
+        self.firmware_root = firmware_root
+        self.cpus: list[int] = self._online_cpus()
+        self.policies: dict[str, list[int]] = self._policies()
+        self.writes = 0 # sysfs writes performed, callers diff it to report writes per tick
+
+    def _online_cpus(self) -> list[int]:
+        # cpufreqctl.sh counts the "processor" entries of /proc/cpuinfo, i.e. the online cpus
+        try: entries = os.listdir(self.cpu_root)
+        except OSError: return []
+        cpus = sorted(int(entry[3:]) for entry in entries if entry.startswith("cpu") and entry[3:].isdigit())
+        return [cpu for cpu in cpus if self._read(self._cpu_path(cpu, "online")) != "0"]
+
+    def _policies(self) -> dict[str, list[int]]:
+        """cpufreq policy directory -> its related cpus, empty on kernels without policy directories"""
+        root = f"{self.cpu_root}/cpufreq"
+        try: entries = os.listdir(root)
+        except OSError: return {}
+        policies = {}
+        for entry in sorted((entry for entry in entries if entry.startswith("policy") and entry[6:].isdigit()), key=lambda entry: int(entry[6:])):
+            related = (self._read(f"{root}/{entry}/related_cpus") or "").split()
+            policies[f"{root}/{entry}"] = [int(cpu) for cpu in related if cpu.isdigit()]
+        return policies
+
+    def refresh(self) -> None:
+        """Re-enumerate online cpus and cpufreq policies, call after a core was turned on or off"""
+        self.cpus = self._online_cpus()
+        self.policies = self._policies()
+
+    def _cpu_path(self, cpu: int, name: str) -> str: return f"{self.cpu_root}/cpu{cpu}/{name}"
+
+    def _cpufreq_path(self, cpu: int, name: str) -> str: return self._cpu_path(cpu, f"cpufreq/{name}")
+
+    @staticmethod
+    def _read(path: str) -> str | None:
+        try:
+            with open(path, "r") as f: return f.read().strip()
+        except OSError: return None
+
+    def _write(self, path: str, value: str | int) -> bool:
+        self.writes += 1
+        try:
+            with open(path, "w") as f: f.write(f"{value}\n")
+            return True
+        except OSError: return False
+
+    def _read_int(self, path: str) -> int | None:
+        value = self._read(path)
+        return int(value) if value is not None and value.lstrip("-").isdigit() else None
+
+    def _targets(self, core: Cpus) -> list[int]:
+        if core is None: return self.cpus
+        return [core] if isinstance(core, int) else list(core)
+
+    def _first(self, core: Cpus) -> int:
+        # min/max and their limits are read from one (the first) cpu of the selection
+        return 0 if core is None else self._targets(core)[0]
+
+    def _cpufreq_paths(self, name: str, core: Cpus) -> list[str]:
+        """One path per policy with an online target cpu, one per cpu if there are no policy directories"""
+        targets = self._targets(core)
+        if not self.policies: return [self._cpufreq_path(cpu, name) for cpu in targets]
+        targets = set(targets)
+        return [f"{policy}/{name}" for policy, cpus in self.policies.items() if targets.intersection(cpus)]
+
+    def _get_per_cpu(self, name: str, core: Cpus) -> str | None:
+        # one value per policy, all cpus of a policy report the same value
+        values = [self._read(path) for path in self._cpufreq_paths(name, core)]
+        values = [value for value in values if value is not None]
+        return " ".join(values) if values else None
+
+    def _set_per_cpu(self, name: str, value: str | int, core: Cpus) -> bool:
+        # like write_value in cpufreqctl.sh, policies without a writable file are skipped
+        results = [self._write(path, value) for path in self._cpufreq_paths(name, core)]
+        return any(results)
+
+    # -d, --driver
+    def driver(self) -> str | None: return self._read(self._cpufreq_path(0, "scaling_driver"))
+
+    # -g, --governor
+    def get_governor(self, core: Cpus = None) -> str | None: return self._get_per_cpu("scaling_governor", core)
+    def set_governor(self, value: str, core: Cpus = None) -> bool: return self._set_per_cpu("scaling_governor", value, core)
+    def available_governors(self) -> list[str]:
+        return (self._read(self._cpufreq_path(0, "scaling_available_governors")) or "").split()
+
+    # -e, --epp
+    def get_epp(self, core: Cpus = None) -> str | None: return self._get_per_cpu("energy_performance_preference", core)
+    def set_epp(self, value: str, core: Cpus = None) -> bool: return self._set_per_cpu("energy_performance_preference", value, core)
+    def available_epp(self) -> list[str]:
+        return (self._read(self._cpufreq_path(0, "energy_performance_available_preferences")) or "").split()
+
+    # --epb
+    def get_epb(self, core: Cpus = None) -> str | None:
+        values = [self._read(self._cpu_path(cpu, "power/energy_perf_bias")) for cpu in self._targets(core)]
+        values = [value for value in values if value is not None]
+        return " ".join(values) if values else None
+
+    def set_epb(self, value: str | int, core: Cpus = None) -> bool:
+        if self.driver() != "intel_pstate": return False
+        epb = parse_epb(value)
+        if epb is None: return False
+        return any([self._write(self._cpu_path(cpu, "power/energy_perf_bias"), epb) for cpu in self._targets(core)])
+
+    # -p, --pp
+    def get_platform_profile(self) -> str | None: return self._read(f"{self.firmware_root}/acpi/platform_profile")
+    def platform_profile_choices(self) -> list[str]:
+        return (self._read(f"{self.firmware_root}/acpi/platform_profile_choices") or "").split()
+
+    def set_platform_profile(self, value: str) -> bool:
+        if self.get_platform_profile() == value: return True
+        return self._write(f"{self.firmware_root}/acpi/platform_profile", value)
+
+    # -f, --frequency
+    def get_frequency(self, core: Cpus = None) -> int | None:
+        values = [self._read_int(self._cpufreq_path(cpu, "scaling_cur_freq")) for cpu in self._targets(core)]
+        return max((value for value in values if value is not None), default=None)
+
+    def set_frequency(self, value: int, core: Cpus = None) -> bool:
+        driver = self.driver() or ""
+        if driver.startswith("intel") or "pstate" in driver: return False # scaling_setspeed is unavailable for pstate drivers
+        return self._set_per_cpu("scaling_setspeed", value, core)
+
+    def available_frequencies(self) -> list[int]:
+        return [int(freq) for freq in (self._read(self._cpufreq_path(0, "scaling_available_frequencies")) or "").split()]
+
+    # --frequency-min, --frequency-max
+    def get_frequency_min(self, core: Cpus = None) -> int | None: return self._read_int(self._cpufreq_path(self._first(core), "scaling_min_freq"))
+    def get_frequency_max(self, core: Cpus = None) -> int | None: return self._read_int(self._cpufreq_path(self._first(core), "scaling_max_freq"))
+    # every policy's value (space separated like the governor), to tell whether they all agree
+    def get_frequency_min_per_policy(self, core: Cpus = None) -> str | None: return self._get_per_cpu("scaling_min_freq", core)
+    def get_frequency_max_per_policy(self, core: Cpus = None) -> str | None: return self._get_per_cpu("scaling_max_freq", core)
+    def set_frequency_min(self, value: int, core: Cpus = None) -> bool: return self._set_per_cpu("scaling_min_freq", value, core)
+    def set_frequency_max(self, value: int, core: Cpus = None) -> bool: return self._set_per_cpu("scaling_max_freq", value, core)
+
+    # --frequency-min-limit, --frequency-max-limit
+    def frequency_min_limit(self, core: Cpus = None) -> int | None:
+        values = [self._read_int(self._cpufreq_path(self._first(core), name)) for name in ("cpuinfo_min_freq", "scaling_min_freq")]
+        return min((value for value in values if value is not None), default=None)
+
+    def frequency_max_limit(self, core: Cpus = None) -> int | None:
+        values = [self._read_int(self._cpufreq_path(self._first(core), name)) for name in ("cpuinfo_max_freq", "scaling_max_freq")]
+        return max((value for value in values if value is not None), default=None)
+
+    # -b, --boost
+    def get_boost(self) -> int | None: return self._read_int(f"{self.cpu_root}/cpufreq/boost")
+    def set_boost(self, value: int) -> bool: return self._write(f"{self.cpu_root}/cpufreq/boost", value)
+
+    # intel_pstate: --no-turbo, --min-perf, --max-perf
+    def get_no_turbo(self) -> int | None: return self._read_int(f"{self.cpu_root}/intel_pstate/no_turbo")
+    def set_no_turbo(self, value: int) -> bool: return self._write(f"{self.cpu_root}/intel_pstate/no_turbo", value)
+    def get_min_perf(self) -> int | None: return self._read_int(f"{self.cpu_root}/intel_pstate/min_perf_pct")
+    def set_min_perf(self, value: int) -> bool: return self._write(f"{self.cpu_root}/intel_pstate/min_perf_pct", value)
+    def get_max_perf(self) -> int | None: return self._read_int(f"{self.cpu_root}/intel_pstate/max_perf_pct")
+    def set_max_perf(self, value: int) -> bool: return self._write(f"{self.cpu_root}/intel_pstate/max_perf_pct", value)
+
+    # --on, --off
+    def set_core_online(self, core: int, online: bool) -> bool:
+        result = self._write(self._cpu_path(core, "online"), int(online))
+        self.refresh()
+        return result
+
+    # --throttle
+    def throttle_count(self) -> int:
+        return sum(self._read_int(self._cpu_path(cpu, "thermal_throttle/core_throttle_count")) or 0 for cpu in self.cpus)
+
+
+class ScriptBackend:
+    """
+    Fallback backend which drives the cpufreqctl.auto-cpufreq script, used when sysfs can't be
+    accessed directly (or when AUTO_CPUFREQ_BACKEND=script is set).
+    """
+
+    name = "script"
+    writes = 0 # cpufreqctl invocations which set a value
+
+    @staticmethod
+    def _get(args: str) -> str | None:
+        output = getoutput(f"{CPUFREQCTL} {args}").strip()
+        return output if output else None
+
+    def _set(self, args: str, value: str | int) -> bool:
+        self.writes += 1
+        return run(f"{CPUFREQCTL} {args} --set={value}", shell=True).returncode == 0
+
+    @staticmethod
+    def _core(core: int | None) -> str: return "" if core is None else f" --core={core}"
+
+    def _get_int(self, args: str) -> int | None:
+        value = self._get(args)
+        return int(value) if value is not None and value.isdigit() else None
+
+    def refresh(self) -> None: pass
+
+    def driver(self) -> str | None: return self._get("--driver")
+
+    def get_governor(self, core: int | None = None) -> str | None: return self._get("--governor" + self._core(core))
+    def set_governor(self, value: str, core: int | None = None) -> bool: return self._set("--governor" + self._core(core), value)
+    def available_governors(self) -> list[str]: return (self._get("--governor --available") or "").split()
+
+    def get_epp(self, core: int | None = None) -> str | None: return self._get("--epp" + self._core(core))
+    def set_epp(self, value: str, core: int | None = None) -> bool: return self._set("--epp" + self._core(core), value)
+    def available_epp(self) -> list[str]: return (self._get("--epp --available") or "").split()
+
+    def get_epb(self, core: int | None = None) -> str | None: return self._get("--epb" + self._core(core))
+    def set_epb(self, value: str | int, core: int | None = None) -> bool: return self._set("--epb" + self._core(core), value)
+
+    def get_platform_profile(self) -> str | None: return self._get("--pp")
+    def platform_profile_choices(self) -> list[str]: return (self._get("--pp --available") or "").split()
+    def set_platform_profile(self, value: str) -> bool: return self._set("--pp", value)
+
+    def get_frequency(self, core: int | None = None) -> int | None: return self._get_int("--frequency" + self._core(core))
+    def set_frequency(self, value: int, core: int | None = None) -> bool: return self._set("--frequency" + self._core(core), value)
+    def available_frequencies(self) -> list[int]: return [int(freq) for freq in (self._get("--frequency --available") or "").split()]
+
+    def get_frequency_min(self, core: int | None = None) -> int | None: return self._get_int("--frequency-min" + self._core(core))
+    def get_frequency_max(self, core: int | None = None) -> int | None: return self._get_int("--frequency-max" + self._core(core))
+    # cpufreqctl only reports a single cpu's frequencies
+    def get_frequency_min_per_policy(self, core: int | None = None) -> str | None: return self._get("--frequency-min" + self._core(core))
+    def get_frequency_max_per_policy(self, core: int | None = None) -> str | None: return self._get("--frequency-max" + self._core(core))
+    def set_frequency_min(self, value: int, core: int | None = None) -> bool: return self._set("--frequency-min" + self._core(core), value)
+    def set_frequency_max(self, value: int, core: int | None = None) -> bool: return self._set("--frequency-max" + self._core(core), value)
+
+    def frequency_min_limit(self, core: int | None = None) -> int | None: return self._get_int("--frequency-min-limit" + self._core(core))
+    def frequency_max_limit(self, core: int | None = None) -> int | None: return self._get_int("--frequency-max-limit" + self._core(core))
+
+    def get_boost(self) -> int | None: return self._get_int("--boost")
+    def set_boost(self, value: int) -> bool: return self._set("--boost", value)
+
+    def get_no_turbo(self) -> int | None: return self._get_int("--no-turbo")
+    def set_no_turbo(self, value: int) -> bool: return self._set("--no-turbo", value)
+    def get_min_perf(self) -> int | None: return self._get_int("--min-perf")
+    def set_min_perf(self, value: int) -> bool: return self._set("--min-perf", value)
+    def get_max_perf(self) -> int | None: return self._get_int("--max-perf")
+    def set_max_perf(self, value: int) -> bool: return self._set("--max-perf", value)
+
+    def set_core_online(self, core: int, online: bool) -> bool:
+        return run(f"{CPUFREQCTL} {'--on' if online else '--off'} --core={core}", shell=True).returncode == 0
+
+    def throttle_count(self) -> int: return self._get_int("--throttle") or 0
+
+
+def get_backend() -> SysfsBackend | ScriptBackend:
+    """
+    Use the in-process sysfs backend unless it was explicitly disabled
+    or the cpufreq sysfs interface can't be read
+    """
+    if os.getenv("AUTO_CPUFREQ_BACKEND") == "script": return ScriptBackend()
+    if not os.access(f"{CPU_ROOT}/cpu0/cpufreq", os.R_OK): return ScriptBackend()
+    return SysfsBackend()
+
+
+def benchmark(iterations: int = 20) -> None:
+    """
+    Compare the cost of one daemon tick worth of cpufreqctl calls between both backends.
+
+    Every knob is read and, when running as root, written back with its current value,
+    so running the benchmark doesn't change the state of the system.
+    """
+    writable = os.geteuid() == 0
+
+    def tick(backend: SysfsBackend | ScriptBackend) -> None:
+        governor = (backend.get_governor(0) or "").split(" ")[0]
+        epp = (backend.get_epp(0) or "").split(" ")[0]
+        epb = (backend.get_epb(0) or "").split(" ")[0]
+        platform_profile = backend.get_platform_profile()
+        backend.frequency_min_limit()
+        backend.frequency_max_limit()
+        min_freq = backend.get_frequency_min()
+        max_freq = backend.get_frequency_max()
+        backend.driver()
+        if not writable: return
+        if governor: backend.set_governor(governor)
+        if epp: backend.set_epp(epp)
+        if epb: backend.set_epb(epb)
+        if platform_profile: backend.set_platform_profile(platform_profile)
+        if min_freq: backend.set_frequency_min(min_freq)
+        if max_freq: backend.set_frequency_max(max_freq)
+
+    print(f"Benchmarking {iterations} ticks ({'read/write' if writable else 'read only, run as root to include writes'})")
+    for backend in (SysfsBackend(), ScriptBackend()):
+        start_times = os.times()
+        start = perf_counter()
+        for _ in range(iterations): tick(backend)
+        elapsed = perf_counter() - start
+        end_times = os.times()
+        # fork/exec cost shows up as cpu time of the (waited for) child processes
+        children = (end_times.children_user + end_times.children_system) - (start_times.children_user + start_times.children_system)
+        own = (end_times.user + end_times.system) - (start_times.user + start_times.system)
+        print(
+            f"{backend.name:>6}: {elapsed / iterations * 1000:8.2f} ms/tick wall, "
+            f"{own / iterations * 1000:8.2f} ms/tick cpu, {children / iterations * 1000:8.2f} ms/tick child cpu, "
+            f"{backend.writes / iterations:.0f} writes/tick"
+        )
+
+
+if __name__ == "__main__": benchmark()
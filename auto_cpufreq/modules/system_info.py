@@ -1,20 +1,14 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import os
 from pathlib import Path
-import platform
-from subprocess import getoutput
 from typing import Tuple, List
 import psutil
-import distro
 from pathlib import Path
 from auto_cpufreq.config.config import config
-from auto_cpufreq.core import get_power_supply_ignore_list
-from auto_cpufreq.globals import (
-    AVAILABLE_GOVERNORS_SORTED,
-    CPU_TEMP_SENSOR_PRIORITY,
-    IS_INSTALLED_WITH_SNAP,
-    POWER_SUPPLY_DIR,
-)
+from auto_cpufreq.core import capabilities, static_facts, temperatures
+from auto_cpufreq.modules.load_sampler import load_sampler
+from auto_cpufreq.modules.power_supply_index import power_supply_index
+from auto_cpufreq.globals import available_governors_sorted
 from typing import Optional
 
 
@@ -34,6 +28,10 @@ class BatteryInfo:
     charging_stop_threshold: int | None
     battery_level: int | None
     power_consumption: float | None
+    # with several batteries the level, power and energy are the combined ones
+    batteries: list[str] = field(default_factory=list)
+    energy_now: float | None = None # Wh
+    energy_full: float | None = None # Wh
 
     def __repr__(self) -> str:
         if self.is_charging:
@@ -42,6 +40,15 @@ class BatteryInfo:
             return f"discharging {('(' + '{:.2f}'.format(self.power_consumption) + ' W)') if self.power_consumption != None else ''}"
         return "Not Charging"
 
+    @property
+    def combined(self) -> str | None:
+        """
+        "BAT0 + BAT1 (41.3 / 88.1 Wh)" when several batteries are reported as one
+        """
+        if len(self.batteries) < 2: return None
+        energy = f" ({self.energy_now:.1f} / {self.energy_full:.1f} Wh)" if self.energy_now is not None and self.energy_full is not None else ""
+        return " + ".join(self.batteries) + energy
+
 
 @dataclass
 class SystemReport:
@@ -71,58 +78,47 @@ class SystemInfo:
     Provides system information related to CPU, distribution, and performance metrics.
     """
 
-    def __init__(self):
-        self.distro_name: str = (
-            distro.name(pretty=True) if not IS_INSTALLED_WITH_SNAP else "UNKNOWN"
-        )
-        self.distro_version: str = (
-            distro.version() if not IS_INSTALLED_WITH_SNAP else "UNKNOWN"
-        )
-        self.architecture: str = platform.machine()
-        self.processor_model: str = (
-            getoutput("grep -E 'model name' /proc/cpuinfo -m 1").split(":")[-1].strip()
-        )
-        self.total_cores: int | None = psutil.cpu_count(logical=True)
-        self.cpu_driver: str = getoutput(
-            "cat /sys/devices/system/cpu/cpu0/cpufreq/scaling_driver"
-        ).strip()
-        self.kernel_version: str = platform.release()
+    # static facts are shared with the daemon and only gathered again on cpu hotplug or driver change
+    @property
+    def distro_name(self) -> str: return static_facts.get().distro_name
+
+    @property
+    def distro_version(self) -> str: return static_facts.get().distro_version
+
+    @property
+    def architecture(self) -> str: return static_facts.get().architecture
+
+    @property
+    def processor_model(self) -> str: return static_facts.get().model_name
+
+    @property
+    def total_cores(self) -> int | None: return static_facts.get().total_cores
+
+    @property
+    def cpu_driver(self) -> str: return static_facts.get().driver or ""
+
+    @property
+    def kernel_version(self) -> str: return static_facts.get().kernel
 
     @staticmethod
-    def cpu_min_freq() -> float | None:
-        freqs = psutil.cpu_freq(percpu=True)
-        return min((freq.min for freq in freqs), default=None)
+    def cpu_min_freq() -> float | None: return static_facts.get().min_freq
 
     @staticmethod
-    def cpu_max_freq() -> float | None:
-        freqs = psutil.cpu_freq(percpu=True)
-        return max((freq.max for freq in freqs), default=None)
+    def cpu_max_freq() -> float | None: return static_facts.get().max_freq
 
     @staticmethod
     def get_cpu_info() -> List[CoreInfo]:
         """Returns detailed CPU information for each core."""
-        cpu_usage = psutil.cpu_percent(percpu=True)
+        snapshot = load_sampler.snapshot()
+        cpu_usage = snapshot.per_cpu
         cpu_freqs = psutil.cpu_freq(percpu=True)
-
-        try:
-            temps = psutil.sensors_temperatures()
-            temp_sensor = []
-            for sensor in CPU_TEMP_SENSOR_PRIORITY:
-                temp_sensor = temps.get(sensor, [])
-                if temp_sensor != []:
-                    break
-
-            core_temps = [temp.current for temp in temp_sensor]
-        except AttributeError:
-            core_temps = []
-
-        avg_temp = sum(core_temps) / len(core_temps) if core_temps else 0.0
+        temps = temperatures.read()
 
         return [
             CoreInfo(
                 id=i,
                 usage=cpu_usage[i],
-                temperature=core_temps[i] if i < len(core_temps) else avg_temp,
+                temperature=temps.per_cpu.get(snapshot.cpu_ids[i], temps.average),
                 frequency=cpu_freqs[i].current,
             )
             for i in range(len(cpu_usage))
@@ -145,29 +141,23 @@ class SystemInfo:
 
     @staticmethod
     def current_epp(is_ac_plugged: bool) -> str | None:
-        epp_path = "/sys/devices/system/cpu/cpu0/cpufreq/energy_performance_preference"
-        if not Path(epp_path).exists():
+        if not capabilities.get().epp:
             return None
             
-        return config.get_config().get( 
-            "charger" if is_ac_plugged else "battery", "energy_performance_preference", fallback="balance_performance" if is_ac_plugged else "balance_power"
-        )
+        epp = config.profile("charger" if is_ac_plugged else "battery").energy_performance_preference
+        return epp or ("balance_performance" if is_ac_plugged else "balance_power")
 
     @staticmethod
     def current_epb(is_ac_plugged: bool) -> str | None:
-        epb_path = "/sys/devices/system/cpu/intel_pstate"
-        if not Path(epb_path).exists():
+        if not capabilities.get().intel_pstate:
             return None
 
-        return config.get_config().get(
-            "charger" if is_ac_plugged else "battery", "energy_perf_bias", fallback="balance_performance" if is_ac_plugged else "balance_power"
-        )
+        epb = config.profile("charger" if is_ac_plugged else "battery").energy_perf_bias
+        return epb or ("balance_performance" if is_ac_plugged else "balance_power")
 
     @staticmethod
     def cpu_usage() -> float:
-        return psutil.cpu_percent(
-            interval=0.5
-        )  # Reduced interval for better responsiveness
+        return load_sampler.snapshot().total
 
     @staticmethod
     def system_load() -> float:
@@ -179,8 +169,7 @@ class SystemInfo:
 
     @staticmethod
     def avg_temp() -> int:
-        temps: List[float] = [i.temperature for i in SystemInfo.get_cpu_info()]
-        return int(sum(temps) / len(temps))
+        return int(temperatures.average())
 
     @staticmethod
     def turbo_on() -> Tuple[bool | None, bool | None]:
@@ -192,19 +181,16 @@ class SystemInfo:
 
         The second value indicates whether auto mode is enabled (amd_pstate only), None if unknown
         """
-        intel_pstate = Path("/sys/devices/system/cpu/intel_pstate/no_turbo")
-        cpu_freq = Path("/sys/devices/system/cpu/cpufreq/boost")
-        amd_pstate = Path("/sys/devices/system/cpu/amd_pstate/status")
+        caps = capabilities.get()
 
-        if intel_pstate.exists():
-            control_file: Path = intel_pstate
+        if caps.no_turbo:
+            control_file = Path(caps.no_turbo.path)
             inverse_logic = True
-        elif cpu_freq.exists():
-            control_file = cpu_freq
+        elif caps.boost:
+            control_file = Path(caps.boost.path)
             inverse_logic = False
-        elif amd_pstate.exists():
-            amd_status: str = amd_pstate.read_text().strip()
-            if amd_status == "active":
+        elif caps.amd_pstate_status is not None:
+            if caps.amd_pstate_status == "active":
                 return None, True
             return None, False
         else:
@@ -226,112 +212,57 @@ class SystemInfo:
             return None
 
     @staticmethod
-    def get_battery_path() -> Optional[str]:
+    def _batteries() -> list:
+        # a battery device set in the config is reported on its own, otherwise all batteries combined
+        battery_device = config.get_config().get("battery", "battery_device", fallback="").strip()
+        if battery_device:
+            battery = power_supply_index.battery(battery_device)
+            if battery is not None: return [battery]
+        return power_supply_index.batteries()
 
-        # Check if user has specified a custom battery device in config
-        if config.has_config():
-            conf = config.get_config()
-            if conf.has_option("battery", "battery_device"):
-                battery_device = conf.get("battery", "battery_device").strip()
-                if battery_device:
-                    custom_path = os.path.join(POWER_SUPPLY_DIR, battery_device)
-                    type_path = os.path.join(custom_path, "type")
-                    # Validate that the specified device exists and is a battery
-                    if os.path.isfile(type_path):
-                        content = SystemInfo.read_file(type_path)
-                        if content and content.lower() == "battery":
-                            return custom_path
-
-        # Fall back to auto-detection if no custom device specified or if it's invalid
-        try:
-            for entry in os.listdir(POWER_SUPPLY_DIR):
-                path = os.path.join(POWER_SUPPLY_DIR, entry)
-                type_path = os.path.join(path, "type")
-                if os.path.isfile(type_path):
-                    content = SystemInfo.read_file(type_path)
-                    if content and content.lower() == "battery":
-                        return path
-        except Exception:
-            return None
-        return None
+    @staticmethod
+    def get_battery_path() -> Optional[str]:
+        batteries = SystemInfo._batteries()
+        return batteries[0].path if batteries else None
 
     @staticmethod
     def battery_info() -> BatteryInfo:
 
-        battery_path = SystemInfo.get_battery_path()
+        batteries = SystemInfo._batteries()
 
         # By default, AC is considered connected if no battery is detected
-        is_ac_plugged = True
-        is_charging = None
-        battery_level = None
-        power_consumption = None
-        charging_start_threshold = None
-        charging_stop_threshold = None
-
-        if not battery_path:
+        if not batteries:
 
             # No battery detected
             return BatteryInfo(
                 is_charging=None,
-                is_ac_plugged=is_ac_plugged,
+                is_ac_plugged=True,
                 charging_start_threshold=None,
                 charging_stop_threshold=None,
                 battery_level=None,
                 power_consumption=None,
             )
 
-        # Reading AC info (Hands)
-        for supply in os.listdir(POWER_SUPPLY_DIR):
-            supply_path = os.path.join(POWER_SUPPLY_DIR, supply)
-            supply_type = SystemInfo.read_file(os.path.join(supply_path, "type"))
-            if supply_type == "Mains":
-                online = SystemInfo.read_file(os.path.join(supply_path, "online"))
-                is_ac_plugged = online == "1"
-
-        # Reading battery information
-        battery_status = SystemInfo.read_file(os.path.join(battery_path, "status"))
-        battery_capacity = SystemInfo.read_file(os.path.join(battery_path, "capacity"))
-
-        # first check for wattage in power_now
-        # this is not found on all laptops
-        energy_rate = (
-            SystemInfo.read_file(os.path.join(battery_path, "power_now"))
-        )
-
-        # if power_now wasn't found, try calculating wattage using current and voltage
-        if energy_rate is None:
-            current = SystemInfo.read_file(os.path.join(battery_path, "current_now"))
-            voltage = SystemInfo.read_file(os.path.join(battery_path, "voltage_now"))
-
-            if (current and current.isdigit()) and (voltage and voltage.isdigit()):
-                energy_rate = (int(current) * int(voltage)) / 1_000_000
- 
+        view = power_supply_index.battery_view(batteries)
+        ac_online = power_supply_index.ac_online()
 
-
-        charge_start_threshold = (
-            SystemInfo.read_file(os.path.join(battery_path, "charge_start_threshold"))
-            or SystemInfo.read_file(os.path.join(battery_path, "charge_control_start_threshold"))
-        )
-        charge_stop_threshold = (
-            SystemInfo.read_file(os.path.join(battery_path, "charge_stop_threshold"))
-            or SystemInfo.read_file(os.path.join(battery_path, "charge_control_end_threshold"))
-        )
-        is_charging = battery_status.lower() == "charging" if battery_status else None
-        battery_level = int(battery_capacity) if battery_capacity and battery_capacity.isdigit() else None
-        power_consumption = float(energy_rate) / 1_000_000 if energy_rate \
-            and str(energy_rate).replace('.', '', 1).isdigit() else None
-        charging_start_threshold = int(charge_start_threshold) if charge_start_threshold \
-            and charge_start_threshold.isdigit() else None
-        charging_stop_threshold = int(charge_stop_threshold) if charge_stop_threshold \
-            and charge_stop_threshold.isdigit() else None
+        # thresholds are set the same on every battery, report the first one's
+        battery = batteries[0]
+        charge_start_threshold = battery.read_int("charge_start_threshold")
+        if charge_start_threshold is None: charge_start_threshold = battery.read_int("charge_control_start_threshold")
+        charge_stop_threshold = battery.read_int("charge_stop_threshold")
+        if charge_stop_threshold is None: charge_stop_threshold = battery.read_int("charge_control_end_threshold")
 
         return BatteryInfo(
-            is_charging=is_charging,
-            is_ac_plugged=is_ac_plugged,
-            charging_start_threshold=charging_start_threshold,
-            charging_stop_threshold=charging_stop_threshold,
-            battery_level=battery_level,
-            power_consumption=power_consumption,
+            is_charging=view.status.lower() == "charging" if view.status else None,
+            is_ac_plugged=ac_online if ac_online is not None else True,
+            charging_start_threshold=charge_start_threshold,
+            charging_stop_threshold=charge_stop_threshold,
+            battery_level=view.capacity,
+            power_consumption=view.power_w,
+            batteries=view.names,
+            energy_now=view.energy_now_wh,
+            energy_full=view.energy_full_wh,
         )
 
     @staticmethod
@@ -346,8 +277,8 @@ class SystemInfo:
     @staticmethod
     def governor_suggestion() -> str:
         if SystemInfo.battery_info().is_ac_plugged:
-            return AVAILABLE_GOVERNORS_SORTED[0]
-        return AVAILABLE_GOVERNORS_SORTED[-1]
+            return available_governors_sorted()[0]
+        return available_governors_sorted()[-1]
 
     def generate_system_report(self) -> SystemReport:
         battery_info = self.battery_info()
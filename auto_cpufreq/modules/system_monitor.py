@@ -2,8 +2,11 @@ import sys
 from typing import Callable
 import urwid
 import time
+from .stats_log import StatsLog
 from .system_info import SystemReport, system_info
 from auto_cpufreq.config.config import config
+from auto_cpufreq.core import auto_cpufreq_stats_path
+from auto_cpufreq.modules.daemon_api import query
 from enum import Enum
 
 
@@ -95,8 +98,16 @@ class SystemMonitor:
         current_time = time.strftime("%H:%M:%S")
         self.title_header.set_text(f"{self.type} Mode - {current_time}")
 
-        report: SystemReport = system_info.generate_system_report()
-        self.format_system_info(report)
+        # the stats view shows what the daemon itself measured and decided, the system is only
+        # sampled here (and the stats log read) when the daemon doesn't answer on its socket
+        state = query({"cmd": "state", "history": 0}) if self.type == ViewType.STATS else None
+        if state is not None:
+            self.format_daemon_snapshot(state["snapshot"])
+            self.format_daemon_tick(state["snapshot"])
+        else:
+            report: SystemReport = system_info.generate_system_report()
+            self.format_system_info(report)
+            if self.type == ViewType.STATS: self.format_daemon_tick(StatsLog(auto_cpufreq_stats_path).latest("tick"))
 
         # Restore focus positions
         if len(self.left_content) > 0:
@@ -176,6 +187,7 @@ class SystemMonitor:
                     aligned_text(
                         f"Battery percentage: {(str(report.battery_info.battery_level) + '%') if report.battery_info.battery_level != None else 'Unknown'}"
                     ),
+                    *([aligned_text(f"Batteries: {report.battery_info.combined}")] if report.battery_info.combined else []),
                     aligned_text(
                         f'AC plugged: {("Yes" if report.battery_info.is_ac_plugged else "No") if report.battery_info.is_ac_plugged != None else "Unknown"}'
                     ),
@@ -289,6 +301,73 @@ class SystemMonitor:
                 )
             )
 
+    def format_daemon_snapshot(self, tick: dict | None):
+        self.left_content.clear()
+        self.right_content.clear()
+
+        def aligned_text(text: str) -> urwid.Text:
+            return urwid.Text(text, align="left")
+
+        self.left_content.extend([urwid.AttrMap(aligned_text("Daemon Measurements"), "header"), aligned_text("")])
+        if tick is None: return
+        if config.has_config():
+            self.left_content.extend([aligned_text(f"Using settings defined in {config.path} file"), aligned_text("")])
+
+        self.left_content.extend(
+            [
+                aligned_text(f"Total CPU usage: {tick.get('cpu_usage', 0):.1f} %"),
+                aligned_text(f"Busiest core usage: {tick.get('max_core_usage', 0):.1f} %"),
+                aligned_text(f"Total system load: {tick.get('load1m', 0):.2f}"),
+                aligned_text(f"Runnable tasks: {tick.get('run_queue', 0)}"),
+            ]
+        )
+        for resource, pressure in (tick.get("pressure") or {}).items():
+            self.left_content.append(aligned_text(f"{resource.upper()} pressure: {pressure['some_avg10']:.1f} % (avg10)"))
+
+        clusters = tick.get("clusters") or {}
+        if clusters:
+            self.left_content.extend([aligned_text(""), urwid.AttrMap(aligned_text("Clusters"), "header"), aligned_text("")])
+            for name, cluster in clusters.items():
+                applied = cluster.get("applied") or {}
+                self.left_content.append(
+                    aligned_text(f"{name} (CPUs {', '.join(map(str, cluster['cpus']))}): {cluster.get('load', 0):.1f} %, governor {applied.get('governor') or 'not set'}")
+                )
+
+        resources = tick.get("resources")
+        if resources:
+            self.left_content.extend(
+                [aligned_text(""), aligned_text(f"Daemon: {resources['rss_mb']} MB resident memory, {resources['threads']} threads")]
+            )
+
+    def format_daemon_tick(self, tick: dict | None):
+        def aligned_text(text: str) -> urwid.Text:
+            return urwid.Text(text, align="left")
+
+        self.right_content.extend([aligned_text(""), urwid.AttrMap(aligned_text("Daemon Decisions"), "header"), aligned_text("")])
+        if tick is None:
+            self.right_content.append(aligned_text("No daemon tick recorded yet"))
+            return
+
+        applied = tick.get("applied", {})
+        turbo = applied.get("turbo")
+        controller = tick.get("turbo") or {}
+        forecast = tick.get("forecast") or {}
+        self.right_content.extend(
+            [
+                aligned_text(f"Last tick: {time.strftime('%H:%M:%S', time.localtime(tick.get('time', 0)))}"),
+                aligned_text(f"Profile: {tick.get('profile') or 'Unknown'}"),
+                aligned_text(f"Governor: {applied.get('governor') or 'Unknown'} (override: {tick.get('governor_override')})"),
+                aligned_text(f"EPP: {applied.get('epp') or 'not set'}"),
+                aligned_text(f"EPB: {applied.get('epb') or 'not set'}"),
+                aligned_text(f"Turbo boost: {'Unknown' if turbo is None else ('On' if turbo else 'Off')} (override: {tick.get('turbo_override')})"),
+                aligned_text(f"Turbo decision: {controller.get('reason', 'Unknown')}, {controller.get('transitions_per_hour', 0)} transitions/hour"),
+                aligned_text(f"CPU usage: {tick.get('cpu_usage', 0):.1f} % (EWMA {tick.get('cpu_usage_ewma', 0):.1f} %)"),
+                aligned_text(f"Forecast: {forecast.get('utilization', 0):.1f} % next interval (mean error {forecast.get('mae')} %)"),
+                aligned_text(f"Refresh interval: {tick.get('interval', 0):g} s ({tick.get('interval_reason')})"),
+                aligned_text(f"Knob writes: {tick.get('writes_performed', 0)} performed, {tick.get('writes_skipped', 0)} skipped"),
+            ]
+        )
+
     def run(self, on_quit: Callable[[], None] | None = None):
         try:
             if on_quit:
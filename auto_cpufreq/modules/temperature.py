@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - direct hwmon cpu temperature reader
+import os
+from dataclasses import dataclass, field
+from glob import glob
+from math import nan
+from threading import Lock
+from time import monotonic
+
+from auto_cpufreq.globals import CPU_TEMP_SENSOR_PRIORITY
+
+HWMON_ROOT = "/sys/class/hwmon"
+# readings taken within this many seconds are shared, so every consumer of a tick sees the same values
+MAX_AGE = 0.5
+
+
+@dataclass
+class TemperatureSample:
+    timestamp: float
+    package: float | None
+    per_cpu: dict[int, float] = field(default_factory=dict)
+
+    @property
+    def average(self) -> float:
+        if self.per_cpu: return sum(self.per_cpu.values()) / len(self.per_cpu)
+        return self.package if self.package is not None else 0.0
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path, "r") as f: return f.read().strip()
+    except OSError: return None
+
+
+def _inputs(hwmon: str) -> list[tuple[str, str]]:
+    """
+    (label, input path) of every temperature input of a hwmon device, in index order
+    """
+    inputs = []
+    for path in sorted(glob(f"{hwmon}/temp*_input"), key=lambda p: int(os.path.basename(p)[4:-6] or 0)):
+        label = _read(path[:-6] + "_label")
+        inputs.append((label or os.path.basename(path)[:-6], path))
+    return inputs
+
+
+class TemperatureReader:
+    """
+    Resolves which hwmon inputs hold the cpu temperatures once (coretemp per core, a "CPU"/"Tctl"
+    labelled input or the first input of the remaining CPU_TEMP_SENSOR_PRIORITY sensors), then reads
+    only those inputs through descriptors kept open, instead of walking every hwmon device per call.
+    """
+
+    def __init__(self, facts=None, hwmon_root: str = HWMON_ROOT, max_age: float = MAX_AGE):
+        self.facts = facts # StaticFactsCache, its topology maps cpus to coretemp "Core N" inputs
+        self.hwmon_root = hwmon_root
+        self.max_age = max_age
+        self.sensor: str | None = None
+        self._package: str | None = None
+        self._cores: dict[int, str] = {}
+        self._fds: dict[str, int] = {}
+        self._resolved_for = None
+        self._sample: TemperatureSample | None = None
+        self._lock = Lock()
+
+    def _topology(self) -> tuple[dict[int, int], dict[int, int]]:
+        if self.facts is None: return {}, {}
+        facts = self.facts.get()
+        return facts.core_ids, facts.package_ids
+
+    def _devices(self) -> dict[str, list[str]]:
+        devices: dict[str, list[str]] = {}
+        for hwmon in sorted(glob(f"{self.hwmon_root}/hwmon*")):
+            name = _read(f"{hwmon}/name")
+            if name: devices.setdefault(name, []).append(hwmon)
+        return devices
+
+    def resolve(self) -> None:
+        """
+        Pick the sensor inputs and open them, called again when the cpu topology changes
+        """
+        self.close()
+        self.sensor, self._package, self._cores = None, None, {}
+        core_ids, package_ids = self._topology()
+        devices = self._devices()
+
+        if "coretemp" in devices:
+            # one coretemp device per package, with a "Package id P" input and a "Core N" input per core
+            by_core, packages = {}, {}
+            for hwmon in devices["coretemp"]:
+                inputs = _inputs(hwmon)
+                package = next((int(label.split()[-1]) for label, _ in inputs if label.startswith("Package id")), 0)
+                for label, path in inputs:
+                    if label.startswith("Package id"): packages[package] = path
+                    elif label.startswith("Core "): by_core[(package, int(label.split()[-1]))] = path
+            self.sensor = "coretemp"
+            self._package = packages.get(0) or next(iter(packages.values()), None)
+            for cpu, core in core_ids.items():
+                path = by_core.get((package_ids.get(cpu, 0), core))
+                if path is not None: self._cores[cpu] = path
+        else:
+            for name, hwmons in devices.items():
+                for hwmon in hwmons:
+                    for label, path in _inputs(hwmon):
+                        if ("CPU" in label or "Tctl" in label) and self._read_input(path):
+                            self.sensor, self._package = name, path
+                            break
+                    if self.sensor: break
+                if self.sensor: break
+            for name in CPU_TEMP_SENSOR_PRIORITY[1:]:
+                if self.sensor: break
+                for hwmon in devices.get(name, []):
+                    inputs = _inputs(hwmon)
+                    if inputs and self._read_input(inputs[0][1]):
+                        self.sensor, self._package = name, inputs[0][1]
+                        break
+
+        for path in [self._package, *self._cores.values()]:
+            if path is None or path in self._fds: continue
+            try: self._fds[path] = os.open(path, os.O_RDONLY)
+            except OSError: pass
+        self._resolved_for = self.facts.get() if self.facts is not None else True
+
+    def close(self) -> None:
+        for fd in self._fds.values():
+            try: os.close(fd)
+            except OSError: pass
+        self._fds = {}
+
+    def _read_input(self, path: str) -> float | None:
+        fd = self._fds.get(path)
+        try:
+            if fd is not None: raw = os.pread(fd, 32, 0)
+            else:
+                with open(path, "rb") as f: raw = f.read(32)
+            return int(raw) / 1000
+        except (OSError, ValueError): return None
+
+    def _stale(self) -> bool:
+        if self._resolved_for is None: return True
+        # the facts cache hands out a new object after cpu hotplug or a driver change
+        return self.facts is not None and self.facts.get() is not self._resolved_for
+
+    def sample(self) -> TemperatureSample:
+        if self._stale(): self.resolve()
+        package = self._read_input(self._package) if self._package else None
+        per_cpu = {}
+        for cpu, path in self._cores.items():
+            temp = self._read_input(path)
+            if temp is not None: per_cpu[cpu] = temp
+        if (self._package and package is None) or len(per_cpu) < len(self._cores):
+            # the hwmon device went away (module reload, suspend), look for the sensors again next time
+            self._resolved_for = None
+        return TemperatureSample(monotonic(), package, per_cpu)
+
+    def read(self) -> TemperatureSample:
+        """
+        Latest temperatures, memoized for max_age seconds so repeated calls in a tick cost nothing
+        """
+        with self._lock:
+            if self._sample is None or monotonic() - self._sample.timestamp >= self.max_age:
+                self._sample = self.sample()
+            return self._sample
+
+    def average(self) -> float: return self.read().average
+
+    def cpu(self, cpu: int) -> float:
+        """
+        Temperature of one cpu, the package temperature where there is no per core sensor
+        """
+        sample = self.read()
+        temp = sample.per_cpu.get(cpu, sample.package)
+        return nan if temp is None else temp
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - turbo boost controller with hysteresis
+from collections import deque
+from dataclasses import dataclass
+from time import monotonic
+
+HOUR = 3600.0
+
+
+@dataclass(frozen=True)
+class TurboSettings:
+    on_load: float = 20.0 # turbo goes on once total cpu usage (%) reaches this
+    off_load: float = 10.0 # and only goes off again once it drops below this
+    min_on_time: float = 10.0 # seconds turbo stays on before it may be turned off
+    min_off_time: float = 5.0 # seconds turbo stays off before it may be turned on
+    temp_limit: float = 70.0 # above this average core temp (°C) high system load alone doesn't keep turbo on
+    temp_hysteresis: float = 5.0 # ... until the temperature dropped this far below temp_limit
+
+
+class TurboController:
+    """
+    Decides the turbo state from load and temperature with separate on/off thresholds,
+    minimum dwell times and temperature hysteresis, so a load hovering around one threshold
+    no longer toggles turbo (a sysfs write and a frequency transition) on every tick.
+    The state is kept across ticks and profiles, turbo is a single system wide knob.
+    """
+
+    def __init__(self):
+        self.state: bool | None = None
+        self.reason = "not decided yet"
+        self.hot = False
+        self.changed_at = 0.0
+        self.transitions: deque[float] = deque()
+
+    def _set(self, value: bool, now: float) -> None:
+        if self.state is not None and value != self.state: self.transitions.append(now)
+        if value != self.state: self.changed_at = now
+        self.state = value
+
+    def force(self, value: bool, reason: str, now: float | None = None) -> bool:
+        """
+        Record a state set regardless of load, by the config (always/never) or a turbo override
+        """
+        self._set(value, monotonic() if now is None else now)
+        self.reason = reason
+        return value
+
+    def update(self, settings: TurboSettings, load: float, temperature: float, busy: bool = False, now: float | None = None) -> bool:
+        """
+        Next turbo state, busy marks high load which isn't reflected in the total cpu usage
+        (a single core at full load or a long run queue), it only keeps turbo on while not hot
+        """
+        now = monotonic() if now is None else now
+        if temperature >= settings.temp_limit: self.hot = True
+        elif temperature < settings.temp_limit - settings.temp_hysteresis: self.hot = False
+
+        if load >= settings.on_load: wanted, reason = True, f"cpu usage {load}% >= {settings.on_load:g}%"
+        elif self.state and load >= settings.off_load: wanted, reason = True, f"cpu usage {load}% >= {settings.off_load:g}% off threshold"
+        elif busy and not self.hot: wanted, reason = True, "high load"
+        elif busy: wanted, reason = False, f"high load, but average core temp {temperature:.0f}°C is too high"
+        else: wanted, reason = False, f"cpu usage {load}% < {settings.off_load if self.state else settings.on_load:g}%"
+
+        if self.state is not None and wanted != self.state:
+            dwell = settings.min_on_time if self.state else settings.min_off_time
+            if now - self.changed_at < dwell:
+                self.reason = f"kept {'on' if self.state else 'off'} for at least {dwell:g} s ({reason})"
+                return self.state
+
+        self._set(wanted, now)
+        self.reason = reason
+        return wanted
+
+    def transitions_per_hour(self, now: float | None = None) -> int:
+        now = monotonic() if now is None else now
+        while self.transitions and now - self.transitions[0] > HOUR: self.transitions.popleft()
+        return len(self.transitions)
+
+    def stats(self) -> dict:
+        now = monotonic()
+        return {
+            "state": None if self.state is None else ("on" if self.state else "off"),
+            "reason": self.reason,
+            "hot": self.hot,
+            "since_s": round(now - self.changed_at, 1) if self.state is not None else None,
+            "transitions_per_hour": self.transitions_per_hour(now),
+        }
+
+
+turbo_controller = TurboController()
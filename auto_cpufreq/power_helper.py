@@ -2,6 +2,7 @@
 # * alert user on snap if detected and how to remove first time live/stats message starts
 # * if daemon is disabled and auto-cpufreq is removed (snap) remind user to enable it back
 import click
+from functools import cache
 from shutil import which
 from subprocess import call, DEVNULL, getoutput, STDOUT
 from sys import argv
@@ -28,14 +29,16 @@ systemctl_exists = does_command_exists("systemctl")
 tlp_stat_exists = does_command_exists("tlp-stat")
 tuned_stat_exists = does_command_exists("tuned")
 
-# detect if gnome power profile service is running
-if not IS_INSTALLED_WITH_SNAP:
-    if systemctl_exists:
-        try: gnome_power_status = call(["systemctl", "is-active", "--quiet", "power-profiles-daemon"])
-        except:
-            print("\nUnable to determine init system")
-            print("If this causes any problems, please submit an issue:")
-            print(GITHUB+"/issues")
+# detect if gnome power profile service is running, checked once when first needed
+@cache
+def gnome_power_active():
+    if IS_INSTALLED_WITH_SNAP or not systemctl_exists: return False
+    try: return call(["systemctl", "is-active", "--quiet", "power-profiles-daemon"]) == 0
+    except:
+        print("\nUnable to determine init system")
+        print("If this causes any problems, please submit an issue:")
+        print(GITHUB+"/issues")
+        return False
 
 # alert in case TLP service is running
 def tlp_service_detect():
@@ -57,7 +60,7 @@ def tlp_service_detect_snap():
 
 # alert in case gnome power profile service is running
 def gnome_power_detect():
-    if systemctl_exists and not bool(gnome_power_status):
+    if systemctl_exists and gnome_power_active():
         warning()
         print("Detected running GNOME Power Profiles daemon service!")
         print("\nThis daemon might interfere with auto-cpufreq and will be automatically")
@@ -72,7 +75,7 @@ def gnome_power_detect():
 
 # automatically disable gnome power profile service in case it's running during install
 def gnome_power_detect_install():
-    if systemctl_exists and not bool(gnome_power_status):
+    if systemctl_exists and gnome_power_active():
         warning()
         print("Detected running GNOME Power Profiles daemon service!")
         print("\nThis daemon might interfere with auto-cpufreq and has been disabled.\n")
@@ -95,7 +98,7 @@ def gnome_power_detect_snap():
 
 # stops gnome >= 40 power profiles (live)
 def gnome_power_stop_live():
-    if systemctl_exists and not bool(gnome_power_status) and powerprofilesctl_exists:
+    if systemctl_exists and gnome_power_active() and powerprofilesctl_exists:
         call(["powerprofilesctl", "set", "balanced"])
         call(["systemctl", "stop", "power-profiles-daemon"])
 
@@ -235,7 +238,7 @@ def bluetooth_on_notif_snap():
 
 # gnome power removal reminder
 def gnome_power_rm_reminder():
-    if systemctl_exists and bool(gnome_power_status):
+    if systemctl_exists and not gnome_power_active():
         warning()
         print("Detected GNOME Power Profiles daemon service is stopped!")
         print("This service will now be enabled and started again.\n")
@@ -280,7 +283,7 @@ def disable_tuned_daemon():
 def gnome_power_svc_disable():
     snap_pkg_check = 0
     if systemctl_exists:
-        if bool(gnome_power_status):
+        if not gnome_power_active():
             try:
                 # check if snap package installed
                 snap_pkg_check = call(['snap', 'list', '|', 'grep', 'auto-cpufreq'], 
@@ -300,7 +303,7 @@ def gnome_power_svc_disable():
                 print("There was a problem, couldn't determine GNOME Power Profiles Daemon")
                 snap_pkg_check = 0
 
-        if not bool(gnome_power_status) and powerprofilesctl_exists:
+        if gnome_power_active() and powerprofilesctl_exists:
             if snap_pkg_check == 1:
                 print("auto-cpufreq snap package not installed.\nGNOME Power Profiles Daemon should be enabled, run:\n\n"
                     "sudo python3 -m auto_cpufreq.power_helper --gnome_power_enable"
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - memory and thread budget of the daemon
+import subprocess, sys, time
+from tempfile import TemporaryDirectory
+
+from auto_cpufreq.core import resource_usage
+from auto_cpufreq.modules.daemon_api import query
+
+# steady state of the daemon after startup, with psi = true
+RSS_BUDGET_MB = 40
+THREAD_BUDGET = 2
+
+# the daemon loop without the stages writing cpufreq settings and charge thresholds
+DAEMON = """
+import sys
+from auto_cpufreq.config.config import config
+from auto_cpufreq.modules import daemon_core
+from auto_cpufreq.modules.daemon_api import daemon_api
+
+config.set_path(sys.argv[1])
+daemon_api.path = sys.argv[2]
+for stage in ("gov_check", "cpufreqctl", "set_autofreq"): setattr(daemon_core, stage, lambda: None)
+daemon_core.start_battery_daemon = lambda loop: None
+daemon_core.run()
+"""
+
+
+def measure(settle: float = 5.0) -> dict[str, float | int] | None:
+    """
+    Start the daemon loop, returns its resource usage settle seconds after its first tick
+    """
+    with TemporaryDirectory() as directory:
+        conf, socket_path = f"{directory}/auto-cpufreq.conf", f"{directory}/daemon.sock"
+        with open(conf, "w") as f: f.write("[daemon]\npsi = true\n")
+        process = subprocess.Popen([sys.executable, "-c", DAEMON, conf, socket_path], stdout=subprocess.DEVNULL)
+        try:
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline and process.poll() is None:
+                state = query({"cmd": "state", "history": 0}, socket_path)
+                if state is not None and state["snapshot"] is not None: break
+                time.sleep(0.1)
+            else: return None
+            time.sleep(settle)
+            return resource_usage(process.pid)
+        finally:
+            process.terminate()
+            process.wait(10)
+
+
+if __name__ == "__main__":
+    # usage: PYTHONPATH=. python3 bench/daemon_budget.py
+    usage = measure()
+    if usage is None:
+        print("The daemon didn't complete a tick")
+        sys.exit(1)
+    print(f"{'ok  ' if usage['rss_mb'] <= RSS_BUDGET_MB else 'FAIL'} RSS     {usage['rss_mb']:6.1f} MB (budget {RSS_BUDGET_MB} MB)")
+    print(f"{'ok  ' if usage['threads'] <= THREAD_BUDGET else 'FAIL'} threads {usage['threads']:6d}    (budget {THREAD_BUDGET})")
+    sys.exit(0 if usage["rss_mb"] <= RSS_BUDGET_MB and usage["threads"] <= THREAD_BUDGET else 1)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - daemon liveness check benchmark
+import psutil, sys
+from time import perf_counter
+
+from auto_cpufreq.modules.daemon_lock import daemon_lock
+
+
+def benchmark(runs: int = 20) -> None:
+    """
+    Compare the daemon liveness check used by --force, --turbo, --get-state and --stats:
+    scanning every process's command line (the previous check) against probing the lock
+    """
+    def process_scan():
+        for p in psutil.process_iter():
+            try: cmd = p.cmdline()
+            except psutil.Error: continue
+            if any("auto-cpufreq" in part for part in cmd) and "--daemon" in cmd: return True
+        return False
+
+    checks = {"process scan": process_scan, "lock probe": daemon_lock.held}
+    print(f"{len(psutil.pids())} processes, daemon running: {daemon_lock.held()}")
+    for name, check in checks.items():
+        start = perf_counter()
+        for _ in range(runs): check()
+        print(f"  {name:<13} {(perf_counter() - start) / runs * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    # usage: PYTHONPATH=. python3 bench/daemon_lock.py [RUNS]
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+#
+# auto-cpufreq - process table cost per daemon tick benchmark
+import os, sys
+from tempfile import TemporaryDirectory
+from time import process_time
+
+from auto_cpufreq.modules.proc_connector import CN_IDX_PROC, CN_MSG, CN_VAL_PROC, NLMSG_DONE, NLMSGHDR, PROC_EVENT, PROC_EVENT_EXEC, PROC_EVENT_EXIT, parse_proc_events
+from auto_cpufreq.modules.process_rules import ProcessRule, ProcessRules, ProcessScanner, read_process
+
+
+def _event(what: int, pid: int) -> bytes:
+    payload = CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, PROC_EVENT.size + 8, 0) + PROC_EVENT.pack(what, 0, 0, pid, pid) + bytes(8)
+    return NLMSGHDR.pack(NLMSGHDR.size + len(payload), NLMSG_DONE, 0, 0, 0) + payload
+
+
+def benchmark(processes: int = 5000, ticks: int = 200, churn: int = 20) -> None:
+    """
+    Compare the cpu time the process table costs per daemon tick with processes running,
+    churn of which are replaced every tick: reading every process (like psutil.process_iter()),
+    the incremental /proc scan, and proc connector events. Uses a generated /proc tree.
+    """
+    with TemporaryDirectory() as proc_root:
+        def spawn(pid):
+            os.mkdir(f"{proc_root}/{pid}")
+            with open(f"{proc_root}/{pid}/stat", "w") as f: f.write(f"{pid} (worker {pid}) S 1" + " 0" * 48 + "\n")
+
+        def kill(pid):
+            os.remove(f"{proc_root}/{pid}/stat")
+            os.rmdir(f"{proc_root}/{pid}")
+
+        for pid in range(1, processes + 1): spawn(pid)
+        next_pid = processes + 1
+        scanner, rules = ProcessScanner(proc_root), ProcessRules(proc_root)
+        scanner.scan()
+        rules.scanner.scan()
+        rules.stale = False
+        rules.rules = [ProcessRule("benchmark", match_name=("cc1plus",))]
+
+        results = {"read every process": 0.0, "incremental /proc scan": 0.0, "proc connector events": 0.0}
+        for tick in range(ticks):
+            gone = list(range(next_pid - processes, next_pid - processes + churn))
+            new = list(range(next_pid, next_pid + churn))
+            for pid in gone: kill(pid)
+            for pid in new: spawn(pid)
+            next_pid += churn
+            datagrams = [_event(PROC_EVENT_EXIT, pid) for pid in gone] + [_event(PROC_EVENT_EXEC, pid) for pid in new]
+
+            start = process_time()
+            for entry in os.listdir(proc_root):
+                if entry.isdigit(): read_process(int(entry), proc_root)
+            results["read every process"] += process_time() - start
+
+            start = process_time()
+            scanner.scan()
+            results["incremental /proc scan"] += process_time() - start
+
+            start = process_time()
+            for data in datagrams:
+                for event, pid in parse_proc_events(data): rules.handle_event(event, pid)
+            results["proc connector events"] += process_time() - start
+
+        assert scanner.processes.keys() == rules.scanner.processes.keys()
+        print(f"{processes} processes, {churn} replaced per tick, cpu time per tick over {ticks} ticks:")
+        for name, seconds in results.items(): print(f"  {name:<24} {seconds / ticks * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    # usage: PYTHONPATH=. python3 bench/proc_connector.py [PROCESSES]
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
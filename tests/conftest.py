@@ -0,0 +1,14 @@
+import pytest
+
+from auto_cpufreq.modules.override_store import OverrideStore
+
+
+@pytest.fixture
+def override_store(tmp_path, monkeypatch):
+    """
+    Empty override store in a temporary directory, in place of the one the CLI and daemon share
+    """
+    from auto_cpufreq import core
+    store = OverrideStore(tmp_path / "overrides.json", {})
+    monkeypatch.setattr(core, "overrides", store)
+    return store
@@ -0,0 +1,106 @@
+from configparser import ConfigParser
+
+import pytest
+
+from auto_cpufreq.config import config as config_module
+from auto_cpufreq.config.config import _Config
+from auto_cpufreq.config.profile import ConfigError, DaemonSettings, compile_settings
+from auto_cpufreq.modules.capabilities import Capabilities, Knob
+
+CAPABILITIES = Capabilities(
+    governors=("performance", "powersave"),
+    epp=Knob("energy_performance_preference", True, True, ("performance", "balance_power", "power")),
+    platform_profile=Knob("platform_profile", True, True, ("low-power", "balanced", "performance")),
+)
+
+
+def parse(text: str) -> ConfigParser:
+    conf = ConfigParser()
+    conf.read_string(text)
+    return conf
+
+
+def test_valid_choices():
+    settings = compile_settings(parse("""
+        [battery]
+        governor = powersave
+        energy_performance_preference = power
+        energy_perf_bias = 8
+        platform_profile = low-power
+        [charger]
+        energy_perf_bias = balance_performance
+    """), CAPABILITIES)
+    assert settings.battery.governor == "powersave"
+    assert settings.battery.platform_profile == "low-power"
+    assert settings.charger.energy_perf_bias == "balance_performance"
+
+
+def test_invalid_choices():
+    with pytest.raises(ConfigError) as e:
+        compile_settings(parse("""
+            [battery]
+            governor = schedutil
+            energy_performance_preference = balanced
+            energy_perf_bias = 16
+            platform_profile = quiet
+            [charger.big]
+            governor = ondemand
+        """), CAPABILITIES)
+    assert [error.split(":")[0] for error in e.value.errors] == [
+        "Invalid value for 'governor' in [battery]",
+        "Invalid value for 'energy_performance_preference' in [battery]",
+        "Invalid value for 'energy_perf_bias' in [battery]",
+        "Invalid value for 'platform_profile' in [battery]",
+        "Invalid value for 'governor' in [charger.big]",
+    ]
+
+
+def test_unreported_choices_are_not_checked():
+    # e.g. a system without platform_profile, the daemon then says it's not supported
+    settings = compile_settings(parse("[battery]\nplatform_profile = quiet"), Capabilities())
+    assert settings.battery.platform_profile == "quiet"
+
+
+def test_invalid_reload_keeps_last_good_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_module, "probe", lambda: CAPABILITIES)
+    path = tmp_path / "auto-cpufreq.conf"
+    config = _Config()
+    config.path = str(path)
+    path.write_text("[battery]\ngovernor = powersave\n")
+    config.update_config()
+    path.write_text("[battery]\ngovernor = schedutil\n")
+    config.update_config()
+    assert config.generation == 1
+    assert config.profile("battery").governor == "powersave"
+
+
+def test_daemon_settings():
+    settings = compile_settings(parse("""
+        [daemon]
+        fast_interval = 1.5
+        adaptive_interval = true
+        psi = true
+        psi_threshold = 25
+        [battery]
+        max_tick_interval = 60
+    """))
+    assert settings.daemon == DaemonSettings(fast_interval=1.5, adaptive_interval=True, psi=True, psi_threshold=25.0)
+    assert (settings.battery.min_tick_interval, settings.battery.max_tick_interval) == (None, 60.0)
+
+
+def test_invalid_daemon_settings():
+    with pytest.raises(ConfigError) as e:
+        compile_settings(parse("""
+            [daemon]
+            fast_interval = 0
+            adaptive_interval = maybe
+            psi_threshold = 150
+            [charger]
+            min_tick_interval = 20
+        """))
+    assert [error.split(":")[0] for error in e.value.errors] == [
+        "'min_tick_interval' is larger than 'max_tick_interval' in [charger]",
+        "Invalid value for 'fast_interval' in [daemon]",
+        "Invalid value for 'adaptive_interval' in [daemon]",
+        "Invalid value for 'psi_threshold' in [daemon]",
+    ]
@@ -0,0 +1,52 @@
+import subprocess, sys, time
+
+import pytest
+
+from auto_cpufreq.core import resource_usage
+from auto_cpufreq.modules.daemon_api import query
+
+# Threads of the daemon after startup: the main thread running the event loop (control loop,
+# timers, config file watcher, event sockets, API server) and, with psi = true, the cpu pressure
+# trigger watcher. Its memory depends on the interpreter and is checked by bench/daemon_budget.py.
+THREAD_BUDGET = 2
+
+DAEMON = """
+import sys
+from auto_cpufreq.config.config import config
+from auto_cpufreq.modules import daemon_core
+from auto_cpufreq.modules.daemon_api import daemon_api
+
+config.set_path(sys.argv[1])
+daemon_api.path = sys.argv[2]
+# the stages writing cpufreq settings and charge thresholds are left out, the system isn't touched
+for stage in ("gov_check", "cpufreqctl", "set_autofreq"): setattr(daemon_core, stage, lambda: None)
+daemon_core.start_battery_daemon = lambda loop: None
+daemon_core.run()
+"""
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    conf = tmp_path / "auto-cpufreq.conf"
+    conf.write_text("[daemon]\npsi = true\n")
+    socket_path = str(tmp_path / "daemon.sock")
+    process = subprocess.Popen([sys.executable, "-c", DAEMON, str(conf), socket_path], stdout=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline and process.poll() is None:
+            state = query({"cmd": "state", "history": 0}, socket_path)
+            if state is not None and state["snapshot"] is not None: break
+            time.sleep(0.1)
+        else: pytest.fail("the daemon didn't complete a tick")
+        yield process
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+def test_daemon_threads(daemon):
+    # let startup and one more tick settle
+    time.sleep(2.5)
+    usage = resource_usage(daemon.pid)
+    assert usage is not None
+    assert usage["threads"] <= THREAD_BUDGET
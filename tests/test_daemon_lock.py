@@ -0,0 +1,105 @@
+import os, signal, subprocess, sys
+
+import pytest
+
+from auto_cpufreq import core
+from auto_cpufreq.modules.daemon_lock import DaemonLock
+
+HOLDER = """
+import sys, time
+from auto_cpufreq.modules.daemon_lock import DaemonLock
+
+assert DaemonLock(sys.argv[1]).acquire()
+print("locked", flush=True)
+time.sleep(60)
+"""
+
+# auto-cpufreq with the pidfile given as first argument
+CLI = """
+import sys
+from auto_cpufreq.modules.daemon_lock import daemon_lock
+
+daemon_lock.path = sys.argv.pop(1)
+from auto_cpufreq.bin.auto_cpufreq import main
+main()
+"""
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """
+    A process holding the lock like a running daemon does
+    """
+    path = str(tmp_path / "auto-cpufreq.pid")
+    process = subprocess.Popen([sys.executable, "-c", HOLDER, path], stdout=subprocess.PIPE, text=True)
+    try:
+        assert process.stdout.readline() == "locked\n"
+        yield process, path
+    finally:
+        process.kill()
+        process.wait()
+
+
+def test_no_daemon_has_run(tmp_path):
+    assert DaemonLock(str(tmp_path / "auto-cpufreq.pid")).holder() is None
+
+
+def test_running_daemon(daemon):
+    process, path = daemon
+    lock = DaemonLock(path)
+    assert lock.holder() == process.pid
+    assert not lock.acquire()
+
+
+def test_stale_pidfile(daemon):
+    process, path = daemon
+    # a daemon which didn't get to release the lock leaves its pid behind
+    process.send_signal(signal.SIGKILL)
+    process.wait()
+    with open(path) as f: assert f.read() == f"{process.pid}\n"
+    lock = DaemonLock(path)
+    assert lock.holder() is None
+    assert lock.acquire()
+    assert lock.holder() == os.getpid()
+    lock.release()
+
+
+def test_probe_doesnt_take_the_lock(tmp_path):
+    """
+    --force, --turbo and --get-state probe for a running daemon, which must never keep one from starting
+    """
+    path = str(tmp_path / "auto-cpufreq.pid")
+    stopped = DaemonLock(path)
+    stopped.acquire()
+    stopped.release() # leaves the file behind like a daemon which stopped
+    probe, daemon = DaemonLock(path), DaemonLock(path)
+    assert probe.holder() is None
+    assert daemon.acquire()
+    assert probe.holder() == os.getpid() and probe.held()
+    daemon.release()
+    assert not probe.held()
+
+
+def test_liveness_check(daemon, monkeypatch):
+    _, path = daemon
+    monkeypatch.setattr(core, "daemon_lock", DaemonLock(path))
+    core.not_running_daemon_check()
+
+    monkeypatch.setattr(core, "daemon_lock", DaemonLock(path + ".missing"))
+    with pytest.raises(SystemExit): core.not_running_daemon_check()
+
+
+@pytest.mark.parametrize("flag", ["--force=lock-check", "--turbo=lock-check", "--get-state"])
+def test_cli_paths(flag, daemon, tmp_path):
+    """
+    The CLI reports no daemon for a stale pidfile and finds the one holding the lock
+    """
+    _, path = daemon
+    # invalid --force/--turbo values change nothing, the overrides aren't touched
+    def run(lock_path):
+        return subprocess.run([sys.executable, "-c", CLI, lock_path, flag], stdin=subprocess.DEVNULL, capture_output=True, text=True)
+
+    stale = tmp_path / "stale.pid"
+    stale.write_text("999999\n")
+    assert "not running in daemon mode" in run(str(stale)).stdout
+    assert "not running in daemon mode" not in run(path).stdout
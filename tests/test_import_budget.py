@@ -0,0 +1,44 @@
+import subprocess, sys
+
+import pytest
+
+# modules only the commands which actually need them may import
+HEAVY = (
+    "psutil", "distro", "gi", "requests", "urwid", "pyinotify", "asyncio",
+    "auto_cpufreq.modules.daemon_core", "auto_cpufreq.modules.event_loop", "auto_cpufreq.modules.system_monitor",
+)
+
+# flag -> heavy modules it may import
+# invalid --force/--turbo values go through the same code path without changing anything
+ALLOWED = {
+    "--version": ("distro", "psutil"),
+    "--help": (),
+    "--donate": (),
+    "--get-state": (),
+    "--force=budget-check": (),
+    "--turbo=budget-check": (),
+}
+
+# runs auto-cpufreq and writes the names in sys.modules to the file given as first argument when it exits
+CLI = """
+import atexit, sys
+
+path = sys.argv.pop(1)
+def dump():
+    with open(path, "w") as f: f.write("\\n".join(sys.modules))
+atexit.register(dump)
+from auto_cpufreq.bin.auto_cpufreq import main
+main()
+"""
+
+
+def imported_modules(flag: str, path) -> set[str]:
+    subprocess.run([sys.executable, "-c", CLI, str(path), flag], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return set(path.read_text().splitlines())
+
+
+@pytest.mark.parametrize("flag", ALLOWED)
+def test_heavy_modules_not_imported(flag, tmp_path):
+    modules = imported_modules(flag, tmp_path / "modules")
+    assert "auto_cpufreq.core" in modules
+    assert sorted(module for module in HEAVY if module in modules and module not in ALLOWED[flag]) == []
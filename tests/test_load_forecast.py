@@ -0,0 +1,26 @@
+from auto_cpufreq.modules.load_forecast import LoadForecaster
+from auto_cpufreq.modules.load_sampler import LoadSnapshot
+
+
+def snapshot(timestamp: int, total: float) -> LoadSnapshot:
+    return LoadSnapshot(timestamp=timestamp, total=total, per_cpu=[total], cpu_ids=[0], max_core=total, ewma=total, load1m=0.0)
+
+
+def test_forecast_at_horizon():
+    forecaster = LoadForecaster(alpha=1.0, beta=1.0)
+    forecaster.set_horizon(3)
+    forecaster.update([snapshot(t, 10.0 * t) for t in range(1, 5)])
+    # a steady rise of 10 % per sample is extrapolated over 3 samples
+    assert forecaster.forecast().utilization == 70.0
+    assert forecaster.forecast(1).utilization == 50.0
+
+
+def test_error_is_scored_at_horizon():
+    forecaster = LoadForecaster(alpha=1.0, beta=1.0)
+    forecaster.set_horizon(2)
+    forecaster.update([snapshot(t, 10.0 * t) for t in range(1, 6)])
+    # once the trend is known the linear series is forecast exactly two samples ahead
+    assert list(forecaster.errors) == [20.0, 0.0, 0.0]
+    forecaster.update([snapshot(6, 10.0)])
+    # the forecast made after the 4th sample expected 60 %
+    assert forecaster.errors[-1] == -50.0
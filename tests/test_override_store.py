@@ -0,0 +1,25 @@
+from auto_cpufreq import core
+
+
+def test_push_override_to_daemon(monkeypatch, override_store, capsys):
+    requests = []
+    monkeypatch.setattr(core, "query", lambda request: requests.append(request) or {"ok": True, "messages": ["set"]})
+    core.push_override(governor="powersave")
+    assert requests == [{"cmd": "set_override", "governor": "powersave"}]
+    # the daemon stores it, not the client
+    assert override_store.get("governor") == "default"
+    assert capsys.readouterr().out == "set\n"
+
+
+def test_push_override_refused(monkeypatch, override_store, capsys):
+    monkeypatch.setattr(core, "query", lambda request: {"ok": False, "error": "Must be run as root"})
+    core.push_override(governor="powersave", turbo="never")
+    assert override_store.all() == {"governor": "default", "turbo": "auto"}
+    assert capsys.readouterr().out == "Daemon refused override: Must be run as root\n"
+
+
+def test_push_override_without_daemon(monkeypatch, override_store, capsys):
+    monkeypatch.setattr(core, "query", lambda request: None)
+    core.push_override(turbo="never")
+    assert override_store.all() == {"governor": "default", "turbo": "never"}
+    assert "takes effect once it is restarted" in capsys.readouterr().out
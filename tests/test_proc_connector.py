@@ -0,0 +1,70 @@
+import errno
+
+from auto_cpufreq.modules.proc_connector import (
+    CN_IDX_PROC, CN_MSG, CN_VAL_PROC, NLMSG_DONE, NLMSGHDR, PROC_EVENT, PROC_EVENT_COMM, PROC_EVENT_EXEC, PROC_EVENT_EXIT,
+    ProcConnector, parse_proc_events,
+)
+
+PROC_EVENT_FORK = 0x00000001
+
+
+def message(what: int, pid: int, tgid: int | None = None) -> bytes:
+    """
+    One netlink message carrying a proc event, padded like the kernel's (the event data union is larger)
+    """
+    payload = CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, PROC_EVENT.size + 8, 0) + PROC_EVENT.pack(what, 0, 0, pid, pid if tgid is None else tgid) + bytes(8)
+    return NLMSGHDR.pack(NLMSGHDR.size + len(payload), NLMSG_DONE, 0, 0, 0) + payload
+
+
+def test_single_message():
+    assert parse_proc_events(message(PROC_EVENT_EXEC, 42)) == [("exec", 42)]
+
+
+def test_multi_message_datagram():
+    data = message(PROC_EVENT_EXEC, 1) + message(PROC_EVENT_COMM, 2) + message(PROC_EVENT_EXIT, 3)
+    assert parse_proc_events(data) == [("exec", 1), ("comm", 2), ("exit", 3)]
+
+
+def test_unaligned_length_is_padded():
+    # a message whose length isn't a multiple of 4 is followed by padding up to the next one
+    first = bytearray(message(PROC_EVENT_EXEC, 1))
+    first[:4] = (len(first) - 2).to_bytes(4, "little")
+    assert parse_proc_events(bytes(first) + message(PROC_EVENT_EXIT, 2)) == [("exec", 1), ("exit", 2)]
+
+
+def test_threads_and_other_events_are_filtered():
+    data = message(PROC_EVENT_EXEC, 11, tgid=10) + message(PROC_EVENT_EXIT, 12, tgid=10) + message(PROC_EVENT_FORK, 13) + message(PROC_EVENT_EXIT, 10)
+    assert parse_proc_events(data) == [("exit", 10)]
+
+
+def test_truncated_datagram():
+    data = message(PROC_EVENT_EXEC, 1) + message(PROC_EVENT_EXEC, 2)[:NLMSGHDR.size + 4]
+    assert parse_proc_events(data) == [("exec", 1)]
+
+
+class FakeSocket:
+    def __init__(self, *results):
+        self.results = list(results)
+
+    def recv(self, size):
+        result = self.results.pop(0)
+        if isinstance(result, Exception): raise result
+        return result
+
+    def fileno(self): return -1
+
+
+def test_lost_events_on_enobufs():
+    received = []
+    connector = ProcConnector(lambda event, pid: received.append((event, pid)))
+    connector._sock = FakeSocket(
+        message(PROC_EVENT_EXEC, 1),
+        OSError(errno.ENOBUFS, "No buffer space available"),
+        message(PROC_EVENT_EXIT, 1),
+        BlockingIOError(),
+    )
+    connector.available = True
+    connector._read()
+    assert received == [("exec", 1), ("lost", 0), ("exit", 1)]
+    assert connector.overflows == 1 and connector.events == 2
+    assert connector.available
@@ -0,0 +1,186 @@
+import os
+from configparser import ConfigParser
+from types import SimpleNamespace
+
+import pytest
+
+from auto_cpufreq import core
+from auto_cpufreq.config.profile import Profile
+from auto_cpufreq.modules.capabilities import Capabilities, Knob
+from auto_cpufreq.modules import process_rules as process_rules_module
+from auto_cpufreq.modules.process_rules import ProcessInfo, ProcessRules, ProcessScanner, RuleMatch, parse_rule, read_process
+
+
+@pytest.fixture
+def rule_match(monkeypatch):
+    """
+    A running process matched by rule 'game', which overrides governor, EPP and frequencies
+    """
+    match = RuleMatch(
+        overrides={"governor": "performance", "energy_performance_preference": "performance", "turbo": "always", "scaling_max_freq": 3_000_000, "scaling_min_freq": 2_000_000},
+        matched={"game": ["game"]},
+    )
+    match.sources = {option: "game" for option in match.overrides}
+    monkeypatch.setattr(core.process_rules, "last", match)
+    monkeypatch.setattr(core, "backend", SimpleNamespace(frequency_max_limit=lambda: 4_000_000, frequency_min_limit=lambda: 400_000))
+    return match
+
+
+def test_rule_overrides_without_force(override_store, rule_match):
+    assert core.process_rule_override("governor", "powersave") == "performance"
+    assert core.process_rule_override("energy_performance_preference", "power") == "performance"
+    state = core.DesiredState()
+    core.set_frequencies(Profile("battery", scaling_max_freq=1_000_000), state)
+    assert (state.min_freq, state.max_freq) == (2_000_000, 3_000_000)
+
+
+def test_force_wins_over_rule(override_store, rule_match):
+    override_store.set("governor", "powersave")
+    assert core.process_rule_override("governor", "powersave") == "powersave"
+    assert core.process_rule_override("energy_performance_preference", "power") == "power"
+    state = core.DesiredState()
+    core.set_frequencies(Profile("battery", scaling_max_freq=1_000_000), state)
+    assert (state.min_freq, state.max_freq) == (400_000, 1_000_000)
+    # turbo has its own --turbo override
+    assert core.process_rule_override("turbo", "auto") == "always"
+
+
+@pytest.fixture
+def proc(tmp_path, monkeypatch):
+    """
+    Fake /proc tree, spawn(pid, name, cgroup) adds a process, kill(pid) removes it
+    """
+    # rule values aren't checked against this system's governors and EPP
+    monkeypatch.setattr(process_rules_module, "probe", Capabilities)
+
+    def spawn(pid: int, name: str, cgroup: str = "/user.slice"):
+        (tmp_path / str(pid)).mkdir()
+        (tmp_path / str(pid) / "stat").write_text(f"{pid} ({name}) S 1" + " 0" * 48 + "\n")
+        (tmp_path / str(pid) / "cgroup").write_text(f"0::{cgroup}\n")
+
+    def kill(pid: int):
+        for entry in (tmp_path / str(pid)).iterdir(): entry.unlink()
+        (tmp_path / str(pid)).rmdir()
+
+    (tmp_path / "self").mkdir() # non numeric entries are skipped
+    return SimpleNamespace(root=str(tmp_path), spawn=spawn, kill=kill)
+
+
+def test_scanner_reads_only_new_processes(proc, monkeypatch):
+    for pid in (1, 2, 3): proc.spawn(pid, f"worker {pid}")
+    scanner = ProcessScanner(proc.root)
+    assert sorted(scanner.scan()) == [1, 2, 3] and scanner.reads == 3
+
+    read = []
+    monkeypatch.setattr(process_rules_module, "read_process", lambda pid, proc_root: read.append(pid) or ProcessInfo(pid, "new", 0))
+    proc.kill(2)
+    proc.spawn(4, "worker 4")
+    assert sorted(scanner.scan()) == [1, 3, 4]
+    assert read == [4] and scanner.reads == 1
+    assert scanner.scan().keys() == {1, 3, 4} and scanner.reads == 0
+
+
+def test_scanner_drops_exited_processes(proc):
+    proc.spawn(1, "a")
+    proc.spawn(2, "b")
+    scanner = ProcessScanner(proc.root)
+    scanner.scan()
+    assert scanner.cgroup(2) == "/user.slice"
+    proc.kill(2)
+    assert list(scanner.scan()) == [1]
+    assert 2 not in scanner._cgroups
+
+
+def test_name_with_spaces_and_parentheses(proc):
+    proc.spawn(1, "Web Content (x)")
+    assert read_process(1, proc.root).name == "Web Content (x)"
+
+
+def rules_config(text: str) -> ConfigParser:
+    conf = ConfigParser()
+    conf.read_string(text)
+    return conf
+
+
+def test_rule_matching(proc):
+    proc.spawn(1, "cc1plus", "/user.slice/user-1000.slice/session-2.scope")
+    proc.spawn(2, "ffmpeg", "/system.slice/encoder.service")
+    proc.spawn(3, "bash")
+    rules = ProcessRules(proc.root)
+    conf = rules_config(f"""
+        [process_rules.build]
+        match_name = cc1*, rustc
+        governor = performance
+        [process_rules.encoder]
+        match_cgroup = /system.slice/*.service
+        turbo = never
+        [process_rules.other_user]
+        match_uid = {os.getuid() + 1}
+        profile = battery
+    """)
+    match = rules.evaluate(conf)
+    assert match.overrides == {"governor": "performance", "turbo": "never"}
+    assert match.matched == {"build": ["cc1plus"], "encoder": ["ffmpeg"]}
+
+
+def test_rule_matching_by_uid(proc):
+    proc.spawn(1, "bash")
+    rules = ProcessRules(proc.root)
+    match = rules.evaluate(rules_config(f"[process_rules.mine]\nmatch_uid = {os.getuid()}\nmatch_name = bash\nprofile = charger"))
+    assert match.overrides == {"profile": "charger"}
+    # every given match_* option has to match
+    rules = ProcessRules(proc.root)
+    match = rules.evaluate(rules_config(f"[process_rules.mine]\nmatch_uid = {os.getuid()}\nmatch_name = zsh\nprofile = charger"))
+    assert match.overrides == {}
+
+
+def test_earlier_rule_takes_precedence(proc):
+    proc.spawn(1, "game")
+    proc.spawn(2, "game-helper")
+    rules = ProcessRules(proc.root)
+    conf = rules_config("""
+        [process_rules.game]
+        match_name = game
+        governor = performance
+        [process_rules.helpers]
+        match_name = *-helper
+        governor = powersave
+        energy_performance_preference = power
+    """)
+    match = rules.evaluate(conf)
+    assert match.overrides == {"governor": "performance", "energy_performance_preference": "power"}
+    assert match.sources == {"governor": "game", "energy_performance_preference": "helpers"}
+
+    # a rule stops applying once its process exits
+    proc.kill(1)
+    match = rules.evaluate(conf)
+    assert match.overrides["governor"] == "powersave"
+
+
+def test_rule_governor_and_epp_are_validated(capsys):
+    capabilities = Capabilities(governors=("performance", "powersave"), epp=Knob("energy_performance_preference", True, True, ("performance", "power")))
+    conf = rules_config("""
+        [process_rules.game]
+        match_name = game
+        governor = perfomance
+        energy_performance_preference = balanced
+        turbo = always
+    """)
+    rule = parse_rule(conf, "process_rules.game", capabilities)
+    assert rule.overrides == {"turbo": "always"}
+    assert capsys.readouterr().out.splitlines() == [
+        "Invalid value for 'governor' in [process_rules.game]: perfomance, use one of performance, powersave",
+        "Invalid value for 'energy_performance_preference' in [process_rules.game]: balanced, use one of performance, power",
+    ]
+
+
+def test_frequencies_without_limits(override_store, rule_match, monkeypatch):
+    # cpuinfo_min/max_freq can't be read, the configured and rule values are used as given
+    monkeypatch.setattr(core, "backend", SimpleNamespace(frequency_max_limit=lambda: None, frequency_min_limit=lambda: None))
+    state = core.DesiredState()
+    core.set_frequencies(Profile("battery", scaling_max_freq=1_000_000, scaling_min_freq=800_000), state)
+    assert (state.min_freq, state.max_freq) == (2_000_000, 3_000_000)
+    del rule_match.overrides["scaling_max_freq"]
+    del rule_match.overrides["scaling_min_freq"]
+    core.set_frequencies(Profile("battery", scaling_max_freq=1_000_000, scaling_min_freq=800_000), state)
+    assert (state.min_freq, state.max_freq) == (800_000, 1_000_000)
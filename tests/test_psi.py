@@ -0,0 +1,28 @@
+from auto_cpufreq.config.profile import DaemonSettings
+from auto_cpufreq.modules.psi import TRIGGER_WINDOW_US, PressureMonitor
+
+
+def test_restart_rearms_trigger(tmp_path):
+    (tmp_path / "cpu").write_text("some avg10=0.00 avg60=0.00 avg300=0.00 total=0\n")
+    monitor = PressureMonitor(str(tmp_path))
+    monitor.configure(DaemonSettings(psi=True, psi_threshold=10))
+    assert monitor.start()
+    first = monitor._stopped
+
+    # a config reload changes the threshold
+    monitor.stop()
+    monitor.configure(DaemonSettings(psi=True, psi_threshold=20))
+    assert monitor.start()
+    assert first.is_set() and not monitor._stopped.is_set()
+    assert (tmp_path / "cpu").read_bytes().startswith(f"some {TRIGGER_WINDOW_US // 5} {TRIGGER_WINDOW_US}\0".encode())
+    monitor.stop()
+
+
+def test_disabled_on_reload(tmp_path):
+    (tmp_path / "cpu").write_text("")
+    monitor = PressureMonitor(str(tmp_path))
+    monitor.configure(DaemonSettings(psi=True))
+    assert monitor.start()
+    monitor.stop()
+    monitor.configure(DaemonSettings())
+    assert not monitor.start() and not monitor.available
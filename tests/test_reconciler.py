@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+
+import pytest
+
+from auto_cpufreq import core
+from auto_cpufreq.modules.capabilities import Capabilities, Knob
+from auto_cpufreq.modules.sysfs_backend import SysfsBackend
+
+
+class FakeBackend:
+    """
+    Per cpu governor and EPP knobs of four cpus, counting writes
+    """
+    name = "fake"
+
+    def __init__(self, governor, epp=None):
+        self.governor = list(governor)
+        self.epp = list(epp) if epp else None
+        self.writes = 0
+
+    def get_governor(self, cpus=None): return " ".join(self.governor)
+    def get_epp(self, cpus=None): return " ".join(self.epp) if self.epp else None
+    def get_epb(self, cpus=None): return None
+    def get_platform_profile(self): return None
+    def get_no_turbo(self): return None
+    def get_boost(self): return None
+    def get_frequency_max_per_policy(self, cpus=None): return None
+    def get_frequency_min_per_policy(self, cpus=None): return None
+
+    def set_governor(self, value, cpus=None):
+        self.writes += 1
+        self.governor = [value] * len(self.governor)
+        return True
+
+    def set_epp(self, value, cpus=None):
+        self.writes += 1
+        self.epp = [value] * len(self.epp)
+        return True
+
+
+@pytest.fixture
+def reconciler():
+    return core.StateReconciler()
+
+
+def test_unchanged_knob_is_skipped(monkeypatch, reconciler):
+    monkeypatch.setattr(core, "backend", FakeBackend(["powersave"] * 4))
+    assert reconciler.apply(core.DesiredState(governor="powersave")) == []
+    assert reconciler.writes_skipped == 1
+
+
+def test_mixed_values_are_rewritten(monkeypatch, reconciler):
+    fake = FakeBackend(["powersave"] * 4, ["power"] * 4)
+    monkeypatch.setattr(core, "backend", fake)
+    assert reconciler.apply(core.DesiredState(governor="powersave", epp="power")) == []
+
+    # something else changed one cpu behind the daemon's back
+    fake.governor[2] = "performance"
+    fake.epp[1] = "performance"
+    assert reconciler.apply(core.DesiredState(governor="powersave", epp="power")) == ["governor", "epp"]
+    assert fake.governor == ["powersave"] * 4 and fake.epp == ["power"] * 4
+
+
+def test_unreadable_knob_uses_applied(monkeypatch, reconciler):
+    fake = FakeBackend(["powersave"] * 4)
+    fake.epp = []
+    fake.set_epp = lambda value, cpus=None: True
+    monkeypatch.setattr(core, "backend", fake)
+    assert reconciler.apply(core.DesiredState(epp="power")) == ["epp"]
+    assert reconciler.apply(core.DesiredState(epp="power")) == []
+    assert reconciler.apply(core.DesiredState(epp="balance_power")) == ["epp"]
+
+
+@pytest.fixture
+def turbo_knob(tmp_path, monkeypatch, override_store):
+    """
+    intel_pstate no_turbo file, the capability probe reports what's passed to set(path)
+    """
+    capabilities = SimpleNamespace(value=Capabilities())
+    monkeypatch.setattr(core, "capabilities", SimpleNamespace(get=lambda: capabilities.value))
+    monkeypatch.setattr(core, "backend", FakeBackend(["powersave"] * 4))
+
+    def set(path):
+        capabilities.value = Capabilities(no_turbo=Knob(str(path), True, True))
+    return set
+
+
+def test_turbo_without_control_is_skipped(reconciler, turbo_knob):
+    assert reconciler.apply(core.DesiredState(turbo=True)) == []
+    assert reconciler.writes_performed == 0 and reconciler.applied.turbo is None
+
+
+def test_turbo_written(tmp_path, reconciler, turbo_knob):
+    no_turbo = tmp_path / "no_turbo"
+    no_turbo.write_text("1\n")
+    turbo_knob(no_turbo)
+    assert reconciler.apply(core.DesiredState(turbo=True)) == ["turbo"]
+    assert no_turbo.read_text() == "0\n" and reconciler.applied.turbo is True
+
+
+def test_failed_turbo_write_is_retried(tmp_path, reconciler, turbo_knob):
+    # writing a directory fails like a no_turbo file the driver refuses
+    turbo_knob(tmp_path)
+    assert reconciler.apply(core.DesiredState(turbo=True)) == []
+    assert reconciler.applied.turbo is None
+    assert reconciler.apply(core.DesiredState(turbo=True)) == []
+    assert reconciler.writes_performed == 2
+
+
+def test_diverging_frequencies_are_rewritten(tmp_path, monkeypatch, reconciler):
+    # two policies, a thermal daemon lowered the second one's maximum
+    for policy, cpus, max_freq in ((0, "0 1", 3_000_000), (2, "2 3", 2_000_000)):
+        path = tmp_path / "cpufreq" / f"policy{policy}"
+        path.mkdir(parents=True)
+        (path / "related_cpus").write_text(cpus)
+        (path / "scaling_max_freq").write_text(f"{max_freq}\n")
+        (path / "scaling_min_freq").write_text("400000\n")
+    for cpu in range(4): (tmp_path / f"cpu{cpu}").mkdir()
+    monkeypatch.setattr(core, "backend", SysfsBackend(str(tmp_path)))
+
+    assert reconciler.apply(core.DesiredState(max_freq=3_000_000, min_freq=400_000)) == ["max_freq"]
+    assert (tmp_path / "cpufreq/policy2/scaling_max_freq").read_text().strip() == "3000000"
+    assert reconciler.apply(core.DesiredState(max_freq=3_000_000, min_freq=400_000)) == []
@@ -0,0 +1,26 @@
+from auto_cpufreq.config.profile import DaemonSettings, Profile, Settings
+from auto_cpufreq.modules.load_sampler import LoadSnapshot
+from auto_cpufreq.modules.scheduler import DEFAULT_TICK_BOUNDS, AdaptiveInterval, Scheduler
+
+IDLE = [LoadSnapshot(timestamp=i, total=2.0, per_cpu=[2.0], cpu_ids=[0], max_core=2.0, ewma=2.0, load1m=0.1) for i in range(5)]
+
+
+def test_idle_backs_off():
+    adaptive = AdaptiveInterval()
+    first = adaptive.next(IDLE, "battery", 2.0)
+    assert adaptive.reason == "idle"
+    assert adaptive.next(IDLE, "battery", 2.0) > first
+
+
+def test_power_supply_change_polls_fast():
+    adaptive = AdaptiveInterval()
+    adaptive.next(IDLE, "battery", 2.0)
+    assert adaptive.next(IDLE, "battery", 2.0, power_supply_changed=True) == 0.25
+    assert adaptive.reason == "power source changed"
+
+
+def test_configure_from_settings():
+    scheduler = Scheduler()
+    scheduler.configure(Settings(battery=Profile("battery", max_tick_interval=60.0), daemon=DaemonSettings(fast_interval=1.0, adaptive_interval=True)))
+    assert scheduler.fast_interval == 1.0 and scheduler.adaptive.enabled
+    assert scheduler.adaptive.bounds == {"charger": DEFAULT_TICK_BOUNDS["charger"], "battery": (0.25, 60.0)}